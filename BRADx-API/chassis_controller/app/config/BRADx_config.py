@@ -7,6 +7,29 @@
 # zz - Bug fix
 FASTAPI_VERSION     = "2.0.0"
 
+import os
+
+# Serial port overrides (e.g. the pty of an emulator, see chassis_controller/emulators),
+# the devices are searched for on the USB ports when not set
+BRADX_PORT = os.environ.get("BRADX_PORT")
+MEERSTETTER_PORT = os.environ.get("MEERSTETTER_PORT")
+PIPETTOR_PORT = os.environ.get("PIPETTOR_PORT")
+
+# Log file the bus traffic is recorded to (see routers/interfaces/recorder.py), not recorded when not set
+BUS_RECORD_PATH = os.environ.get("BUS_RECORD_PATH")
+
+# API server (see util/server.py): profile ("dev" with auto reload or "production"), bind address and port
+SERVER_PROFILE = os.environ.get("BRADX_SERVER_PROFILE", "dev")
+SERVER_HOST = os.environ.get("BRADX_SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.environ.get("BRADX_SERVER_PORT", "8000"))
+
+# Event loop stalls longer than this are logged with a stack sample (see app/loop_monitor.py)
+LOOP_LAG_THRESHOLD_MS = float(os.environ.get("BRADX_LOOP_LAG_MS", "50"))
+
+# Check the CRC of the BRADx bus responses (see BRADxBusPacket.parse). Off until the byte order and the covered
+# bytes are verified against a frame captured from the chassis controller firmware, set BRADX_RESPONSE_CRC_CHECK=1
+BRADX_RESPONSE_CRC_CHECK = os.environ.get("BRADX_RESPONSE_CRC_CHECK") == "1"
+
 # Meerstetter vid (Vender ID), pid (Product ID) and ser (Serial Number) for the board
 MEERSTETTER_VID = "0403"
 MEERSTETTER_PID = "6001"
@@ -100,8 +123,15 @@ PIPETTOR_BUS_ADDR = {
 # LED Max Intensity
 LED_MAX_INTENSITY = 1000
 
+# Bus exchange timeout bounds (min, max) in seconds, the timeouts adapt to the observed latencies within them
+BRADX_BUS_TIMEOUT_BOUNDS       = (0.1, 30.0)
+MEERSTETTER_BUS_TIMEOUT_BOUNDS = (0.02, 0.5)
+PIPETTOR_BUS_TIMEOUT_BOUNDS    = (0.05, 5.0)
+# Lowest timeout in seconds of the BRADx commands whose duration depends on their arguments: a motion command is
+# answered when the move ends, so the latencies of short moves say nothing about the timeout of a long one
+BRADX_BUS_TIMEOUT_FLOORS = {"mabs": 30.0, "mrel": 30.0, "home": 30.0}
+
 from enum import Enum
-from tkinter import OFF 
 class PipettorGantryAxisOptions(str, Enum):
     x = 'X'
     y = 'Y'
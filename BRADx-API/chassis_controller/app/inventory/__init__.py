@@ -0,0 +1,2 @@
+
+# Version: Test
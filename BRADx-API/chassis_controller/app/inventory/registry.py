@@ -0,0 +1,113 @@
+
+# Version: Test
+"""
+Device inventory: firmware versions and identification of the modules on the buses.
+
+These values only change when a module is reflashed, so each one is read once, kept
+for INVENTORY_TTL seconds and then served from memory. The routers register a fetch
+function for each device they own together with the bus it is read over. A refresh
+reads the buses concurrently and the devices on each bus one after another, because
+every exchange opens the bus port. An entry is dropped when its device is reset or
+the chassis is put into remote programming.
+"""
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+INVENTORY_TTL = 3600.0  # Seconds an inventory entry is served before it is read again
+
+BRADX_BUS = "bradx"
+MEERSTETTER_BUS = "meerstetter"
+
+# A fetch returns (value, message, elapsed_us) like the bus timed exchanges
+InventoryFetch = Callable[[], Awaitable[Tuple[object, object, int]]]
+
+
+class DeviceInventory:
+    """Registered device info sources and their cached values by key (e.g. "reader/axis/1")"""
+
+    def __init__(self, ttl: float = INVENTORY_TTL, clock: Callable[[], float] = time.monotonic) -> None:
+        self.ttl = ttl
+        self.clock = clock
+        self._sources: Dict[str, Tuple[str, InventoryFetch]] = {}
+        self._entries: Dict[str, dict] = {}
+        self._errors: Dict[str, str] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._sources
+
+    def register(self, key: str, fetch: InventoryFetch, bus: str) -> None:
+        self._sources[key] = (bus, fetch)
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the entry for the key if it has been read within the TTL"""
+        entry = self._entries.get(key)
+        if entry is not None and self.clock() - entry["read_at"] < self.ttl:
+            return entry
+        return None
+
+    def invalidate(self, prefix: str = "") -> None:
+        """Drop the entries whose key starts with the prefix (every entry by default)"""
+        for key in [key for key in self._entries if key.startswith(prefix)]:
+            del self._entries[key]
+
+    async def _fetch(self, key: str) -> dict:
+        _, fetch = self._sources[key]
+        try:
+            value, message, elapsed = await fetch()
+        except Exception as e:
+            self._entries.pop(key, None)
+            self._errors[key] = str(e) or type(e).__name__
+            raise
+        self._errors.pop(key, None)
+        entry = {"value": value, "message": message, "_duration_us": elapsed, "read_at": self.clock()}
+        self._entries[key] = entry
+        return entry
+
+    async def lookup(self, key: str, refresh: bool = False) -> tuple:
+        """
+        Return (value, message, elapsed_us) for the key, read from the device if it is
+        not cached or refresh is set (elapsed is 0 when served from the inventory)
+        """
+        entry = None if refresh else self.get(key)
+        if entry is not None:
+            return (entry["value"], entry["message"], 0)
+        entry = await self._fetch(key)
+        return (entry["value"], entry["message"], entry["_duration_us"])
+
+    async def refresh(self, stale_only: bool = False) -> None:
+        """Read every registered device (or only the missing and expired ones), one task per bus"""
+        buses: Dict[str, list] = {}
+        for key, (bus, _) in self._sources.items():
+            if not (stale_only and self.get(key) is not None):
+                buses.setdefault(bus, []).append(key)
+
+        async def read_bus(keys):
+            for key in keys:
+                try:
+                    await self._fetch(key)
+                except Exception:
+                    pass  # Recorded in _errors and reported by snapshot()
+
+        await asyncio.gather(*(read_bus(keys) for keys in buses.values()))
+
+    def start_refresh(self) -> asyncio.Task:
+        """Refresh the whole inventory in the background (used at startup)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self.refresh())
+        return self._task
+
+    def snapshot(self) -> Dict[str, dict]:
+        now = self.clock()
+        devices = {}
+        for key, (bus, _) in self._sources.items():
+            entry = self.get(key)
+            if entry is not None:
+                devices[key] = {"bus": bus, "value": entry["value"], "age_s": round(now - entry["read_at"], 3)}
+            else:
+                devices[key] = {"bus": bus, "value": None, "error": self._errors.get(key)}
+        return devices
+
+
+DEVICE_INVENTORY = DeviceInventory()
@@ -0,0 +1,27 @@
+
+# Version: Test
+"""
+Deferred imports of heavy optional modules, to keep them off the server's startup path.
+
+lazy_import returns the module object at once but only executes the module on its first
+attribute access, so a module level `np = lazy_import("numpy")` costs nothing until a
+request actually computes with it. Annotations that name the module must be strings.
+"""
+import importlib.util
+import sys
+from types import ModuleType
+
+
+def lazy_import(name: str) -> ModuleType:
+    """The module `name`, loaded on first use (at once when it is already imported)"""
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named {name!r}", name=name)
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
@@ -0,0 +1,101 @@
+
+# Version: Test
+"""
+Event loop lag monitor.
+
+A heartbeat task sleeps `interval` seconds in a loop; when it wakes up later than that
+by more than the threshold, something held the event loop (a blocking call in a handler,
+a long computation) and the lag is logged as an event. A watchdog thread checks the
+heartbeat meanwhile and, while the loop is stalled, samples the loop thread's stack, so
+the event tells what was blocking and not only for how long. Events are kept in a bounded
+log and served by /loop-lag/.
+"""
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import List, Optional, Tuple
+
+from chassis_controller.app.config.BRADx_config import LOOP_LAG_THRESHOLD_MS
+
+LOOP_LAG_INTERVAL = 0.01  # Seconds between heartbeats
+LOOP_LAG_MAX_EVENTS = 100  # Events kept in the log
+LOOP_LAG_STACK_LIMIT = 20  # Innermost frames kept of a stack sample
+
+
+class LoopLagMonitor:
+    """Logs the stalls of the event loop it is started on, see the module docstring"""
+
+    def __init__(self, threshold: float = LOOP_LAG_THRESHOLD_MS / 1000, interval: float = LOOP_LAG_INTERVAL) -> None:
+        self.threshold = threshold
+        self.interval = interval
+        self.events = deque(maxlen=LOOP_LAG_MAX_EVENTS)
+        self.stalls = 0
+        self.max_lag = 0.0
+        self._beat: Optional[float] = None  # Monotonic time of the last heartbeat
+        self._sample: Optional[Tuple[float, List[str]]] = None  # (heartbeat, stack) taken during a stall
+        self._loop_thread: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    async def run(self) -> None:
+        self._loop_thread = threading.get_ident()
+        while True:
+            beat = self._beat = time.monotonic()
+            await asyncio.sleep(self.interval)
+            lag = time.monotonic() - beat - self.interval
+            if lag > self.threshold:
+                sample = self._sample
+                self.record(lag, sample[1] if sample is not None and sample[0] == beat else None)
+
+    def record(self, lag: float, stack: Optional[List[str]]) -> None:
+        self.stalls += 1
+        self.max_lag = max(self.max_lag, lag)
+        self.events.append({"time": time.time(), "lag_ms": lag * 1e3, "stack": stack})
+
+    def _watch(self) -> None:
+        while not self._stopped.wait(self.threshold / 2):
+            beat = self._beat
+            if beat is None or time.monotonic() - beat < self.interval + self.threshold:
+                continue
+            if self._sample is not None and self._sample[0] == beat:
+                continue  # This stall is sampled already
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is not None:
+                self._sample = (beat, traceback.format_stack(frame, LOOP_LAG_STACK_LIMIT))
+
+    def start(self) -> asyncio.Task:
+        if not self.is_running:
+            self._stopped.clear()
+            self._task = asyncio.ensure_future(self.run())
+            self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+            self._watchdog.start()
+        return self._task
+
+    def stop(self) -> None:
+        if self.is_running:
+            self._task.cancel()
+        if self._watchdog is not None:
+            self._stopped.set()
+            self._watchdog.join()
+            self._watchdog = None
+
+    def snapshot(self) -> dict:
+        return {
+            "running": self.is_running,
+            "threshold_ms": self.threshold * 1e3,
+            "interval_ms": self.interval * 1e3,
+            "stalls": self.stalls,
+            "max_lag_ms": self.max_lag * 1e3,
+            "events": list(self.events),
+        }
+
+
+LOOP_LAG_MONITOR = LoopLagMonitor()
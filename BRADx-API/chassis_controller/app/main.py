@@ -1,8 +1,20 @@
 
 # Version: Test
-from fastapi import FastAPI
+import math
 
-from chassis_controller.app.routers import hardware_interface, chassis_submodule, pipettor_gantry_submodule, prep_deck_submodule, reader_submodule, tec_submodule, led_submodule
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# The pipettor gantry and prep deck routers are disabled, they are not imported either (import them with their
+# include_router below): importing them costs startup time and registers their axes in the device inventory
+from chassis_controller.app.routers import hardware_interface, chassis_submodule, reader_submodule, tec_submodule, led_submodule, inventory_submodule
+from chassis_controller.app.config.BRADx_config import BUS_RECORD_PATH
+from chassis_controller.app.inventory.registry import DEVICE_INVENTORY
+from chassis_controller.app.loop_monitor import LOOP_LAG_MONITOR
+from chassis_controller.app.routers.interfaces.breaker import ModuleUnavailable
+from chassis_controller.app.routers.interfaces.BRADxBus import BRADX_REQUEST_RETRIES
+from chassis_controller.app.routers.interfaces.recorder import BUS_RECORDER
+from chassis_controller.app.tec.watcher import TEC_WATCHER
 
 app = FastAPI()
 
@@ -12,4 +24,64 @@ app.include_router(chassis_submodule.router)
 #app.include_router(prep_deck_submodule.router)
 app.include_router(tec_submodule.router)
 app.include_router(reader_submodule.router)
-app.include_router(led_submodule.router)
\ No newline at end of file
+app.include_router(led_submodule.router)
+app.include_router(inventory_submodule.router)
+
+
+@app.middleware("http")
+async def report_bus_retries(request: Request, call_next):
+    """Report the BRADx bus exchanges repeated because of corrupted responses in the X-Bus-Retries header"""
+    retries = []
+    BRADX_REQUEST_RETRIES.set(retries)
+    response = await call_next(request)
+    if retries:
+        response.headers["X-Bus-Retries"] = str(sum(retries))
+    return response
+
+
+@app.exception_handler(ModuleUnavailable)
+async def module_unavailable(request: Request, exc: ModuleUnavailable):
+    """A module's circuit breaker is open, reject the request at once instead of timing out"""
+    return JSONResponse(
+        status_code=503,
+        content={"detail": str(exc)},
+        headers={"Retry-After": str(math.ceil(exc.retry_after))},
+    )
+
+
+@app.on_event("startup")
+async def start_loop_lag_monitor():
+    LOOP_LAG_MONITOR.start()
+
+
+@app.on_event("startup")
+async def start_bus_recorder():
+    """Record the bus traffic when BUS_RECORD_PATH is set (before anything opens a connection)"""
+    if BUS_RECORD_PATH:
+        BUS_RECORDER.start(BUS_RECORD_PATH)
+
+
+@app.on_event("startup")
+async def read_device_inventory():
+    """Read the device inventory in the background so the server does not wait on the buses"""
+    DEVICE_INVENTORY.start_refresh()
+
+
+@app.on_event("startup")
+async def start_tec_watcher():
+    TEC_WATCHER.start()
+
+
+@app.on_event("shutdown")
+async def stop_tec_watcher():
+    TEC_WATCHER.stop()
+
+
+@app.on_event("shutdown")
+async def stop_bus_recorder():
+    BUS_RECORDER.stop()
+
+
+@app.on_event("shutdown")
+async def stop_loop_lag_monitor():
+    LOOP_LAG_MONITOR.stop()
@@ -12,6 +12,7 @@ from chassis_controller.app.routers.interfaces.utils import (
     BRADxBusPacketType,
 )
 from chassis_controller.app.routers.interfaces.BRADxBus import bradx_bus_timed_exchange
+from chassis_controller.app.inventory.registry import BRADX_BUS, DEVICE_INVENTORY
 
 router = APIRouter(
     prefix="/chassis",
@@ -50,6 +51,8 @@ async def get_remoteProg():
         
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
+    # Modules may be reflashed while in the bootloader, read their versions again afterwards
+    DEVICE_INVENTORY.invalidate()
     return {
         "_sid": CHASSIS_SUBSYSTEM_ID,
         "_mid": id,
@@ -58,27 +61,32 @@ async def get_remoteProg():
         "response": pkt.data
     }
 
-@router.get("/chassis/version")
-async def get_chassis_version():
-    """Returns the version info of the chassis bus controller FW"""
+async def fetch_chassis_version() -> tuple:
+    """Read the version of the chassis bus controller FW, returns (version, message, elapsed)"""
     # Build the request message and packet
     message = BRADXRequest(CHASSIS_VER, 0, "?ver", [])
-    # Build the request message and packet
     req = BRADxBusPacket(
         CHASSIS_SUBSYSTEM_ID, CHASSIS_VER, message.raw, 25, BRADxBusPacketType.REQUEST)
     # Send the request and get the response
+    pkt, elapsed = await bradx_bus_timed_exchange(req)
+    version = pkt.data
+    return ("v"+version[0]+"."+version[1]+"."+version[2], message.raw, elapsed)
+
+DEVICE_INVENTORY.register("chassis", fetch_chassis_version, BRADX_BUS)
+
+@router.get("/chassis/version")
+async def get_chassis_version(refresh: bool = False):
+    """Returns the version info of the chassis bus controller FW (from the device inventory unless refresh is set)"""
     try:
-        pkt, elapsed = await bradx_bus_timed_exchange(req)
-        version = pkt.data
-        
+        version, message, elapsed = await DEVICE_INVENTORY.lookup("chassis", refresh)
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
     return {
         "_sid": CHASSIS_SUBSYSTEM_ID,
         "_mid": CHASSIS_VER,
         "_duration_us": elapsed,
-        "message": message.raw,
-        "version": "v"+version[0]+"."+version[1]+"."+version[2]        
+        "message": message,
+        "version": version
     }
     
 @router.get("/raw")
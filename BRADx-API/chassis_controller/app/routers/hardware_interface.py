@@ -4,6 +4,9 @@ from fastapi import APIRouter, Query, HTTPException
 
 from chassis_controller.app.routers.interfaces.utils import BRADxBusPacket, BRADxBusPacketType
 from chassis_controller.app.routers.interfaces.BRADxBus import bradx_bus_timed_exchange
+from chassis_controller.app.routers.interfaces.breaker import BUS_BREAKERS
+from chassis_controller.app.routers.interfaces.latency import BUS_LATENCY
+from chassis_controller.app.loop_monitor import LOOP_LAG_MONITOR
 from chassis_controller.app.config.BRADx_config import *
 
 router = APIRouter(
@@ -44,3 +47,61 @@ async def get_serial_number():
         "message": "",
         "response": ser,
     }
+
+@router.get("/latency/", response_model=dict, tags=["Hardware Interface"])
+async def get_latency(bus: str = Query(default=None, enum=list(BUS_LATENCY))):
+    """
+    Returns the exchange latency histograms of the buses and the timeouts derived from them
+    \n
+    Parameters:\n
+        - bus (str): only this bus (bradx, meerstetter or pipettor)\n
+    Returns:\n
+        - response (dict): timeout bounds and, by subsystem/module/command, the latency
+          percentiles, non-empty histogram buckets (by upper edge in seconds), timeouts and
+          the current timeout, by bus
+    """
+    buses = [bus] if bus is not None else list(BUS_LATENCY)
+    return {
+        "_duration_us": 0,
+        "response": {name: BUS_LATENCY[name].snapshot() for name in buses},
+    }
+
+@router.get("/loop-lag/", response_model=dict, tags=["Hardware Interface"])
+async def get_loop_lag():
+    """
+    Returns the event loop stalls seen by the lag monitor (a handler or task holding the loop
+    longer than the threshold delays every other request)
+    \n
+    Returns:\n
+        - response (dict): threshold, number of stalls, longest lag and the latest stalls with
+          their lag (ms) and a sample of the stack that was blocking the loop
+    """
+    return {
+        "_duration_us": 0,
+        "response": LOOP_LAG_MONITOR.snapshot(),
+    }
+
+@router.get("/breakers/", response_model=dict, tags=["Hardware Interface"])
+async def get_breakers():
+    """
+    Returns the circuit breakers of the bus modules (opened after consecutive timeouts, requests
+    to a module with an open breaker are rejected with 503 until a probe succeeds)
+    \n
+    Returns:\n
+        - response (dict): state, consecutive timeouts, rejected requests and time to the next
+          probe by module, by bus
+    """
+    return {
+        "_duration_us": 0,
+        "response": {name: breakers.snapshot() for name, breakers in BUS_BREAKERS.items()},
+    }
+
+@router.post("/breakers/reset", response_model=dict, tags=["Hardware Interface"])
+async def reset_breakers():
+    """Close every circuit breaker (e.g. after powering modules on), the next requests go to the modules"""
+    for breakers in BUS_BREAKERS.values():
+        breakers.reset()
+    return {
+        "_duration_us": 0,
+        "response": "ok",
+    }
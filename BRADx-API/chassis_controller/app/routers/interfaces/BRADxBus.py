@@ -1,18 +1,35 @@
 
 # Version: Test
+import asyncio
 import time
-from typing import Union
+from contextvars import ContextVar
+from typing import List, Optional, Union
 from chassis_controller.app.config.BRADx_config import *
 
 import aioserial
 import serial.tools.list_ports
 import platform
 
+from chassis_controller.app.routers.interfaces.blocking import connect_in_executor
+from chassis_controller.app.routers.interfaces.breaker import BRADX_BREAKERS
+from chassis_controller.app.routers.interfaces.latency import BRADX_LATENCY, bradx_latency_key
+from chassis_controller.app.routers.interfaces.recorder import recorded_connection
 from chassis_controller.app.routers.interfaces.utils import BRADxBusPacket, BRADxBusPacketType
 
 current_os = platform.system()
 COMM_SUBSYSTEM_ID = 0x00 # Windows needs to send/recieve to the chassis controller to confirm when connecting over COM
 
+# Extra exchanges when a response is corrupted (bad CRC or structure), only for idempotent requests
+BRADX_BUS_RETRIES = 2
+# Write commands that can be repeated without changing the outcome (queries, starting with "?", always can)
+BRADX_IDEMPOTENT_COMMANDS = {"mabs", "set", "off", "relayon", "relayoff"}
+
+# Only one exchange at a time on the chassis controller port
+BRADX_BUS_LOCK = asyncio.Lock()
+
+# Retries of every exchange made while handling the current HTTP request (reported by main.py)
+BRADX_REQUEST_RETRIES: ContextVar[Optional[List[int]]] = ContextVar("bradx_request_retries", default=None)
+
 class BRADxBusRouterInterface:
     """BRADx bus router interface class to communicate with modules in the BRADx system"""
 
@@ -23,6 +40,7 @@ class BRADxBusRouterInterface:
 
         self._connection = aioserial.AioSerial()
         self._connection.write_timeout = 0.0  # make writes non-blocking
+        self._connection = recorded_connection(self._connection, "bradx")
 
     @property
     def is_connected(self) -> bool:
@@ -46,6 +64,12 @@ class BRADxBusRouterInterface:
         if self._connection.is_open:
             self._connection.close()
 
+    def set_timeout(self, timeout: float) -> None:
+        """Change the read timeout (in seconds), also on an open connection"""
+        self.timeout = timeout
+        if self._connection.timeout != timeout:
+            self._connection.timeout = timeout
+
     async def exchange_async(self, message: bytearray) -> Union[IOError, bytes]:
         """Send a request and receive a response on the interface connection"""
         if not self._connection.is_open:
@@ -56,6 +80,10 @@ class BRADxBusRouterInterface:
         resp = await self._connection.read_async(256)
         return resp
 
+    def flush(self) -> None:
+        """Drop anything left in the receive buffer (e.g. the rest of a corrupted response)"""
+        self._connection.reset_input_buffer()
+
     def exchange(self, message: bytearray) -> Union[IOError, bytes]:
         """Send a request and receive a response on the interface connection"""
         if not self._connection.is_open:
@@ -74,6 +102,10 @@ class BRADxBusRouterInterface:
     @classmethod
     def find_and_connect(cls):
         """Find an attached BRADx chassis controller device and connect to it"""
+        if BRADX_PORT:
+            conn = cls(BRADX_PORT)
+            conn.connect()
+            return conn
         bradx_ports = list(serial.tools.list_ports.comports())
         for port in bradx_ports:
             if port.pid == 22336:
@@ -83,21 +115,59 @@ class BRADxBusRouterInterface:
                 return conn
         raise ValueError("No BRADx chassis controller device found")
 
-async def bradx_bus_timed_exchange(req: BRADxBusPacket) -> tuple:
+    @classmethod
+    async def find_and_connect_async(cls):
+        """find_and_connect on the bus I/O thread pool (see blocking.py), the event loop keeps serving meanwhile"""
+        return await connect_in_executor(cls.find_and_connect)
+
+def is_idempotent(command: str) -> bool:
+    """Whether a BRADx request command can safely be sent again"""
+    return command.startswith("?") or command in BRADX_IDEMPOTENT_COMMANDS
+
+
+async def bradx_bus_timed_exchange(req: BRADxBusPacket, idempotent: Optional[bool] = None) -> tuple:
     #print(str(req.raw_packet))
     """Return a tuple containing the response packet object
-    and the elapsed time (in microseconds) to complete the exchange"""
+    and the elapsed time (in microseconds) to complete the exchange.
+    A corrupted response is retried (up to BRADX_BUS_RETRIES times, over the same connection)
+    when the request is idempotent: given, or else read from the command (see is_idempotent).
+    Timeouts are not retried, the module's circuit breaker deals with them.
+    The number of retries is set on the packet (pkt.retries)."""
     begin = time.time_ns()
-    conn = BRADxBusRouterInterface.find_and_connect()
-    #print(conn._connection)
-
-    try:
-        resp = await conn.exchange_async(req.raw_packet)
-        pkt = BRADxBusPacket.parse(resp)
-        end = time.time_ns()
-    finally:    
-        conn.disconnect() # Close the connection now that we are done with it
-    
+    key = bradx_latency_key(req.subsystem_id, req.module_id, req.data)
+    if idempotent is None:
+        idempotent = is_idempotent(key[2])
+    retries = BRADX_BUS_RETRIES if idempotent else 0
+    breaker = BRADX_BREAKERS.get((req.subsystem_id, req.module_id))
+    breaker.check()  # Fail fast when the module is known not to answer
+    async with BRADX_BUS_LOCK:  # One exchange at a time, concurrent connections would read each other's responses
+        conn = await BRADxBusRouterInterface.find_and_connect_async()
+        #print(conn._connection)
+
+        try:
+            for attempt in range(retries + 1):
+                if attempt > 0:
+                    conn.flush()
+                conn.set_timeout(BRADX_LATENCY.timeout(key))
+                sent = time.perf_counter()
+                resp = await conn.exchange_async(req.raw_packet)
+                timed_out = not resp.endswith(b"\r")
+                BRADX_LATENCY.record(key, time.perf_counter() - sent, timed_out=timed_out)
+                breaker.record(timed_out)
+                try:
+                    pkt = BRADxBusPacket.parse(resp)
+                    break
+                except ValueError:
+                    if timed_out or attempt == retries:
+                        raise
+            pkt.retries = attempt
+            end = time.time_ns()
+        finally:    
+            conn.disconnect() # Close the connection now that we are done with it
+
+    request_retries = BRADX_REQUEST_RETRIES.get()
+    if request_retries is not None:
+        request_retries.append(attempt)
     elapsed = (end - begin) // 1000
 
     return (pkt, elapsed)
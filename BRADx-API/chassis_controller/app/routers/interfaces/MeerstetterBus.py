@@ -1,17 +1,52 @@
 
 # Version: Test
+import asyncio
 import time
-from typing import Union
+from contextlib import asynccontextmanager
+from typing import List, Union
 
 import aioserial
 import serial.tools.list_ports
 import platform
 
+from chassis_controller.app.routers.interfaces.blocking import connect_in_executor
+from chassis_controller.app.routers.interfaces.breaker import MEERSTETTER_BREAKERS, ModuleUnavailable
+from chassis_controller.app.routers.interfaces.latency import MEERSTETTER_LATENCY, max_timeout
+from chassis_controller.app.routers.interfaces.recorder import recorded_connection
 from chassis_controller.app.routers.interfaces.utils_meerstetter import MeerstetterBusPacket
-from chassis_controller.app.config.BRADx_config import MEERSTETTER_VID, MEERSTETTER_PID, MEERSTETTER_SER
+from chassis_controller.app.config.BRADx_config import MEERSTETTER_VID, MEERSTETTER_PID, MEERSTETTER_SER, MEERSTETTER_PORT, READER_SUBSYSTEM_ID
 
 current_os = platform.system()
 
+# Requests sent ahead of their responses by exchange_pipelined_async, small enough for the controller's receive buffer
+MEERSTETTER_PIPELINE_DEPTH = 4
+
+def meerstetter_latency_key(pkt: MeerstetterBusPacket) -> tuple:
+    """Latency histogram key of a Meerstetter exchange (see latency.py)"""
+    return (READER_SUBSYSTEM_ID, pkt.address, pkt.packet_type.name)
+
+
+def admit_packets(pkts: List[MeerstetterBusPacket]) -> List[bool]:
+    """Whether the circuit breaker of each packet's module lets it through (see breaker.py), the
+    others are failed. Raises ModuleUnavailable when no packet is let through."""
+    allowed = {address: MEERSTETTER_BREAKERS.get(address).allow() for address in dict.fromkeys(pkt.address for pkt in pkts)}
+    for pkt in pkts:
+        if not allowed[pkt.address]:
+            pkt.error = f"Module {MEERSTETTER_BREAKERS.get(pkt.address).name} is not responding"
+    if pkts and not any(allowed.values()):
+        breaker = MEERSTETTER_BREAKERS.get(pkts[0].address)
+        raise ModuleUnavailable(breaker.name, breaker.retry_after())
+    return [allowed[pkt.address] for pkt in pkts]
+
+
+def check_modules(pkts: List[MeerstetterBusPacket]) -> None:
+    """Fail fast, before waiting for the bus, when every packet is for a module whose breaker is open"""
+    if pkts and all(MEERSTETTER_BREAKERS.get(pkt.address).is_open for pkt in pkts):
+        breaker = MEERSTETTER_BREAKERS.get(pkts[0].address)
+        breaker.rejected += 1
+        raise ModuleUnavailable(breaker.name, breaker.retry_after())
+
+
 class MeerstetterBusRouterInterface:
     """Meerstetter bus router interface class to communicate with modules in the Meerstetter system"""
 
@@ -22,6 +57,7 @@ class MeerstetterBusRouterInterface:
 
         self._connection = aioserial.AioSerial()
         self._connection.write_timeout = 0.0  # make writes non-blocking
+        self._connection = recorded_connection(self._connection, "meerstetter")
 
     @property
     def is_connected(self) -> bool:
@@ -45,6 +81,12 @@ class MeerstetterBusRouterInterface:
         if self._connection.is_open:
             self._connection.close()
 
+    def set_timeout(self, timeout: float) -> None:
+        """Change the read timeout (in seconds), also on an open connection"""
+        self.timeout = timeout
+        if self._connection.timeout != timeout:
+            self._connection.timeout = timeout
+
     async def exchange_async(self, message: bytearray) -> Union[IOError, bytes]:
         """Send a request and receive a response on the interface connection"""
         if not self._connection.is_open:
@@ -55,6 +97,76 @@ class MeerstetterBusRouterInterface:
         resp = await self._connection.read_async(256)
         return resp
 
+    async def exchange_frame_async(self, message: bytearray) -> Union[IOError, bytes]:
+        """Send a request and receive a single response frame (up to its carriage return)"""
+        if not self._connection.is_open:
+            raise IOError("Meerstetter interface not connected")
+        self._connection.write(message)
+        resp = await self._connection.read_until_async(b"\r", 256)
+        return resp
+
+    async def exchange_packets_async(self, pkts: List[MeerstetterBusPacket]) -> List[int]:
+        """Exchange packets back-to-back on the interface connection, filling in their responses.
+        Returns the time (in microseconds, from the first write) each response was received"""
+        admitted = admit_packets(pkts)
+        offsets = []
+        first = time.perf_counter_ns()
+        for pkt, admit in zip(pkts, admitted):
+            breaker = MEERSTETTER_BREAKERS.get(pkt.address)
+            if not admit or breaker.is_open:  # Rejected, or opened by an earlier packet of this call
+                pkt.error = f"Module {breaker.name} is not responding"
+                offsets.append((time.perf_counter_ns() - first) // 1000)
+                continue
+            key = meerstetter_latency_key(pkt)
+            self.set_timeout(MEERSTETTER_LATENCY.timeout(key))
+            sent = time.perf_counter_ns()
+            resp = await self.exchange_frame_async(pkt.raw_packet)
+            received = time.perf_counter_ns()
+            timed_out = not resp.endswith(b"\r")
+            MEERSTETTER_LATENCY.record(key, (received - sent) / 1e9, timed_out=timed_out)
+            breaker.record(timed_out)
+            offsets.append((received - first) // 1000)
+            pkt.parse(resp)
+        return offsets
+
+    async def exchange_pipelined_async(self, pkts: List[MeerstetterBusPacket], depth: int = MEERSTETTER_PIPELINE_DEPTH) -> List[int]:
+        """Exchange packets keeping up to depth requests in flight instead of waiting for each
+        response before sending the next request. Responses are matched to the packets by sequence
+        number, so the packets of one call need distinct sequence numbers.
+        Returns the time (in microseconds, from the first write) each response was received"""
+        if not self._connection.is_open:
+            raise IOError("Meerstetter interface not connected")
+        if len({pkt.sequence for pkt in pkts}) != len(pkts):
+            raise ValueError("Pipelined packets need distinct sequence numbers")
+        admitted = [i for i, admit in enumerate(admit_packets(pkts)) if admit]
+        # Responses wait behind the ones in flight, their latencies are not recorded
+        self.set_timeout(max_timeout(MEERSTETTER_LATENCY, [meerstetter_latency_key(pkts[i]) for i in admitted]))
+        offsets = [None] * len(pkts)
+        pending = {}  # Sequence number -> index of the packet waiting for its response
+        sent = 0
+        first = time.perf_counter_ns()
+        while sent < len(admitted) or pending:
+            while sent < len(admitted) and len(pending) < depth:
+                self._connection.write(pkts[admitted[sent]].raw_packet)
+                pending[pkts[admitted[sent]].sequence] = admitted[sent]
+                sent += 1
+            resp = await self._connection.read_until_async(b"\r", 256)
+            if not resp.endswith(b"\r"):
+                # Timed out, the requests still in flight will not be answered
+                for i in pending.values():
+                    pkts[i].error = "No response"
+                pending.clear()
+                continue
+            try:
+                i = pending.pop(int(resp[3:7], 16))
+            except (KeyError, ValueError):
+                continue  # Not a response to this call (e.g. a late answer to an earlier request)
+            offsets[i] = (time.perf_counter_ns() - first) // 1000
+            pkts[i].parse(resp)
+        for i in admitted:
+            MEERSTETTER_BREAKERS.get(pkts[i].address).record(timed_out=offsets[i] is None)
+        return offsets
+
     def exchange(self, message: bytearray) -> Union[IOError, bytes]:
         """Send a request and receive a response on the interface connection"""
         if not self._connection.is_open:
@@ -72,7 +184,12 @@ class MeerstetterBusRouterInterface:
 
     @classmethod
     def find_and_connect(cls):
-        """Find an attached BRADx chassis controller device and connect to it"""
+        """Find an attached Meerstetter controller device and connect to it, raises an IOError if there is none.
+        The device is looked up by VID/PID/SER on Windows only, elsewhere MEERSTETTER_PORT must be set."""
+        if MEERSTETTER_PORT:
+            conn = cls(MEERSTETTER_PORT)
+            conn.connect()
+            return conn
 
         if current_os == "Windows": # Send an ask for the device ID
             meerstetter_ports = list(serial.tools.list_ports.comports())
@@ -95,20 +212,84 @@ class MeerstetterBusRouterInterface:
                 except: 
                     continue
             
-            raise ValueError("No Meerstetter controller device found")
+            raise IOError("No Meerstetter controller device found")
+        raise IOError(f"No Meerstetter controller device found, set MEERSTETTER_PORT on {current_os}")
+
+    @classmethod
+    async def find_and_connect_async(cls):
+        """find_and_connect on the bus I/O thread pool (see blocking.py), the event loop keeps serving meanwhile"""
+        return await connect_in_executor(cls.find_and_connect)
+
+
+
+
+# Only one exchange at a time on the Meerstetter port
+MEERSTETTER_BUS_LOCK = asyncio.Lock()
 
+# Connection held open by background tasks (see hold_meerstetter_connection), None when not held
+_held_connection = None
+_held_count = 0
 
 
+async def hold_meerstetter_connection() -> None:
+    """Open a connection that stays open and is used by every exchange until every holder
+    has called release_meerstetter_connection"""
+    global _held_connection, _held_count
+    async with MEERSTETTER_BUS_LOCK:
+        if _held_connection is None or not _held_connection.is_connected:
+            _held_connection = await MeerstetterBusRouterInterface.find_and_connect_async()
+        _held_count += 1
+
+
+def release_meerstetter_connection() -> None:
+    """Release one hold, the connection is closed when the last holder releases it"""
+    global _held_connection, _held_count
+    _held_count = max(0, _held_count - 1)
+    if _held_count == 0 and _held_connection is not None:
+        _held_connection.disconnect()
+        _held_connection = None
+
+
+@asynccontextmanager
+async def meerstetter_connection():
+    """Yield a connection to the Meerstetter: the held one if there is one, otherwise a new
+    connection that is closed afterwards. Exchanges are serialized on the bus lock."""
+    async with MEERSTETTER_BUS_LOCK:
+        if _held_connection is not None and _held_connection.is_connected:
+            yield _held_connection
+            return
+        conn = await MeerstetterBusRouterInterface.find_and_connect_async()
+        try:
+            yield conn
+        finally:
+            conn.disconnect()
+
 
 async def meerstetter_bus_timed_exchange(pkt: MeerstetterBusPacket) -> tuple:
     """Return a tuple containing the packet object with a filled in response
     and the elapsed time (in microseconds) to complete the exchange"""
     begin = time.time_ns()
+    check_modules([pkt])
 
-    conn = MeerstetterBusRouterInterface.find_and_connect()
-    resp = await conn.exchange_async(pkt.raw_packet)
-    pkt.parse(resp) # Fill in the response in the packet
+    async with meerstetter_connection() as conn:
+        await conn.exchange_packets_async([pkt]) # Fill in the response in the packet
     end = time.time_ns()
     elapsed = (end - begin) // 1000
     return (pkt, elapsed)
 
+
+async def meerstetter_bus_timed_exchanges(pkts: List[MeerstetterBusPacket], pipelined: bool = False) -> tuple:
+    """Exchange several packets back-to-back over a single connection (one port scan and open),
+    pipelined (see exchange_pipelined_async) if requested.
+    Return a tuple containing the packets with filled in responses, the elapsed time (in
+    microseconds) for the whole exchange and the time (in microseconds, from the first write)
+    at which each packet's response was received"""
+    begin = time.perf_counter_ns()
+    check_modules(pkts)
+    async with meerstetter_connection() as conn:
+        if pipelined:
+            offsets = await conn.exchange_pipelined_async(pkts)
+        else:
+            offsets = await conn.exchange_packets_async(pkts)
+    elapsed = (time.perf_counter_ns() - begin) // 1000
+    return (pkts, elapsed, offsets)
@@ -6,6 +6,11 @@ from typing import Union
 import aioserial
 import serial.tools.list_ports
 
+from chassis_controller.app.config.BRADx_config import PIPETTOR_PORT
+from chassis_controller.app.routers.interfaces.blocking import connect_in_executor
+from chassis_controller.app.routers.interfaces.breaker import PIPETTOR_BREAKERS
+from chassis_controller.app.routers.interfaces.latency import PIPETTOR_LATENCY
+from chassis_controller.app.routers.interfaces.recorder import recorded_connection
 from chassis_controller.app.routers.interfaces.utils import PipettorResponse, PipettorRequest
 
 
@@ -19,6 +24,7 @@ class PipettorBusRouterInterface:
 
         self._connection = aioserial.AioSerial()
         self._connection.write_timeout = 0.0  # make writes non-blocking
+        self._connection = recorded_connection(self._connection, "pipettor")
 
     @property
     def is_connected(self) -> bool:
@@ -42,14 +48,20 @@ class PipettorBusRouterInterface:
         if self._connection.is_open:
             self._connection.close()
 
+    def set_timeout(self, timeout: float) -> None:
+        """Change the read timeout (in seconds), also on an open connection"""
+        self.timeout = timeout
+        if self._connection.timeout != timeout:
+            self._connection.timeout = timeout
+
     async def exchange(self, message: bytearray) -> Union[IOError, bytes]:
         """Send a request and receive a response on the interface connection"""
         if not self._connection.is_open:
             raise IOError("Pipettor controller not connected")
         # Write the message, not buffered and non-blocking (see __init__)
         self._connection.write(message)
-        # Get response (blocking)
-        resp = await self._connection.read_async(256)
+        # Get response (up to its carriage return, so that the exchange does not last until the timeout)
+        resp = await self._connection.read_until_async(b"\r", 256)
         return resp
 
     @staticmethod
@@ -60,6 +72,11 @@ class PipettorBusRouterInterface:
     @classmethod
     def find_and_connect(cls):
         """Find an attached Pipettor controller device and connect to it"""
+        if PIPETTOR_PORT:
+            conn = cls(PIPETTOR_PORT)
+            conn.connect()
+            return conn
+
         # Find ports with "Pipettor" in their description
         pipettor_ports = list(serial.tools.list_ports.grep("Pipettor.*"))
         if len(pipettor_ports) > 0:
@@ -69,13 +86,26 @@ class PipettorBusRouterInterface:
         else:
             raise ValueError("No Pipettor controller device found")
 
+    @classmethod
+    async def find_and_connect_async(cls):
+        """find_and_connect on the bus I/O thread pool (see blocking.py), the event loop keeps serving meanwhile"""
+        return await connect_in_executor(cls.find_and_connect)
+
 
 async def pipettor_bus_timed_exchange(req: PipettorRequest) -> tuple:
     """Return a tuple containing the response packet object
     and the elapsed time (in microseconds) to complete the exchange"""
     begin = time.time_ns()
-    conn = PipettorBusRouterInterface.find_and_connect()
+    key = ("pipettor", req.address, f"{req.command_hi:02x}{req.command_lo:02x}")
+    breaker = PIPETTOR_BREAKERS.get(req.address)
+    breaker.check()  # Fail fast when the module is known not to answer
+    conn = await PipettorBusRouterInterface.find_and_connect_async()
+    conn.set_timeout(PIPETTOR_LATENCY.timeout(key))
+    sent = time.perf_counter()
     resp = await conn.exchange(req.raw_packet)
+    timed_out = not resp.endswith(b"\r")
+    PIPETTOR_LATENCY.record(key, time.perf_counter() - sent, timed_out=timed_out)
+    breaker.record(timed_out)
     pkt = PipettorResponse.parse(resp)
     end = time.time_ns()
     elapsed = (end - begin) // 1000
@@ -0,0 +1,35 @@
+
+# Version: Test
+"""
+Thread pool of the blocking serial port operations.
+
+Enumerating the serial ports (comports) and opening a device block for milliseconds up to
+seconds (USB enumeration, driver open). find_and_connect_async of every bus interface runs
+find_and_connect on BUS_IO_EXECUTOR instead of the event loop, so requests that do not use
+the port (e.g. /serial-number/) are answered meanwhile. The pool is bounded: every bus opens
+its port under its own lock, BUS_IO_WORKERS only has to cover the buses opening together.
+"""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, TypeVar
+
+BUS_IO_WORKERS = 4
+BUS_IO_EXECUTOR = ThreadPoolExecutor(max_workers=BUS_IO_WORKERS, thread_name_prefix="bus-io")
+
+T = TypeVar("T")
+
+
+def _disconnect_when_opened(future: asyncio.Future) -> None:
+    if not future.cancelled() and future.exception() is None:
+        future.result().disconnect()
+
+
+async def connect_in_executor(connect: Callable[[], T]) -> T:
+    """Run a find_and_connect on the pool and return its connection. When the awaiting request is
+    cancelled the open still completes in its thread, the connection is then closed so the port is free"""
+    future = asyncio.get_running_loop().run_in_executor(BUS_IO_EXECUTOR, connect)
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        future.add_done_callback(_disconnect_when_opened)
+        raise
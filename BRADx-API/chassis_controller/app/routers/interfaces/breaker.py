@@ -0,0 +1,132 @@
+
+# Version: Test
+"""
+Circuit breakers that fail fast on modules that do not answer.
+
+A breaker per (bus, module) opens after BREAKER_THRESHOLD consecutive exchanges with the
+module timed out (module not populated or powered off). While it is open, exchanges with
+the module are rejected at once with ModuleUnavailable (503), without opening the port or
+waiting on the bus lock. After BREAKER_RESET_S one exchange is let through as a probe
+(half open): if the module answers the breaker closes, otherwise it opens again.
+"""
+import time
+from typing import Callable, Dict, Hashable
+
+BREAKER_THRESHOLD = 3
+BREAKER_RESET_S = 10.0
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+
+class ModuleUnavailable(Exception):
+    """Exchange rejected because the module's circuit breaker is open"""
+
+    def __init__(self, name: str, retry_after: float) -> None:
+        super().__init__(f"Module {name} is not responding, next attempt in {retry_after:.1f} s")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Circuit breaker of one module, see the module docstring"""
+
+    def __init__(
+        self,
+        name: str,
+        threshold: int = BREAKER_THRESHOLD,
+        reset_after: float = BREAKER_RESET_S,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.name = name
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._clock = clock
+        self.state = BREAKER_CLOSED
+        self.failures = 0  # Consecutive timeouts
+        self.opened_at = 0.0
+        self.probe_at = None  # Start of the probe in flight, if any
+        self.rejected = 0
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is let through"""
+        return max(0.0, self.opened_at + self.reset_after - self._clock())
+
+    @property
+    def is_open(self) -> bool:
+        """True when exchanges are rejected (open and not yet due for a probe), does not start a probe"""
+        if self.state == BREAKER_CLOSED:
+            return False
+        if self.state == BREAKER_OPEN:
+            return self.retry_after() > 0
+        return self.probe_at is not None and self._clock() - self.probe_at < self.reset_after
+
+    def allow(self) -> bool:
+        """Whether an exchange with the module may go ahead, starts a probe when one is due"""
+        if self.state == BREAKER_CLOSED:
+            return True
+        if self.is_open:
+            self.rejected += 1
+            return False
+        # Due for a probe (or the previous probe never completed)
+        self.state = BREAKER_HALF_OPEN
+        self.probe_at = self._clock()
+        return True
+
+    def check(self) -> None:
+        """Raise ModuleUnavailable unless an exchange with the module may go ahead"""
+        if not self.allow():
+            raise ModuleUnavailable(self.name, self.retry_after())
+
+    def record(self, timed_out: bool) -> None:
+        """Update the breaker with the outcome of an exchange"""
+        self.probe_at = None
+        if not timed_out:
+            self.state = BREAKER_CLOSED
+            self.failures = 0
+            return
+        self.failures += 1
+        if self.state == BREAKER_HALF_OPEN or self.failures >= self.threshold:
+            self.state = BREAKER_OPEN
+            self.opened_at = self._clock()
+
+    def as_dict(self) -> dict:
+        return {
+            "state": BREAKER_OPEN if self.is_open else self.state,
+            "failures": self.failures,
+            "rejected": self.rejected,
+            "retry_after_s": self.retry_after() if self.state != BREAKER_CLOSED else 0.0,
+        }
+
+
+class BusBreakers:
+    """Circuit breakers of the modules of one bus, created on first use"""
+
+    def __init__(self, bus: str) -> None:
+        self.bus = bus
+        self.breakers: Dict[Hashable, CircuitBreaker] = {}
+
+    def get(self, module: Hashable) -> CircuitBreaker:
+        breaker = self.breakers.get(module)
+        if breaker is None:
+            name = "/".join(str(m) for m in module) if isinstance(module, tuple) else str(module)
+            breaker = self.breakers[module] = CircuitBreaker(f"{self.bus}/{name}")
+        return breaker
+
+    def reset(self) -> None:
+        self.breakers.clear()
+
+    def snapshot(self) -> dict:
+        return {breaker.name: breaker.as_dict() for breaker in self.breakers.values()}
+
+
+BRADX_BREAKERS = BusBreakers("bradx")
+MEERSTETTER_BREAKERS = BusBreakers("meerstetter")
+PIPETTOR_BREAKERS = BusBreakers("pipettor")
+
+BUS_BREAKERS = {
+    "bradx": BRADX_BREAKERS,
+    "meerstetter": MEERSTETTER_BREAKERS,
+    "pipettor": PIPETTOR_BREAKERS,
+}
@@ -0,0 +1,159 @@
+
+# Version: Test
+"""
+Streaming exchange latency histograms and the adaptive timeouts derived from them.
+
+Every exchange on a bus is timed and added to the histogram of its (subsystem, module,
+command) key. Histograms have fixed log-spaced buckets (LATENCY_BUCKETS_PER_DECADE per
+decade from LATENCY_MIN_S to LATENCY_MAX_S) and are halved once they hold LATENCY_WINDOW
+samples, so they follow drift in the devices' response times with constant memory.
+
+The timeout of an exchange is LATENCY_TIMEOUT_FACTOR times the LATENCY_TIMEOUT_PERCENTILE
+of its key plus LATENCY_TIMEOUT_MARGIN_S, clamped to the bus's configured bounds. Until a
+key has LATENCY_MIN_SAMPLES samples the bus's default timeout is used, and every timeout
+in a row doubles the next one (up to the upper bound) so that a timeout that is too short
+recovers by itself. Commands whose latency depends on their arguments (BRADx motion
+commands) have a floor under their timeout, see BRADX_BUS_TIMEOUT_FLOORS.
+"""
+import math
+from bisect import bisect_left
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from chassis_controller.app.config.BRADx_config import (
+    BRADX_BUS_TIMEOUT_BOUNDS,
+    BRADX_BUS_TIMEOUT_FLOORS,
+    MEERSTETTER_BUS_TIMEOUT_BOUNDS,
+    PIPETTOR_BUS_TIMEOUT_BOUNDS,
+)
+
+LATENCY_MIN_S = 1e-4
+LATENCY_MAX_S = 100.0
+LATENCY_BUCKETS_PER_DECADE = 10
+LATENCY_WINDOW = 1000
+LATENCY_MIN_SAMPLES = 20
+LATENCY_TIMEOUT_PERCENTILE = 99.0
+LATENCY_TIMEOUT_FACTOR = 2.0
+LATENCY_TIMEOUT_MARGIN_S = 0.01
+
+# Upper bucket edges in seconds, the last bucket also holds anything slower
+LATENCY_BUCKET_EDGES = [
+    LATENCY_MIN_S * 10 ** (n / LATENCY_BUCKETS_PER_DECADE)
+    for n in range(1, round(math.log10(LATENCY_MAX_S / LATENCY_MIN_S) * LATENCY_BUCKETS_PER_DECADE) + 1)
+]
+
+
+class LatencyHistogram:
+    """Latencies of one kind of exchange, with the number of exchanges that timed out"""
+
+    def __init__(self) -> None:
+        self.counts = [0] * len(LATENCY_BUCKET_EDGES)
+        self.count = 0
+        self.max = 0.0
+        self.timeouts = 0
+        self.consecutive_timeouts = 0
+
+    def add(self, latency: float) -> None:
+        self.counts[min(bisect_left(LATENCY_BUCKET_EDGES, latency), len(self.counts) - 1)] += 1
+        self.count += 1
+        self.max = max(self.max, latency)
+        self.consecutive_timeouts = 0
+        if self.count >= LATENCY_WINDOW:
+            # Halve the counts so that recent exchanges weigh more
+            self.counts = [c // 2 for c in self.counts]
+            self.count = sum(self.counts)
+
+    def timed_out(self) -> None:
+        self.timeouts += 1
+        self.consecutive_timeouts += 1
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper edge of the bucket holding the q-th percentile, None when empty"""
+        if self.count == 0:
+            return None
+        rank = self.count * q / 100
+        total = 0
+        for edge, count in zip(LATENCY_BUCKET_EDGES, self.counts):
+            total += count
+            if total >= rank:
+                return edge
+        return LATENCY_BUCKET_EDGES[-1]
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "timeouts": self.timeouts,
+            "p50_s": self.percentile(50),
+            "p90_s": self.percentile(90),
+            "p99_s": self.percentile(99),
+            "max_s": self.max,
+            "buckets": {f"{edge:.4g}": count for edge, count in zip(LATENCY_BUCKET_EDGES, self.counts) if count},
+        }
+
+
+class LatencyTracker:
+    """Latency histograms of one bus by (subsystem, module, command), with their timeouts.
+    floors holds the lowest timeout of some commands (the last field of the keys)"""
+
+    def __init__(self, default: float, bounds: Tuple[float, float], floors: Optional[Dict[str, float]] = None) -> None:
+        self.bounds = bounds
+        self.default = min(max(default, bounds[0]), bounds[1])
+        self.floors = floors or {}
+        self.histograms: Dict[Hashable, LatencyHistogram] = {}
+
+    def histogram(self, key: Hashable) -> LatencyHistogram:
+        hist = self.histograms.get(key)
+        if hist is None:
+            hist = self.histograms[key] = LatencyHistogram()
+        return hist
+
+    def timeout(self, key: Hashable) -> float:
+        """Timeout (in seconds) for the next exchange of the key"""
+        hist = self.histograms.get(key)
+        floor = self.floors.get(key[-1], self.bounds[0]) if isinstance(key, tuple) and key else self.bounds[0]
+        if hist is None:
+            return min(max(self.default, floor), self.bounds[1])
+        if hist.count < LATENCY_MIN_SAMPLES:
+            timeout = self.default
+        else:
+            timeout = hist.percentile(LATENCY_TIMEOUT_PERCENTILE) * LATENCY_TIMEOUT_FACTOR + LATENCY_TIMEOUT_MARGIN_S
+        timeout *= 2 ** min(hist.consecutive_timeouts, 32)
+        return min(max(timeout, floor, self.bounds[0]), self.bounds[1])
+
+    def record(self, key: Hashable, latency: float, timed_out: bool = False) -> None:
+        """Add the latency (in seconds) of an exchange, or count it as timed out"""
+        if timed_out:
+            self.histogram(key).timed_out()
+        else:
+            self.histogram(key).add(latency)
+
+    def snapshot(self) -> dict:
+        return {
+            "bounds_s": list(self.bounds),
+            "default_s": self.default,
+            "exchanges": {
+                "/".join(str(k) for k in key): {**hist.as_dict(), "timeout_s": self.timeout(key)}
+                for key, hist in self.histograms.items()
+            },
+        }
+
+
+def bradx_latency_key(subsystem_id: int, module_id: int, data: str) -> tuple:
+    """Key of a BRADx bus request, the command is the third field of the request message"""
+    fields = data.split(",")
+    return (subsystem_id, module_id, fields[2] if len(fields) > 3 else "")
+
+
+def max_timeout(tracker: LatencyTracker, keys: List[Hashable]) -> float:
+    """Timeout for an exchange covering several keys"""
+    return max((tracker.timeout(key) for key in keys), default=tracker.default)
+
+
+BRADX_LATENCY = LatencyTracker(30.0, BRADX_BUS_TIMEOUT_BOUNDS, BRADX_BUS_TIMEOUT_FLOORS)
+MEERSTETTER_LATENCY = LatencyTracker(0.08, MEERSTETTER_BUS_TIMEOUT_BOUNDS)
+PIPETTOR_LATENCY = LatencyTracker(1.0, PIPETTOR_BUS_TIMEOUT_BOUNDS)
+
+BUS_LATENCY = {
+    "bradx": BRADX_LATENCY,
+    "meerstetter": MEERSTETTER_LATENCY,
+    "pipettor": PIPETTOR_LATENCY,
+}
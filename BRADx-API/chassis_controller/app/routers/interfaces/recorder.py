@@ -0,0 +1,185 @@
+
+# Version: Test
+"""
+Bus traffic recorder.
+
+While recording, the connections of the three bus interfaces are wrapped so that every
+frame written and read is logged with its monotonic timestamp (ns), its bus, its direction
+and the exchange ID of the request it belongs to (responses are matched to the requests in
+order, which also holds for pipelined exchanges). The exchange only queues the frame; a
+writer thread appends it to the log file.
+
+The log is append-only binary: RECORD_MAGIC once, then per frame a RECORD_HEADER
+(timestamp, bus, direction, exchange ID, length) followed by the frame's bytes. An empty
+read is a timed out exchange. See chassis_controller/emulators/replay.py to replay a log.
+"""
+import itertools
+import queue
+import struct
+import threading
+import time
+from collections import deque
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+RECORD_MAGIC = b"BRADXBUSLOG1\n"
+RECORD_HEADER = struct.Struct("<QBBIH")  # Timestamp (ns), bus, direction, exchange ID, length
+
+RECORD_BUSES = ["bradx", "meerstetter", "pipettor"]
+RECORD_WRITE = 0
+RECORD_READ = 1
+
+EXCHANGE_IDS = itertools.count(1)
+
+
+class BusRecord(NamedTuple):
+    time_ns: int
+    bus: str
+    direction: int
+    exchange_id: int
+    data: bytes
+
+
+class BusExchange(NamedTuple):
+    """A request and its response from a log (response is empty when the exchange timed out)"""
+
+    bus: str
+    exchange_id: int
+    sent_ns: int
+    request: bytes
+    received_ns: int
+    response: bytes
+
+
+class BusRecorder:
+    """Writes the frames queued by the recording connections to a log file, see the module docstring"""
+
+    def __init__(self) -> None:
+        self.path = None
+        self.records = 0
+        self._queue: Optional[queue.SimpleQueue] = None
+        self._thread = None
+
+    @property
+    def active(self) -> bool:
+        return self._queue is not None
+
+    def start(self, path: str) -> None:
+        """Start recording to the log file (appended to when it exists)"""
+        if self.active:
+            self.stop()
+        log = open(path, "ab")
+        if log.tell() == 0:
+            log.write(RECORD_MAGIC)
+        self.path = path
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._write, args=(log, self._queue), name="bus-recorder", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop recording, once every queued frame is written"""
+        if not self.active:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._queue = None
+        self._thread = None
+
+    def record(self, bus: str, direction: int, exchange_id: int, data: bytes) -> None:
+        if self._queue is not None:
+            self._queue.put((time.monotonic_ns(), RECORD_BUSES.index(bus), direction, exchange_id, bytes(data)))
+
+    def _write(self, log, frames: queue.SimpleQueue) -> None:
+        with log:
+            while True:
+                item = frames.get()
+                while item is not None:
+                    time_ns, bus, direction, exchange_id, data = item
+                    log.write(RECORD_HEADER.pack(time_ns, bus, direction, exchange_id, len(data)))
+                    log.write(data)
+                    self.records += 1
+                    try:
+                        item = frames.get_nowait()
+                    except queue.Empty:
+                        break
+                if item is None:
+                    return
+                log.flush()  # Caught up with the queue
+
+
+BUS_RECORDER = BusRecorder()
+
+
+class RecordingConnection:
+    """Serial connection wrapper logging the frames written and read to BUS_RECORDER"""
+
+    def __init__(self, connection, bus: str) -> None:
+        object.__setattr__(self, "_connection", connection)
+        object.__setattr__(self, "_bus", bus)
+        object.__setattr__(self, "_pending", deque())  # Exchange IDs of the requests waiting for a response
+
+    def __getattr__(self, name):
+        return getattr(self._connection, name)
+
+    def __setattr__(self, name, value):
+        setattr(self._connection, name, value)
+
+    def write(self, data):
+        written = self._connection.write(data)
+        exchange_id = next(EXCHANGE_IDS)
+        self._pending.append(exchange_id)
+        BUS_RECORDER.record(self._bus, RECORD_WRITE, exchange_id, data)
+        return written
+
+    def _received(self, data: bytes) -> bytes:
+        exchange_id = self._pending.popleft() if self._pending else 0
+        BUS_RECORDER.record(self._bus, RECORD_READ, exchange_id, data)
+        return data
+
+    def read(self, size: int = 1) -> bytes:
+        return self._received(self._connection.read(size))
+
+    async def read_async(self, size: int = 1) -> bytes:
+        return self._received(await self._connection.read_async(size))
+
+    async def read_until_async(self, expected: bytes = b"\n", size: Optional[int] = None) -> bytes:
+        return self._received(await self._connection.read_until_async(expected, size))
+
+    def reset_input_buffer(self) -> None:
+        self._pending.clear()
+        self._connection.reset_input_buffer()
+
+
+def recorded_connection(connection, bus: str):
+    """The connection, wrapped to log its traffic while BUS_RECORDER is recording"""
+    return RecordingConnection(connection, bus) if BUS_RECORDER.active else connection
+
+
+def read_log(path: str) -> Iterator[BusRecord]:
+    """Records of a log file, in the order they were written"""
+    with open(path, "rb") as log:
+        if log.read(len(RECORD_MAGIC)) != RECORD_MAGIC:
+            raise ValueError(f"{path} is not a bus traffic log")
+        while True:
+            header = log.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                return  # End of the log (or a record cut short by a crash)
+            time_ns, bus, direction, exchange_id, length = RECORD_HEADER.unpack(header)
+            data = log.read(length)
+            if len(data) < length:
+                return
+            yield BusRecord(time_ns, RECORD_BUSES[bus], direction, exchange_id, data)
+
+
+def log_exchanges(records) -> List[BusExchange]:
+    """Pair the requests of the records with their responses, in request order"""
+    requests: Dict[int, BusRecord] = {}
+    exchanges = {}
+    for record in records:
+        if record.direction == RECORD_WRITE:
+            requests[record.exchange_id] = record
+        elif record.exchange_id in requests:
+            request = requests.pop(record.exchange_id)
+            exchanges[record.exchange_id] = BusExchange(
+                record.bus, record.exchange_id, request.time_ns, request.data, record.time_ns, record.data
+            )
+    return [exchanges[exchange_id] for exchange_id in sorted(exchanges)]
@@ -1,9 +1,12 @@
 
 # Version: Test
+import binascii
 import random
 import re
 from enum import Enum
-from typing import List
+from typing import List, Optional
+
+from chassis_controller.app.config.BRADx_config import BRADX_RESPONSE_CRC_CHECK
 
 
 BUS_PACKET_START = "$"  # BRADx chassis controller message start flag
@@ -44,6 +47,7 @@ class BRADxBusPacket:
     resp_len: int
     data: str
     crc: int
+    retries: int  # Exchanges repeated to get this (response) packet
 
     def __init__(
         self,
@@ -56,6 +60,7 @@ class BRADxBusPacket:
     ):
         self.subsystem_id = subsystem_id
         self.module_id = module_id
+        self.retries = 0
         if data_cr and data[-1] != "\r":
             # Append carriage return to data if there isn't one
             data += "\r"
@@ -77,8 +82,13 @@ class BRADxBusPacket:
         return f"<BRADxBusPacket: {self.subsystem_id}, {self.module_id}, {self.packet_type.name}, '{self.data}'>"
 
     @classmethod
-    def parse(cls, data: bytes):
-        """Parse a set of bytes (usually a response packet) and convert to this class type"""
+    def parse(cls, data: bytes, check_crc: Optional[bool] = None):
+        """Parse a set of bytes (usually a response packet) and convert to this class type.
+        The CRC is taken to cover every byte between the start flag and the CRC itself, low byte first.
+        That layout is not verified against the firmware yet, so the CRC is only checked when check_crc
+        is set or, by default, when BRADX_RESPONSE_CRC_CHECK is enabled (see BRADx_config)."""
+        if check_crc is None:
+            check_crc = BRADX_RESPONSE_CRC_CHECK
         try:
             sof = chr(data[0])
             if sof != BUS_PACKET_START:
@@ -92,15 +102,15 @@ class BRADxBusPacket:
             subdata = data[6 : (resplen + 6)].decode("ascii")
             # CRC is the last two bytes before the carriage return
             crc = int.from_bytes(data[-3:-1], "little")
+            if check_crc and len(data) > 3 and crc16_ccitt(data[1:-3]) != crc:
+                raise ValueError(f"CRC check failed (got {crc:04x}, is {crc16_ccitt(data[1:-3]):04x})")
             # Create the object
             pkt = BRADxBusPacket(
                 subsystem_id, module_id, subdata, resplen, packet_type, data_cr=False
             )
-            # Check the crc
-            # if pkt.crc != crc:
-                # raise ValueError(f"CRC check failed (got {crc:02x}, is {pkt.crc:02x})")
-            # Replace the raw packet value with the data
+            # Replace the raw packet value and CRC with the received ones
             pkt.raw_packet = bytearray(data)
+            pkt.crc = crc
             return pkt
         except IndexError:
             raise ValueError("Incorrect packet structure (indexing error)")
@@ -167,13 +177,18 @@ class PipettorRequest:
         else:
             self.checksum = 0
 
-        # Build raw message string
-        self.raw = f"{address:01x} {command_lo} {command_hi} {self.data_lsb} {self.data_msb}"
-        self.raw += f"{self.checksum:01x}\r"
+        # Build raw message string (space separated hex tokens)
+        self.raw = f"{address:02X} {command_lo:02X} {command_hi:02X} {self.data_lsb:02X} {self.data_msb:02X}"
+        self.raw += f" {self.checksum:02X}\r"
 
     def __str__(self):
         return f"<PipettorRequest: {self.raw.strip()}>"
 
+    @property
+    def raw_packet(self) -> bytes:
+        """Raw message bytes sent on the pipettor bus"""
+        return self.raw.encode("ascii")
+
     @classmethod
     def parse(cls, msg: str, checksum: bool = True):
         """Check that the request message string has a valid format for the Pipettor system and convert it to an object"""
@@ -190,13 +205,13 @@ class PipettorRequest:
         command_hi = int(tokens[2], base=16)
         data_lsb   = int(tokens[3], base=16)
         data_msb   = int(tokens[4], base=16)
-        checksum   = int(tokens[5], base=16)
+        received   = int(tokens[5], base=16)
 
         data = (data_msb << 8) + data_lsb
         req = PipettorRequest(address, command_lo, command_hi, data)
 
-        if checksum and req.checksum != checksum:
-            raise ValueError(f"Checksum failed (got {checksum:01x}, is {req.checksum:01x})")
+        if checksum and req.checksum != received:
+            raise ValueError(f"Checksum failed (got {received:01x}, is {req.checksum:01x})")
 
         return req
 
@@ -218,8 +233,11 @@ class PipettorResponse:
         return f"<PipettorResponse: {self.raw.strip()}>"
 
     @classmethod
-    def parse(cls, msg: str):
-        """Check that the response message string has a valid format for the Pipettor system and convert it to an object"""
+    def parse(cls, msg: str, checksum: bool = False):
+        """Check that the response message string has a valid format for the Pipettor system and convert it to an object.
+        The checksum (sum of the address, error code and data bytes) is only verified when checksum is set"""
+        if isinstance(msg, (bytes, bytearray)):
+            msg = msg.decode("ascii", "replace")
         # Strip flags and tokenize comma separated message
         tokens = msg[0:].strip().split(" ")
         if len(tokens) != PIPETTOR_RESPONSE_NUM_TOKENS:
@@ -233,9 +251,13 @@ class PipettorResponse:
         resp.error_code = int(tokens[1], base=16)
         resp.data_lsb   = int(tokens[2], base=16)
         resp.data_msb   = int(tokens[3], base=16)
-        resp.data = (resp.data_msb >> 8) + resp.data_lsb
+        resp.data = (resp.data_msb << 8) + resp.data_lsb
 
         resp.checksum   = int(tokens[4], base=16)
+        if checksum:
+            expected = msg_checksum(bytearray([resp.address, resp.error_code, resp.data_lsb, resp.data_msb]))
+            if resp.checksum != expected:
+                raise ValueError(f"Checksum failed (got {resp.checksum:01x}, is {expected:01x})")
 
         return resp
 
@@ -422,53 +444,10 @@ class BRADXRawResponse:
 
 
 # CRC calculation using the CRC-16-CCITT algorithm parameters
-# polynomial: x^16 + x^12 + x^5 + 1
+# polynomial: x^16 + x^12 + x^5 + 1, initial value 0xFFFF (binascii's C implementation)
 # see: https://crccalc.com/?crc=123456789&method=CRC-16/CCITT-FALSE&datatype=ascii&outtype=0
-# fmt: off
-
-CRC_16_CCITT_LUT = [
-    0x0000, 0x1021, 0x2042, 0x3063, 0x4084, 0x50A5, 0x60C6, 0x70E7,
-    0x8108, 0x9129, 0xA14A, 0xB16B, 0xC18C, 0xD1AD, 0xE1CE, 0xF1EF,
-    0x1231, 0x0210, 0x3273, 0x2252, 0x52B5, 0x4294, 0x72F7, 0x62D6,
-    0x9339, 0x8318, 0xB37B, 0xA35A, 0xD3BD, 0xC39C, 0xF3FF, 0xE3DE,
-    0x2462, 0x3443, 0x0420, 0x1401, 0x64E6, 0x74C7, 0x44A4, 0x5485,
-    0xA56A, 0xB54B, 0x8528, 0x9509, 0xE5EE, 0xF5CF, 0xC5AC, 0xD58D,
-    0x3653, 0x2672, 0x1611, 0x0630, 0x76D7, 0x66F6, 0x5695, 0x46B4,
-    0xB75B, 0xA77A, 0x9719, 0x8738, 0xF7DF, 0xE7FE, 0xD79D, 0xC7BC,
-    0x48C4, 0x58E5, 0x6886, 0x78A7, 0x0840, 0x1861, 0x2802, 0x3823,
-    0xC9CC, 0xD9ED, 0xE98E, 0xF9AF, 0x8948, 0x9969, 0xA90A, 0xB92B,
-    0x5AF5, 0x4AD4, 0x7AB7, 0x6A96, 0x1A71, 0x0A50, 0x3A33, 0x2A12,
-    0xDBFD, 0xCBDC, 0xFBBF, 0xEB9E, 0x9B79, 0x8B58, 0xBB3B, 0xAB1A,
-    0x6CA6, 0x7C87, 0x4CE4, 0x5CC5, 0x2C22, 0x3C03, 0x0C60, 0x1C41,
-    0xEDAE, 0xFD8F, 0xCDEC, 0xDDCD, 0xAD2A, 0xBD0B, 0x8D68, 0x9D49,
-    0x7E97, 0x6EB6, 0x5ED5, 0x4EF4, 0x3E13, 0x2E32, 0x1E51, 0x0E70,
-    0xFF9F, 0xEFBE, 0xDFDD, 0xCFFC, 0xBF1B, 0xAF3A, 0x9F59, 0x8F78,
-    0x9188, 0x81A9, 0xB1CA, 0xA1EB, 0xD10C, 0xC12D, 0xF14E, 0xE16F,
-    0x1080, 0x00A1, 0x30C2, 0x20E3, 0x5004, 0x4025, 0x7046, 0x6067,
-    0x83B9, 0x9398, 0xA3FB, 0xB3DA, 0xC33D, 0xD31C, 0xE37F, 0xF35E,
-    0x02B1, 0x1290, 0x22F3, 0x32D2, 0x4235, 0x5214, 0x6277, 0x7256,
-    0xB5EA, 0xA5CB, 0x95A8, 0x8589, 0xF56E, 0xE54F, 0xD52C, 0xC50D,
-    0x34E2, 0x24C3, 0x14A0, 0x0481, 0x7466, 0x6447, 0x5424, 0x4405,
-    0xA7DB, 0xB7FA, 0x8799, 0x97B8, 0xE75F, 0xF77E, 0xC71D, 0xD73C,
-    0x26D3, 0x36F2, 0x0691, 0x16B0, 0x6657, 0x7676, 0x4615, 0x5634,
-    0xD94C, 0xC96D, 0xF90E, 0xE92F, 0x99C8, 0x89E9, 0xB98A, 0xA9AB,
-    0x5844, 0x4865, 0x7806, 0x6827, 0x18C0, 0x08E1, 0x3882, 0x28A3,
-    0xCB7D, 0xDB5C, 0xEB3F, 0xFB1E, 0x8BF9, 0x9BD8, 0xABBB, 0xBB9A,
-    0x4A75, 0x5A54, 0x6A37, 0x7A16, 0x0AF1, 0x1AD0, 0x2AB3, 0x3A92,
-    0xFD2E, 0xED0F, 0xDD6C, 0xCD4D, 0xBDAA, 0xAD8B, 0x9DE8, 0x8DC9,
-    0x7C26, 0x6C07, 0x5C64, 0x4C45, 0x3CA2, 0x2C83, 0x1CE0, 0x0CC1,
-    0xEF1F, 0xFF3E, 0xCF5D, 0xDF7C, 0xAF9B, 0xBFBA, 0x8FD9, 0x9FF8,
-    0x6E17, 0x7E36, 0x4E55, 0x5E74, 0x2E93, 0x3EB2, 0x0ED1, 0x1EF0,
-]
-# fmt: on
-
-
 def crc16_ccitt(buf: bytearray) -> int:
-    crc = 0xFFFF
-    for byte in buf:
-        crc = (crc << 8) ^ CRC_16_CCITT_LUT[(crc >> 8) ^ byte]
-        crc &= 0xFFFF  # truncate to 16 bits
-    return crc
+    return binascii.crc_hqx(buf, 0xFFFF)
 
 
 def msg_checksum(buf: bytearray) -> int:
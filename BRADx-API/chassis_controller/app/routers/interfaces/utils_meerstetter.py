@@ -4,58 +4,18 @@
 Adaptation of MeCom (https://github.com/spomjaksilp/pyMeCom) for integration with AVANT API. 
 Data structures and low level comm values were kept and wrapped with
 the MeerstetterBusPacket class.
-CRC_16_CCITT_XMODEM replaced pycrc
+binascii.crc_hqx (CRC-16/XMODEM) replaced pycrc
 % is used for control type instead of #
 """
 
+import binascii
 from struct import pack, unpack
 from enum import Enum
 from math import isnan
 
 
-CRC_16_CCITT_XMODEM = [
-    0x0000, 0x1021, 0x2042, 0x3063, 0x4084, 0x50a5, 0x60c6, 0x70e7, 
-    0x8108, 0x9129, 0xa14a, 0xb16b, 0xc18c, 0xd1ad, 0xe1ce, 0xf1ef, 
-    0x1231, 0x0210, 0x3273, 0x2252, 0x52b5, 0x4294, 0x72f7, 0x62d6, 
-    0x9339, 0x8318, 0xb37b, 0xa35a, 0xd3bd, 0xc39c, 0xf3ff, 0xe3de, 
-    0x2462, 0x3443, 0x0420, 0x1401, 0x64e6, 0x74c7, 0x44a4, 0x5485, 
-    0xa56a, 0xb54b, 0x8528, 0x9509, 0xe5ee, 0xf5cf, 0xc5ac, 0xd58d, 
-    0x3653, 0x2672, 0x1611, 0x0630, 0x76d7, 0x66f6, 0x5695, 0x46b4, 
-    0xb75b, 0xa77a, 0x9719, 0x8738, 0xf7df, 0xe7fe, 0xd79d, 0xc7bc, 
-    0x48c4, 0x58e5, 0x6886, 0x78a7, 0x0840, 0x1861, 0x2802, 0x3823, 
-    0xc9cc, 0xd9ed, 0xe98e, 0xf9af, 0x8948, 0x9969, 0xa90a, 0xb92b, 
-    0x5af5, 0x4ad4, 0x7ab7, 0x6a96, 0x1a71, 0x0a50, 0x3a33, 0x2a12, 
-    0xdbfd, 0xcbdc, 0xfbbf, 0xeb9e, 0x9b79, 0x8b58, 0xbb3b, 0xab1a, 
-    0x6ca6, 0x7c87, 0x4ce4, 0x5cc5, 0x2c22, 0x3c03, 0x0c60, 0x1c41, 
-    0xedae, 0xfd8f, 0xcdec, 0xddcd, 0xad2a, 0xbd0b, 0x8d68, 0x9d49, 
-    0x7e97, 0x6eb6, 0x5ed5, 0x4ef4, 0x3e13, 0x2e32, 0x1e51, 0x0e70, 
-    0xff9f, 0xefbe, 0xdfdd, 0xcffc, 0xbf1b, 0xaf3a, 0x9f59, 0x8f78, 
-    0x9188, 0x81a9, 0xb1ca, 0xa1eb, 0xd10c, 0xc12d, 0xf14e, 0xe16f, 
-    0x1080, 0x00a1, 0x30c2, 0x20e3, 0x5004, 0x4025, 0x7046, 0x6067, 
-    0x83b9, 0x9398, 0xa3fb, 0xb3da, 0xc33d, 0xd31c, 0xe37f, 0xf35e, 
-    0x02b1, 0x1290, 0x22f3, 0x32d2, 0x4235, 0x5214, 0x6277, 0x7256, 
-    0xb5ea, 0xa5cb, 0x95a8, 0x8589, 0xf56e, 0xe54f, 0xd52c, 0xc50d, 
-    0x34e2, 0x24c3, 0x14a0, 0x0481, 0x7466, 0x6447, 0x5424, 0x4405, 
-    0xa7db, 0xb7fa, 0x8799, 0x97b8, 0xe75f, 0xf77e, 0xc71d, 0xd73c, 
-    0x26d3, 0x36f2, 0x0691, 0x16b0, 0x6657, 0x7676, 0x4615, 0x5634, 
-    0xd94c, 0xc96d, 0xf90e, 0xe92f, 0x99c8, 0x89e9, 0xb98a, 0xa9ab, 
-    0x5844, 0x4865, 0x7806, 0x6827, 0x18c0, 0x08e1, 0x3882, 0x28a3, 
-    0xcb7d, 0xdb5c, 0xeb3f, 0xfb1e, 0x8bf9, 0x9bd8, 0xabbb, 0xbb9a, 
-    0x4a75, 0x5a54, 0x6a37, 0x7a16, 0x0af1, 0x1ad0, 0x2ab3, 0x3a92, 
-    0xfd2e, 0xed0f, 0xdd6c, 0xcd4d, 0xbdaa, 0xad8b, 0x9de8, 0x8dc9, 
-    0x7c26, 0x6c07, 0x5c64, 0x4c45, 0x3ca2, 0x2c83, 0x1ce0, 0x0cc1, 
-    0xef1f, 0xff3e, 0xcf5d, 0xdf7c, 0xaf9b, 0xbfba, 0x8fd9, 0x9ff8, 
-    0x6e17, 0x7e36, 0x4e55, 0x5e74, 0x2e93, 0x3eb2, 0x0ed1, 0x1ef0
-]
-# fmt: on
-
 def crc16_ccitt_xmodem(buf: bytearray) -> int:
-
-    crc = 0x0000
-    for byte in buf:
-        crc = (crc << 8) ^ CRC_16_CCITT_XMODEM[(crc >> 8) ^ byte]
-        crc &= 0xFFFF  # truncate to 16 bits
-    return crc
+    return binascii.crc_hqx(buf, 0x0000)
 
 
 """
@@ -73,12 +33,14 @@ TEC_DEVICE_STATUSES = {
     }
 
 
+# access: "r" (default) read only, "rw" can be written with VS
+# min/max: range accepted by the API for writes (the device may apply tighter limits)
 TEC_PARAMETERS = [
     # Device Identification
     {"id": 103, "name": "Firmware Version", "format": "INT32"},
     {"id": 104, "name": "Device Status", "format": "INT32"},
     {"id": 105, "name": "Error Number", "format": "INT32"},
-    {"id": 108, "name": "Save Data to Flash", "format": "INT32"}, # 0: Enabled, 1: Disabled
+    {"id": 108, "name": "Save Data to Flash", "format": "INT32", "access": "rw", "min": 0, "max": 1}, # 0: Enabled, 1: Disabled
     {"id": 109, "name": "Flash Status", "format": "INT32"},
 
     # Chx Temperature Measurement (Read only)
@@ -99,58 +61,58 @@ TEC_PARAMETERS = [
     {"id": 1200, "name": "Temperature is Stable", "format": "INT32"},
 
     # CHx Output Stage Enabled
-    {"id": 2010, "name": "Status", "format": "INT32"},
-    {"id": 2030, "name": "Current Limitation", "format": "FLOAT32"},
-    {"id": 2031, "name": "Voltage Limitation", "format": "FLOAT32"},
-    {"id": 2032, "name": "Current Error Threshold", "format": "FLOAT32"},
-    {"id": 2033, "name": "Voltage Error Threshold", "format": "FLOAT32"},
+    {"id": 2010, "name": "Status", "format": "INT32", "access": "rw", "min": 0, "max": 3}, # 0: Static off, 1: Static on, 2: Live off/on, 3: HW enable
+    {"id": 2030, "name": "Current Limitation", "format": "FLOAT32", "access": "rw", "min": 0},
+    {"id": 2031, "name": "Voltage Limitation", "format": "FLOAT32", "access": "rw", "min": 0},
+    {"id": 2032, "name": "Current Error Threshold", "format": "FLOAT32", "access": "rw", "min": 0},
+    {"id": 2033, "name": "Voltage Error Threshold", "format": "FLOAT32", "access": "rw", "min": 0},
 
-    # Device Address
+    # Device Address (read only here, a new address would cut the heater off from MEERSTETTER_BUS_ADDR)
     {"id": 2051, "name": "Device Address", "format": "INT32"},
 
     # CHx Nominal Temperature
-    {"id": 3000, "name": "Target Object Temp (Set)", "format": "FLOAT32"},
+    {"id": 3000, "name": "Target Object Temp (Set)", "format": "FLOAT32", "access": "rw", "min": -999, "max": 999},
 
     # CHx Temperature Controller PID Values
-    {"id": 3010, "name": "Kp", "format": "FLOAT32"},
-    {"id": 3011, "name": "Ti", "format": "FLOAT32"},
-    {"id": 3012, "name": "Td", "format": "FLOAT32"},
+    {"id": 3010, "name": "Kp", "format": "FLOAT32", "access": "rw", "min": 0, "max": 999.999},
+    {"id": 3011, "name": "Ti", "format": "FLOAT32", "access": "rw", "min": 0, "max": 99999},
+    {"id": 3012, "name": "Td", "format": "FLOAT32", "access": "rw", "min": 0, "max": 999.999},
 
     # CHx Actual Object Temperature Error Limits
-    {"id": 4011, "name": "Object Upper Error Threshold", "format": "FLOAT32"},
-    {"id": 4010, "name": "Object Lower Error Threshold", "format": "FLOAT32"},
+    {"id": 4011, "name": "Object Upper Error Threshold", "format": "FLOAT32", "access": "rw", "min": -999, "max": 999},
+    {"id": 4010, "name": "Object Lower Error Threshold", "format": "FLOAT32", "access": "rw", "min": -999, "max": 999},
     
     # CHx Actual Sink Temperature Error Limits
-    {"id": 5011, "name": "Sink Upper Error Threshold", "format": "FLOAT32"},
-    {"id": 5010, "name": "Sink Lower Error Threshold", "format": "FLOAT32"},
+    {"id": 5011, "name": "Sink Upper Error Threshold", "format": "FLOAT32", "access": "rw", "min": -999, "max": 999},
+    {"id": 5010, "name": "Sink Lower Error Threshold", "format": "FLOAT32", "access": "rw", "min": -999, "max": 999},
     
-    {"id": 6100, "name": "GPIO Function", "format": "INT32"},
-    {"id": 6101, "name": "GPIO Level Assignment", "format": "INT32"},
-    {"id": 6102, "name": "GPIO Hardware Configuration", "format": "INT32"},
-    {"id": 6103, "name": "GPIO Channel", "format": "INT32"},
+    {"id": 6100, "name": "GPIO Function", "format": "INT32", "access": "rw"},
+    {"id": 6101, "name": "GPIO Level Assignment", "format": "INT32", "access": "rw"},
+    {"id": 6102, "name": "GPIO Hardware Configuration", "format": "INT32", "access": "rw"},
+    {"id": 6103, "name": "GPIO Channel", "format": "INT32", "access": "rw"},
 
     # Advanced Fan
-    {"id": 6200, "name": "Fan Control Enable", "format": "INT32"},
+    {"id": 6200, "name": "Fan Control Enable", "format": "INT32", "access": "rw", "min": 0, "max": 1},
 
     # CHx Fan Temperature Controller
-    {"id": 6211, "name": "Target Temperature", "format": "FLOAT32"},
+    {"id": 6211, "name": "Target Temperature", "format": "FLOAT32", "access": "rw", "min": -999, "max": 999},
     #{"id": 6211, "name": "Fan Target Temperature", "format": "FLOAT32"},
 
     # CHx Fan Speed Control
-    {"id": 6220, "name": "0% Speed", "format": "FLOAT32"},
-    {"id": 6221, "name": "100% Speed", "format": "FLOAT32"},
-
-    {"id": 6300, "name": "Source Selection", "format": "INT32"},
-    {"id": 6302, "name": "Observe Mode", "format": "INT32"},
-    {"id": 6310, "name": "Delay till Restart", "format": "FLOAT32"},
-    {"id": 52100, "name": "Enable Function", "format": "INT32"},
-    {"id": 52101, "name": "Set Output to Push-Pull", "format": "INT32"},
-    {"id": 52102, "name": "Set Output States", "format": "INT32"},
+    {"id": 6220, "name": "0% Speed", "format": "FLOAT32", "access": "rw", "min": 0},
+    {"id": 6221, "name": "100% Speed", "format": "FLOAT32", "access": "rw", "min": 0},
+
+    {"id": 6300, "name": "Source Selection", "format": "INT32", "access": "rw"},
+    {"id": 6302, "name": "Observe Mode", "format": "INT32", "access": "rw"},
+    {"id": 6310, "name": "Delay till Restart", "format": "FLOAT32", "access": "rw", "min": 0},
+    {"id": 52100, "name": "Enable Function", "format": "INT32", "access": "rw"},
+    {"id": 52101, "name": "Set Output to Push-Pull", "format": "INT32", "access": "rw"},
+    {"id": 52102, "name": "Set Output States", "format": "INT32", "access": "rw"},
     {"id": 52103, "name": "Read Input States", "format": "INT32"},
 
-    {"id": 50000, "name": "Live Enable", "format": "INT32"},
+    {"id": 50000, "name": "Live Enable", "format": "INT32", "access": "rw", "min": 0, "max": 1},
 
-    {"id": 52200, "name": "External Object Temperature", "format": "FLOAT32"},
+    {"id": 52200, "name": "External Object Temperature", "format": "FLOAT32", "access": "rw", "min": -999, "max": 999},
 ]
 
     
@@ -205,6 +167,8 @@ MEERSTETTER_ERRORS = {
     106: "Residual current too high. The Current difference between OUT+ and OUTis too big.",
     107: "Overall current monitoring, triggers fast switch off withint 10 microseconds ",
     108: "Output Stage saturation error. Check input current is sufficient and Vout not set too close to Vin. Try to reduce the 'Current Limitation' in the 'Operation' tab.",
+    140: "Measured object temperature too low",
+    141: "Measured object temperature too high",
     142: "Measured sink temperature too low",
     143: "Measured sink temperature too high",
     175: "The Fan does not reach the desired rotation speed.",
@@ -257,6 +221,33 @@ class Parameter(object):
         self.id = parameter_dict["id"]
         self.name = parameter_dict["name"]
         self.format = parameter_dict["format"]
+        self.access = parameter_dict.get("access", "r")
+        self.min = parameter_dict.get("min")
+        self.max = parameter_dict.get("max")
+
+    @property
+    def writable(self):
+        return self.access == "rw"
+
+    def check_value(self, value):
+        """
+        Returns the value converted to the parameter format, raises a ValueError if the
+        parameter is read only or the value is out of range.
+        :param value: int or float
+        :return: int or float
+        """
+        if not self.writable:
+            raise ValueError(f"Parameter {self.name} is read only")
+        if (self.min is not None and value < self.min) or (self.max is not None and value > self.max):
+            raise ValueError(f"Value {value} out of range [{self.min}, {self.max}] for {self.name}")
+        if self.format == "INT32":
+            if value != int(value):
+                raise ValueError(f"Parameter {self.name} requires an integer value")
+            return int(value)
+        return float(value)
+
+    def as_dict(self):
+        return {"id": self.id, "name": self.name, "format": self.format, "access": self.access, "min": self.min, "max": self.max}
 
 
 class Error(object):
@@ -303,6 +294,12 @@ class ParameterList(object):
                 self._PARAMETERS.append(Parameter(parameter))
         else:
             raise UnknownMeComType
+        # Indexes for constant time lookups
+        self._BY_ID = {parameter.id: parameter for parameter in self._PARAMETERS}
+        self._BY_NAME = {parameter.name: parameter for parameter in self._PARAMETERS}
+
+    def __iter__(self):
+        return iter(self._PARAMETERS)
 
     def get_by_id(self, id):
         """
@@ -310,10 +307,10 @@ class ParameterList(object):
         :param id: int
         :return: Parameter()
         """
-        for parameter in self._PARAMETERS:
-            if parameter.id == id:
-                return parameter
-        raise UnknownParameter
+        try:
+            return self._BY_ID[id]
+        except KeyError:
+            raise UnknownParameter
 
     def get_by_name(self, name):
         """
@@ -321,10 +318,10 @@ class ParameterList(object):
         :param name: str
         :return: Parameter()
         """
-        for parameter in self._PARAMETERS:
-            if parameter.name == name:
-                return parameter
-        raise UnknownParameter
+        try:
+            return self._BY_NAME[name]
+        except KeyError:
+            raise UnknownParameter
 
 
 class MeFrame(object):
@@ -428,6 +425,9 @@ class Query(MeFrame):
 
         self.ADDRESS = address
         self.SEQUENCE = sequence
+        if not 1 <= parameter_instance <= 0xFF:
+            raise ValueError(f"Parameter instance {parameter_instance} out of range [1, 255]")
+        self.INSTANCE = parameter_instance
         if parameter is not None:
             # UNIT16 4 hex digits
             self.PAYLOAD.append("{:04X}".format(parameter.id))
@@ -751,13 +751,15 @@ class MeerstetterBusPacket:
         sequence : int = 1, 
         parameter : str = "",
         value : float = 0,
+        parameter_instance : int = 1,
     ):
         self.sequence = sequence 
         self.address = address 
         self.packet_type = packet_type
 
-        self.parameter_instance = 1 # Magic number? 1 in all examples
+        self.parameter_instance = parameter_instance # Channel of multi-channel controllers, 1 on single channel ones
         self.data = 0 # Holds response payload if applicable
+        self.error = None # Holds the reason the response could not be used, if any
 
         # Initialize the query object and build the raw packet
         if self.packet_type == MeerstetterBusPacketType.GET_PARAMETER:
@@ -816,5 +818,6 @@ class MeerstetterBusPacket:
                pass 
 
         except Exception as e:
+            self.error = str(e) or type(e).__name__
             print(e)
 
@@ -0,0 +1,36 @@
+
+# Version: Test
+import time
+
+from fastapi import APIRouter
+
+from chassis_controller.app.inventory.registry import DEVICE_INVENTORY
+
+router = APIRouter(
+    prefix="/inventory",
+    tags=["inventory"],
+    dependencies=[],
+    responses={404: {"description": "Not found"}},
+)
+
+
+@router.get("/", response_model=dict, tags=["inventory"])
+async def get_inventory(refresh: bool = False):
+    """
+    Returns the firmware version and identification of every module on the buses.
+    Values are served from the device inventory, only missing or expired entries are read
+    from the devices (all of them with refresh).
+    \n
+    Parameters:\n
+        - refresh (bool): read every device again\n
+    Returns:\n
+        - _duration_us (int): elapsed time in microseconds\n
+        - response (dict): bus, value and age (or last error) by device
+    """
+    begin = time.perf_counter_ns()
+    await DEVICE_INVENTORY.refresh(stale_only=not refresh)
+    return {
+        "_duration_us": (time.perf_counter_ns() - begin) // 1000,
+        "ttl_s": DEVICE_INVENTORY.ttl,
+        "response": DEVICE_INVENTORY.snapshot(),
+    }
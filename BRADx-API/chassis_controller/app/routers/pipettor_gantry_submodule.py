@@ -1,5 +1,6 @@
 
 # Version: Test
+from functools import partial
 from fastapi import APIRouter, HTTPException, Query
 from chassis_controller.app.routers.interfaces.utils import convert_distance_str_to_steps
 from chassis_controller.app.config.BRADx_config import *
@@ -13,6 +14,7 @@ from .interfaces.utils import (
 )
 from chassis_controller.app.routers.interfaces.BRADxBus import bradx_bus_timed_exchange
 from chassis_controller.app.routers.interfaces.PipettorBus import pipettor_bus_timed_exchange
+from chassis_controller.app.inventory.registry import BRADX_BUS, DEVICE_INVENTORY
 
 # Subsystem ID when accessed through the chassis/bus module
 PIPETTOR_GANTRY_SUBSYSTEM_ID = 0x01
@@ -25,38 +27,50 @@ router = APIRouter(
 )
 
 
-@router.get("/axis/version/{id}")
-async def get_version(id: int):
-    """Returns the version info of the given axis"""
-    if id not in [
-        PIPETTOR_X_MOTOR,
-        PIPETTOR_Y_MOTOR,
-        PIPETTOR_Z_MOTOR,
-        PIPETTOR_DRIP_MOTOR,
-        PIPETTOR_AIR_SYSTEM,
-        TEST
-    ]:
-        raise HTTPException(
-            status_code=500, detail=f"Motor axis at ID {id} not available"
-        )
+# Axes whose versions are kept in the device inventory
+PIPETTOR_VERSION_AXES = [
+    PIPETTOR_X_MOTOR,
+    PIPETTOR_Y_MOTOR,
+    PIPETTOR_Z_MOTOR,
+    PIPETTOR_DRIP_MOTOR,
+    PIPETTOR_AIR_SYSTEM,
+]
+
+async def fetch_axis_version(id: int) -> tuple:
+    """Read the version info of the given axis, returns (version, message, elapsed)"""
     # Build the request message and packet
     message = BRADXRequest(PIPETTOR_BUS_ADDR[id], rand_request_id(), "?ver", [])
     req = BRADxBusPacket(
         PIPETTOR_GANTRY_SUBSYSTEM_ID, id, message.raw, 25, BRADxBusPacketType.REQUEST
     )
     # Send the request and get the response
+    pkt, elapsed = await bradx_bus_timed_exchange(req)
+    version = pkt.data
+    return ("v"+version[8]+"."+version[9]+"."+version[10], message.raw.strip(), elapsed)
+
+for axis in PIPETTOR_VERSION_AXES:
+    DEVICE_INVENTORY.register(f"pipettor_gantry/axis/{axis}", partial(fetch_axis_version, axis), BRADX_BUS)
+
+@router.get("/axis/version/{id}")
+async def get_version(id: int, refresh: bool = False):
+    """Returns the version info of the given axis (from the device inventory unless refresh is set)"""
+    if id not in PIPETTOR_VERSION_AXES + [TEST]:
+        raise HTTPException(
+            status_code=500, detail=f"Motor axis at ID {id} not available"
+        )
     try:
-        pkt, elapsed = await bradx_bus_timed_exchange(req)
-        version = pkt.data
-        print("version: "+pkt.data+"\n\n")
+        if id in PIPETTOR_VERSION_AXES:
+            version, message, elapsed = await DEVICE_INVENTORY.lookup(f"pipettor_gantry/axis/{id}", refresh)
+        else:
+            version, message, elapsed = await fetch_axis_version(id)
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
     return {
         "_sid": PIPETTOR_GANTRY_SUBSYSTEM_ID,
         "_mid": id,
         "_duration_us": elapsed,
-        "message": message.raw.strip(),
-        "version": "v"+version[8]+"."+version[9]+"."+version[10]
+        "message": message,
+        "version": version
     }
 
 @router.get("/axis/position/{id}")
@@ -1,5 +1,6 @@
 
 # Version: Test
+from functools import partial
 from fastapi import APIRouter, HTTPException, Query
 from chassis_controller.app.routers.interfaces.utils import convert_distance_str_to_steps
 from chassis_controller.app.config.BRADx_config import *
@@ -18,6 +19,7 @@ from chassis_controller.app.routers.interfaces.utils_meerstetter import (
 
 from chassis_controller.app.routers.interfaces.BRADxBus import bradx_bus_timed_exchange
 from chassis_controller.app.routers.interfaces.MeerstetterBus import meerstetter_bus_timed_exchange
+from chassis_controller.app.inventory.registry import BRADX_BUS, DEVICE_INVENTORY
 
 
 router = APIRouter(
@@ -31,42 +33,53 @@ router = APIRouter(
 READER_SUBSYSTEM_ID = 0x03
 
 
-@router.get("/axis/version/{id}")
-async def get_version(id: int):
-    """Returns the version info of the given axis"""
-    if id not in [
-        READER_X_AXIS,       
-        READER_Y_AXIS,       
-        READER_Z_AXIS,       
-        READER_FILTER_WHEEL,  
-        READER_TRAY_AB,    
-        READER_TRAY_CD,     
-        READER_HEATER_CA,
-        READER_HEATER_CB,
-        READER_HEATER_CC,
-        READER_HEATER_CD,
-        READER_LED
-    ]:
-        raise HTTPException(
-            status_code=500, detail=f"Motor axis at ID {id} not available"
-        )
+# Axes whose versions are kept in the device inventory
+READER_VERSION_AXES = [
+    READER_X_AXIS,       
+    READER_Y_AXIS,       
+    READER_Z_AXIS,       
+    READER_FILTER_WHEEL,  
+    READER_TRAY_AB,    
+    READER_TRAY_CD,     
+    READER_HEATER_CA,
+    READER_HEATER_CB,
+    READER_HEATER_CC,
+    READER_HEATER_CD,
+    READER_LED
+]
+
+async def fetch_axis_version(id: int) -> tuple:
+    """Read the version info of the given axis, returns (version, message, elapsed)"""
     # Build the request message and packet
     message = BRADXRequest(READER_BUS_ADDR[id], rand_request_id(), "?ver", [])
     req = BRADxBusPacket(
         READER_SUBSYSTEM_ID, id, message.raw, 25, BRADxBusPacketType.REQUEST
     )
     # Send the request and get the response
+    pkt, elapsed = await bradx_bus_timed_exchange(req)
+    version = pkt.data
+    return ("v"+version[8]+"."+version[9]+"."+version[10], message.raw.strip(), elapsed)
+
+for axis in READER_VERSION_AXES:
+    DEVICE_INVENTORY.register(f"reader/axis/{axis}", partial(fetch_axis_version, axis), BRADX_BUS)
+
+@router.get("/axis/version/{id}")
+async def get_version(id: int, refresh: bool = False):
+    """Returns the version info of the given axis (from the device inventory unless refresh is set)"""
+    if id not in READER_VERSION_AXES:
+        raise HTTPException(
+            status_code=500, detail=f"Motor axis at ID {id} not available"
+        )
     try:
-        pkt, elapsed = await bradx_bus_timed_exchange(req)
-        version = pkt.data
+        version, message, elapsed = await DEVICE_INVENTORY.lookup(f"reader/axis/{id}", refresh)
     except ValueError as e:
         raise HTTPException(status_code=500, detail=str(e))
     return {
         "_sid": READER_SUBSYSTEM_ID,
         "_mid": id,
         "_duration_us": elapsed,
-        "message": message.raw.strip(),
-        "response": "v"+version[8]+"."+version[9]+"."+version[10]
+        "message": message,
+        "response": version
     }
 
 @router.get("/axis/position/{id}")
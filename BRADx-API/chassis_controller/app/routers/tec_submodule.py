@@ -1,27 +1,37 @@
 
 # Version: Test
-from re import S
-from urllib import response
-from fastapi import APIRouter, HTTPException, Query
-from chassis_controller.app.routers.interfaces.utils import convert_distance_str_to_steps
+import time
+from enum import Enum
+from functools import partial
+from typing import List, Optional
+from fastapi import APIRouter, Header, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from chassis_controller.app.config.BRADx_config import *
 
-from .interfaces.utils import (
-    BRADXRequest,
-    BRADxBusPacket,
-    BRADxBusPacketType,
-    rand_request_id,
-)
+from .interfaces.utils import rand_request_id
 
 from chassis_controller.app.routers.interfaces.utils_meerstetter import (
     MeerstetterBusPacket, 
     MeerstetterBusPacketType,
     TEC_DEVICE_STATUSES,
+    TEC_PARAMETER_LIST,
     MEERSTETTER_ERRORS,
+    UnknownParameter,
 )
 
-from chassis_controller.app.routers.interfaces.BRADxBus import bradx_bus_timed_exchange
-from chassis_controller.app.routers.interfaces.MeerstetterBus import meerstetter_bus_timed_exchange
+from chassis_controller.app.tec.profile import PROFILE_RUNS, TemperatureProfile, start_profile
+from chassis_controller.app.tec.group import ALL_HEATERS, GroupError, GroupProgram, HeaterGroup, start_group_program
+from chassis_controller.app.tec.wait import wait_stable
+from chassis_controller.app.tec.config_cache import TEC_CONFIG_CACHE, tec_config_exchange
+from chassis_controller.app.tec.config_apply import TEC_CONFIG_PARAMETERS, ConfigRejected, TecConfigDocument, apply_config
+from chassis_controller.app.tec.watcher import TEC_WATCHER
+from chassis_controller.app.tec.autotune import AutotuneRequest, AutotuneRun, start_autotune
+from chassis_controller.app.tec.capture import CAPTURE_RUNS, CaptureRequest, start_capture
+from chassis_controller.app.tec.analytics import ANALYTICS_BAND
+from chassis_controller.app.tec.eta import TEC_ETA
+from chassis_controller.app.tec.bus import HEATER_IDS, heater_address, heater_id, read_parameter_instances, read_parameters
+from chassis_controller.app.routers.interfaces.MeerstetterBus import meerstetter_bus_timed_exchanges
+from chassis_controller.app.inventory.registry import DEVICE_INVENTORY, MEERSTETTER_BUS
 
 
 router = APIRouter(
@@ -35,220 +45,302 @@ router = APIRouter(
 READER_SUBSYSTEM_ID = 0x03
 
 # NOTE: TEC_PARAMETERS that are taken from the TEC commands doc are located in /routers/interface/utils_meerstetter.py
+# Reads and writes of single parameters go through the generic /tec/param/{name} engine below, the original
+# per-parameter URLs (/tec/Kp/, /tec/object-temperature/, ...) are aliases defined in the tables that follow.
+# They answer with the same body as the former per-parameter handlers. A URL that is not an alias is rejected
+# by the alias enums with a 422 (it was a 404 when every alias had its own route).
+
+
+def format_temperature_is_stable(data) -> str:
+    if data == 0:
+        return "Temperature regulation is not active"
+    elif data == 1:
+        return "Is not stable"
+    return "Is stable"
+
+
+def format_firmware_version(data) -> str:
+    return str(data)[:-2] + "." + str(data)[-2:]
+
+
+# GET alias URL -> (TEC parameter, response format)
+TEC_GET_ALIASES = {
+    "object-temperature": ("Object Temperature", str),
+    "sink-temperature": ("Sink Temperature", str),
+    "target-object-temperature": ("Target Object Temperature", str),
+    "actual-output-current": ("Actual Output Current", str),
+    "actual-output-voltage": ("Actual Output Voltage", str),
+    "relative-cooling-power": ("Relative Cooling Power", str),
+    "actual-fan-speed": ("Actual Fan Speed", str),
+    "target-fan-temperature": ("Target Temperature", str),
+    "current-error-threshold": ("Current Error Threshold", str),
+    "voltage-error-threshold": ("Voltage Error Threshold", str),
+    "object-upper-error-threshold": ("Object Upper Error Threshold", str),
+    "object-lower-error-threshold": ("Object Lower Error Threshold", str),
+    "sink-upper-error-threshold": ("Sink Upper Error Threshold", str),
+    "sink-lower-error-threshold": ("Sink Lower Error Threshold", str),
+    "temperature-is-stable": ("Temperature is Stable", format_temperature_is_stable),
+    "temperature-control": ("Status", lambda data: "Off" if data == ChxOutputStageEnableIntOption.Off else "On"),
+    "fan-control": ("Fan Control Enable", str),
+    "Kp": ("Kp", str),
+    "Ti": ("Ti", str),
+    "Td": ("Td", str),
+    "firmware-version": ("Firmware Version", format_firmware_version),
+    "device-status": ("Device Status", lambda data: TEC_DEVICE_STATUSES[data]),
+    "device-address": ("Device Address", str),
+    "error-number": ("Error Number", str),
+    "error-description": ("Error Number", lambda data: MEERSTETTER_ERRORS[int(data)]),
+}
+
+# POST alias URL -> (TEC parameter, option type for ?status= or None for ?setpoint=, option value meaning 1)
+TEC_SET_ALIASES = {
+    "object-temperature": ("Target Object Temp (Set)", None, None),
+    "target-fan-temperature": ("Target Temperature", None, None),
+    "current-error-threshold": ("Current Error Threshold", None, None),
+    "voltage-error-threshold": ("Voltage Error Threshold", None, None),
+    "Kp": ("Kp", None, None),
+    "Ti": ("Ti", None, None),
+    "Td": ("Td", None, None),
+    "temperature-control": ("Status", ChxOutputStageEnableStrOption, ChxOutputStageEnableStrOption.On),
+    "fan-control": ("Fan Control Enable", FanControlEnableStateStrOption, FanControlEnableStateStrOption.Enabled),
+}
 
-@router.get("/object-temperature/", response_model=dict, tags=["TEC"])
-async def get_object_temperature(heater: MeerstetterIDs):
-    """
-    Returns the current temp of the object in degrees Celsius
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Object Temperature)
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
+TecGetAlias = Enum("TecGetAlias", {alias: alias for alias in TEC_GET_ALIASES}, type=str)
+TecSetAlias = Enum("TecSetAlias", {alias: alias for alias in TEC_SET_ALIASES}, type=str)
+
+
+# Identification parameters kept in the device inventory (with the ?IF device info string)
+TEC_INVENTORY_PARAMETERS = ["Firmware Version", "Device Address"]
+
+
+def tec_inventory_key(heater: MeerstetterIDs) -> str:
+    return f"tec/{heater.value}"
+
+
+async def fetch_device_info(heater: MeerstetterIDs) -> tuple:
+    """Read the identification of the heater's controller over one connection, returns (info, message, elapsed)"""
+    address = heater_address(heater)
+    pkts = [
+        MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=address, sequence=rand_request_id(), parameter=parameter)
+        for parameter in TEC_INVENTORY_PARAMETERS
+    ]
+    pkts.append(MeerstetterBusPacket(MeerstetterBusPacketType.DEVICE_INFO, address=address, sequence=rand_request_id()))
+    pkts, elapsed, _ = await meerstetter_bus_timed_exchanges(pkts)
+    for pkt in pkts:
+        if pkt.error is not None:
+            raise ValueError(pkt.error)
+    info = {pkt.parameter.name: pkt.data for pkt in pkts[:-1]}
+    info["Device Info"] = pkts[-1].query.RESPONSE.PAYLOAD
+    # Raw packet of every value, the parameter reads answer with their own
+    message = {pkt.parameter.name: pkt.raw_packet for pkt in pkts[:-1]}
+    message["Device Info"] = pkts[-1].raw_packet
+    return (info, message, elapsed)
+
+
+for heater in HEATER_IDS:
+    DEVICE_INVENTORY.register(tec_inventory_key(heater), partial(fetch_device_info, heater), MEERSTETTER_BUS)
+
+
+def get_tec_parameter(name: str):
+    """Look up a TEC parameter by name or id, raises a 404 if there is no such parameter"""
+    try:
+        if name.isdigit():
+            return TEC_PARAMETER_LIST.get_by_id(int(name))
+        return TEC_PARAMETER_LIST.get_by_name(name)
+    except UnknownParameter:
+        raise HTTPException(status_code=404, detail=f"TEC parameter {name} not found")
+
+
+async def read_tec_parameter(heater: MeerstetterIDs, parameter: str, refresh: bool = False, instance: int = 1) -> tuple:
+    """Read a TEC parameter of the heater (through the configuration cache or device inventory), returns (packet, elapsed)"""
     pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Object Temperature"
+        MeerstetterBusPacketType.GET_PARAMETER,
+        address=heater_address(heater),
+        sequence=rand_request_id(),
+        parameter=parameter,
+        parameter_instance=instance,
     )
-    # Send the request and get the response
     try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-        response = str(pkt.data)
+        if parameter in TEC_INVENTORY_PARAMETERS and instance == 1:
+            info, message, elapsed = await DEVICE_INVENTORY.lookup(tec_inventory_key(heater), refresh)
+            pkt.data = info[parameter]
+            pkt.raw_packet = message[parameter]
+            return (pkt, elapsed)
+        return await tec_config_exchange(pkt, refresh)
+    except (ValueError, IOError) as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+async def write_tec_parameter(heater: MeerstetterIDs, parameter: str, value, instance: int = 1) -> tuple:
+    """Write a TEC parameter of the heater after checking its access and range, returns (packet, elapsed)"""
+    try:
+        value = TEC_PARAMETER_LIST.get_by_name(parameter).check_value(value)
     except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    pkt = MeerstetterBusPacket(
+        MeerstetterBusPacketType.SET_PARAMETER,
+        address=heater_address(heater),
+        sequence=rand_request_id(),
+        parameter=parameter,
+        value=value,
+        parameter_instance=instance,
+    )
+    try:
+        return await tec_config_exchange(pkt)
+    except (ValueError, IOError) as e:
         raise HTTPException(status_code=500, detail=str(e))
-        response = "None"
+
+
+@router.get("/param/", response_model=dict, tags=["TEC"])
+async def list_parameters():
+    """Returns the TEC parameters (id, name, format, access and write range) available through /tec/param/{name}"""
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": response,
+        "_mid": 0,
+        "_duration_us": 0,
+        "message": "",
+        "response": [parameter.as_dict() for parameter in TEC_PARAMETER_LIST],
     }
 
-@router.post("/object-temperature/")
-async def set_object_temperature(
-    heater: MeerstetterIDs,
-    setpoint: float):
+@router.get("/param/{name}/instances", response_model=dict, tags=["TEC"])
+async def get_parameter_instances(name: str, heater: MeerstetterIDs, instances: List[int] = Query(default=[1, 2])):
     """
-    Set the target object temperature for the selected heater\n
+    Returns the value of a TEC parameter for several instances (channels of multi-channel controllers)
+    of the selected heater, read in one pipelined exchange
     \n
     Parameters:\n
-        - heater (MeerstetterIDs): heater to be used\n
-        - setpoint (float): target object temperature for the heater\n
-    Returns:
+        - name (str): TEC parameter name (e.g. "Object Temperature") or id (e.g. 1000)\n
+        - heater (MeerstetterIDs): name of the heater to be checked\n
+        - instances (List[int]): instances to read (default 1 and 2)\n
+    Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
         - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data
+        - message (list): raw packets\n
+        - response (dict): deserialized data (or error) by instance
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.SET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Target Object Temp (Set)",
-        value=setpoint
-    )
-    # Send the request and get the response
+    parameter = get_tec_parameter(name)
+    if not all(1 <= instance <= 0xFF for instance in instances):
+        raise HTTPException(status_code=422, detail="Parameter instances must be between 1 and 255")
     try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
+        pkts, elapsed = await read_parameter_instances(heater_address(heater), parameter.name, list(dict.fromkeys(instances)))
+    except (ValueError, IOError) as e:
         raise HTTPException(status_code=500, detail=str(e))
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
+        "_mid": heater_id(heater),
         "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "message": [pkt.raw_packet for pkt in pkts.values()],
+        "response": {instance: pkt.data if pkt.error is None else {"error": pkt.error} for instance, pkt in pkts.items()},
     }
 
-@router.get("/sink-temperature/", response_model=dict, tags=["TEC"])
-async def get_sink_temperature(heater: MeerstetterIDs):
+@router.get("/param/{name}", response_model=dict, tags=["TEC"])
+async def get_parameter(name: str, heater: MeerstetterIDs, refresh: bool = False, instance: int = Query(default=1, ge=1, le=0xFF)):
     """
-    Returns the current temp of the sink in degrees Celsius
+    Returns the value of any TEC parameter for the selected heater
     \n
     Parameters:\n
+        - name (str): TEC parameter name (e.g. "Object Temperature") or id (e.g. 1000)\n
         - heater (MeerstetterIDs): name of the heater to be checked\n
+        - refresh (bool): read configuration parameters from the device instead of the cache\n
+        - instance (int): channel of multi-channel controllers (default 1)\n
     Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
         - _duration_us (int): elapsed time in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data (Sink Temperature [Celsius])
+        - response (float): deserialized data
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Sink Temperature"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    parameter = get_tec_parameter(name)
+    pkt, elapsed = await read_tec_parameter(heater, parameter.name, refresh, instance)
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
+        "_mid": heater_id(heater),
         "_duration_us": elapsed,
         "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "response": pkt.data,
     }
 
-@router.get("/target-object-temperature/", response_model=dict, tags=["TEC"])
-async def get_target_object_temperature(heater: MeerstetterIDs):
+@router.post("/param/{name}", response_model=dict, tags=["TEC"])
+async def set_parameter(name: str, heater: MeerstetterIDs, value: float, instance: int = Query(default=1, ge=1, le=0xFF)):
     """
-    Returns the current target temperature of the object in degrees Celsius
+    Set the value of a writable TEC parameter for the selected heater
     \n
     Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
+        - name (str): TEC parameter name (e.g. "Kp") or id (e.g. 3010)\n
+        - heater (MeerstetterIDs): heater to be used\n
+        - value (float): new value, checked against the parameter range\n
+        - instance (int): channel of multi-channel controllers (default 1)\n
     Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
         - _duration_us (int): elapsed time in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data (Target Object Temperature [Celsius])
+        - response (float): deserialized data
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Target Object Temperature"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    parameter = get_tec_parameter(name)
+    pkt, elapsed = await write_tec_parameter(heater, parameter.name, value, instance)
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
+        "_mid": heater_id(heater),
         "_duration_us": elapsed,
         "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "response": pkt.data,
     }
 
-@router.get("/actual-output-current/", response_model=dict, tags=["TEC"])
-async def get_actual_output_current(heater: MeerstetterIDs):
+@router.post("/wait-stable", response_model=dict, tags=["TEC"])
+async def wait_temperature_is_stable(
+    heater: MeerstetterIDs,
+    timeout: float = Query(default=60.0, gt=0, le=3600, description="Max wait (seconds)"),
+    tolerance: Optional[float] = Query(default=None, gt=0, description="Max distance from the setpoint (C)")):
     """
-    Returns the current actual output current in Amperes
+    Hold the request until the heater is stable at its setpoint or the timeout expires.
+    The temperature is sampled quickly near the setpoint and slowly far from it.
+    A failed read ends the wait with a 500 error.
     \n
     Parameters:\n
         - heater (MeerstetterIDs): name of the heater to be checked\n
+        - timeout (float): maximum time to wait in seconds\n
+        - tolerance (float): optional max distance from the setpoint in Celsius\n
     Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
         - _duration_us (int): elapsed time in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data (Actual Output Current [A])
+        - response (dict): stable flag, time to stability (s), samples taken and last values
     """
+    id = heater_id(heater)
+    try:
+        result = await wait_stable(MEERSTETTER_BUS_ADDR[id], timeout, tolerance)
+    except (ValueError, IOError) as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "_sid": READER_SUBSYSTEM_ID,
+        "_mid": id,
+        "_duration_us": int(result["waited_s"] * 1e6),
+        "message": "",
+        "response": result,
+    }
+
+@router.post("/meerstetter/reset/")
+async def reset(
+    heater: MeerstetterIDs
+):
+    """Reset the Heater Channel"""
     # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
+    id = heater_id(heater)
     # Build the request/response packet
     pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
+        MeerstetterBusPacketType.SYS_RESET, 
         address=MEERSTETTER_BUS_ADDR[id],
         sequence= rand_request_id(),
-        parameter="Actual Output Current"
     )
     # Send the request and get the response
     try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
+        pkt, elapsed = await tec_config_exchange(pkt)
+    except (ValueError, IOError) as e:
         raise HTTPException(status_code=500, detail=str(e))
+    DEVICE_INVENTORY.invalidate(tec_inventory_key(heater))
     return {
         "_sid": READER_SUBSYSTEM_ID,
         "_mid": id,
@@ -257,1346 +349,503 @@ async def get_actual_output_current(heater: MeerstetterIDs):
         "response": str(pkt.data),
     }
 
-@router.get("/actual-output-voltage/", response_model=dict, tags=["TEC"])
-async def get_actual_output_voltage(heater: MeerstetterIDs):
+@router.post("/profile/", response_model=dict, tags=["TEC"])
+async def run_temperature_profile(profile: TemperatureProfile):
     """
-    Returns the current actual output voltage in Volts
+    Start a temperature profile (setpoint, ramp, hold and cycle steps) on a heater.
+    The steps are timed by the server, poll /tec/profile/{run_id} for progress.
     \n
     Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
+        - profile (TemperatureProfile): heater and list of steps\n
     Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
         - _duration_us (int): elapsed time in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data (Actual Output Voltage [V])
+        - response (dict): status of the profile run
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Actual Output Voltage"
-    )
-    # Send the request and get the response
     try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
+        run = start_profile(profile)
     except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=422, detail=str(e))
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "_mid": heater_id(profile.heater),
+        "_duration_us": 0,
+        "message": "",
+        "response": run.status(),
+    }
+
+@router.get("/profile/", response_model=dict, tags=["TEC"])
+async def list_temperature_profiles():
+    """Returns the status of the active temperature profile runs and of the last PROFILE_KEEP_FINISHED (32) finished ones"""
+    return {
+        "_sid": READER_SUBSYSTEM_ID,
+        "_mid": 0,
+        "_duration_us": 0,
+        "message": "",
+        "response": [run.status() for run in PROFILE_RUNS.values()],
+    }
+
+@router.get("/profile/{run_id}", response_model=dict, tags=["TEC"])
+async def get_temperature_profile(run_id: str):
+    """Returns the progress (current step, time left in step, event log) of a temperature profile run"""
+    if run_id not in PROFILE_RUNS:
+        raise HTTPException(status_code=404, detail=f"Profile run {run_id} not found")
+    run = PROFILE_RUNS[run_id]
+    return {
+        "_sid": READER_SUBSYSTEM_ID,
+        "_mid": heater_id(run.heater),
+        "_duration_us": 0,
+        "message": "",
+        "response": run.status(),
+    }
+
+@router.post("/profile/{run_id}/abort", response_model=dict, tags=["TEC"])
+async def abort_temperature_profile(run_id: str):
+    """Abort a running temperature profile, the heater is left at its current setpoint"""
+    if run_id not in PROFILE_RUNS:
+        raise HTTPException(status_code=404, detail=f"Profile run {run_id} not found")
+    run = PROFILE_RUNS[run_id]
+    run.abort()
+    return {
+        "_sid": READER_SUBSYSTEM_ID,
+        "_mid": heater_id(run.heater),
+        "_duration_us": 0,
+        "message": "",
+        "response": run.status(),
     }
 
-@router.get("/relative-cooling-power/", response_model=dict, tags=["TEC"])
-async def get_relative_cooling_power(heater: MeerstetterIDs):
+@router.post("/group/setpoint", response_model=dict, tags=["TEC"])
+async def set_group_object_temperature(
+    setpoint: float,
+    heaters: List[MeerstetterIDs] = Query(default=ALL_HEATERS)):
     """
-    Returns the relative cooling power of the fan for the selected heater
+    Set the same target object temperature on a group of heaters. The frames are sent
+    back-to-back over one connection and the spread of the ACKs is reported.
     \n
     Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
+        - setpoint (float): target object temperature for the heaters\n
+        - heaters (List[MeerstetterIDs]): heaters in the group (default: all)\n
     Returns:\n
         - _sid (int): submodule id\n
-        - _mid (int): module id\n
+        - _mid (list): module ids\n
         - _duration_us (int): elapsed time in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data (Relative Cooling Power [%])
+        - response (dict): per-heater ACK time from the first write (us) and skew (us)\n
+    Fails (422) if the setpoint is out of range and (500, with the reason by heater in detail.errors)
+    unless every heater acknowledged the setpoint
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Relative Cooling Power"
-    )
-    # Send the request and get the response
+    group = HeaterGroup(heaters)
     try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
+        result = await group.write(None, "Target Object Temp (Set)", setpoint)
+    except GroupError as e:
+        raise HTTPException(status_code=500, detail={"message": str(e), "errors": e.errors, "ack_us": e.ack_us})
     except ValueError as e:
+        # Out of range setpoint, nothing was sent
+        raise HTTPException(status_code=422, detail=str(e))
+    except IOError as e:
         raise HTTPException(status_code=500, detail=str(e))
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "_mid": [heater_id(h) for h in group.heaters],
+        "_duration_us": result["_duration_us"],
+        "message": "",
+        "response": {"ack_us": result["ack_us"], "skew_us": result["skew_us"]},
+    }
+
+@router.get("/group/temperature-is-stable", response_model=dict, tags=["TEC"])
+async def get_group_temperature_is_stable(heaters: List[MeerstetterIDs] = Query(default=ALL_HEATERS)):
+    """Returns the temperature is stable value (0: not active, 1: not stable, 2: stable) of a group of heaters read over one connection"""
+    group = HeaterGroup(heaters)
+    try:
+        values = await group.read_all("Temperature is Stable")
+    except GroupError as e:
+        raise HTTPException(status_code=500, detail={"message": str(e), "errors": e.errors})
+    except (ValueError, IOError) as e:
+        raise HTTPException(status_code=500, detail=str(e))
+    return {
+        "_sid": READER_SUBSYSTEM_ID,
+        "_mid": [heater_id(h) for h in group.heaters],
+        "_duration_us": 0,
+        "message": "",
+        "response": {"stable": values, "all_stable": min(values.values()) == 2},
     }
 
-@router.get("/actual-fan-speed/", response_model=dict, tags=["TEC"])
-async def get_actual_fan_Speed(heater: MeerstetterIDs):
+@router.post("/group/program", response_model=dict, tags=["TEC"])
+async def run_group_program(program: GroupProgram):
     """
-    Returns the actual fan speed for the selected heater's fan
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Actual Fan Speed [rpm])
+    Start a step program (same steps as /tec/profile/) in lockstep on a group of heaters.
+    Setpoint steps with wait_stable wait until every heater of the group is stable, and the
+    write and stability skews are reported in the run status (/tec/profile/{run_id}).
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Actual Fan Speed"
-    )
-    # Send the request and get the response
     try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
+        run = start_group_program(program)
     except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {
+        "_sid": READER_SUBSYSTEM_ID,
+        "_mid": [heater_id(h) for h in run.heaters],
+        "_duration_us": 0,
+        "message": "",
+        "response": run.status(),
+    }
+
+@router.get("/config-cache", response_model=dict, tags=["TEC"])
+async def get_config_cache():
+    """Returns the cached TEC configuration parameter values (by Meerstetter address) and the cache hit/miss counts"""
+    return {
+        "_sid": READER_SUBSYSTEM_ID,
+        "_mid": 0,
+        "_duration_us": 0,
+        "message": "",
+        "response": {
+            "values": TEC_CONFIG_CACHE.snapshot(),
+            "hits": TEC_CONFIG_CACHE.hits,
+            "misses": TEC_CONFIG_CACHE.misses,
+        },
+    }
+
+@router.delete("/config-cache", response_model=dict, tags=["TEC"])
+async def clear_config_cache(heater: Optional[MeerstetterIDs] = None):
+    """Drop the cached TEC configuration of one heater (or of every heater if none is given)"""
+    id = 0
+    address = None
+    if heater is not None:
+        id = heater_id(heater)
+        address = MEERSTETTER_BUS_ADDR[id]
+    TEC_CONFIG_CACHE.invalidate(address)
+    return {
+        "_sid": READER_SUBSYSTEM_ID,
+        "_mid": id,
+        "_duration_us": 0,
+        "message": "",
+        "response": TEC_CONFIG_CACHE.snapshot(),
+    }
+
+@router.get("/config", response_model=dict, tags=["TEC"])
+async def get_config(heater: MeerstetterIDs):
+    """Returns every writable configuration parameter of the heater, read in one pass over a single connection"""
+    id = heater_id(heater)
+    try:
+        values = await read_parameters(MEERSTETTER_BUS_ADDR[id], TEC_CONFIG_PARAMETERS)
+    except (ValueError, IOError) as e:
         raise HTTPException(status_code=500, detail=str(e))
     return {
         "_sid": READER_SUBSYSTEM_ID,
         "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "_duration_us": 0,
+        "message": "",
+        "response": values,
     }
 
-@router.get("/target-fan-temperature/", response_model=dict, tags=["TEC"])
-async def get_fan_target_temperature(heater: MeerstetterIDs):
+@router.put("/config", response_model=dict, tags=["TEC"])
+async def put_config(heater: MeerstetterIDs, document: TecConfigDocument):
     """
-    Returns the target temperature for the selected heater's fan
+    Apply a full configuration document (TEC parameter name -> value) to the heater.
+    Only the parameters that differ from the device are written, then verified; if any
+    write fails the written parameters are rolled back and 409 is returned with the result
+    as the detail.
     \n
     Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
+        - heater (MeerstetterIDs): heater to be configured\n
+        - document (TecConfigDocument): parameter values and whether to save them to flash\n
     Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
         - _duration_us (int): elapsed time in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data (Target Fan Speed (C))
+        - response (dict): changed, written, rejected and rolled back parameters
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Target Temperature"
-    )
-    # Send the request and get the response
+    id = heater_id(heater)
     try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
+        result = await apply_config(MEERSTETTER_BUS_ADDR[id], document)
+    except ConfigRejected as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except (ValueError, IOError) as e:
         raise HTTPException(status_code=500, detail=str(e))
+    duration_us = result.pop("_duration_us")
+    if not result["applied"]:
+        raise HTTPException(status_code=409, detail=result)
     return {
         "_sid": READER_SUBSYSTEM_ID,
         "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "_duration_us": duration_us,
+        "message": "",
+        "response": result,
     }
 
-@router.post("/target-fan-temperature/")
-async def set_fan_target_temperature(
-    heater: MeerstetterIDs,
-    setpoint: float):
+@router.post("/autotune", response_model=dict, tags=["TEC"])
+async def run_autotune(request: AutotuneRequest):
     """
-    Set the target fan temperature for the selected heater\n
+    Start a PID autotune run: a setpoint step is applied to the heater and its response is
+    captured at the full MeCom rate, then Kp/Ti/Td are proposed (and written if apply is set).
+    The step is taken with the PID loop closed, so the fitted model is the closed-loop response
+    under the present gains rather than the open-loop plant (see "identification" in the result).
+    Poll /tec/autotune/{run_id} for the result.
     \n
     Parameters:\n
-        - heater (MeerstetterIDs): heater to be used\n
-        - setpoint (float): target fan temperature for the heater\n
-    Returns:
+        - request (AutotuneRequest): heater, step [C], capture duration [s], apply, restore_setpoint\n
+    Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
         - _duration_us (int): elapsed time in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data
+        - response (dict): status of the autotune run
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.SET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Target Temperature",
-        value=setpoint
-    )
-    # Send the request and get the response
     try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
+        run = start_autotune(request)
     except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=422, detail=str(e))
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "_mid": heater_id(run.heater),
+        "_duration_us": 0,
+        "message": "",
+        "response": run.status(),
+    }
+
+@router.get("/autotune/{run_id}", response_model=dict, tags=["TEC"])
+async def get_autotune(run_id: str, trace: bool = False):
+    """Returns the state and result (response metrics, fitted model, proposed gains) of an autotune run,
+    with the captured samples if trace is set"""
+    run = PROFILE_RUNS.get(run_id)
+    if not isinstance(run, AutotuneRun):
+        raise HTTPException(status_code=404, detail=f"Autotune run {run_id} not found")
+    response = run.status()
+    if trace:
+        response["trace"] = run.trace()
+    return {
+        "_sid": READER_SUBSYSTEM_ID,
+        "_mid": heater_id(run.heater),
+        "_duration_us": 0,
+        "message": "",
+        "response": response,
     }
 
-@router.get("/current-error-threshold/", response_model=dict, tags=["TEC"])
-async def get_current_error_threshold(heater: MeerstetterIDs):
+def get_capture(run_id: str):
+    if run_id not in CAPTURE_RUNS:
+        raise HTTPException(status_code=404, detail=f"Capture run {run_id} not found")
+    return CAPTURE_RUNS[run_id]
+
+@router.post("/capture", response_model=dict, tags=["TEC"])
+async def start_run_capture(request: CaptureRequest):
     """
-    Returns the current error threshold for the selected heater
+    Start capturing the object temperature and setpoint of the heaters at a fixed interval,
+    analytics of the run are available from /tec/analytics?run={run_id}
     \n
     Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
+        - request (CaptureRequest): heaters, interval [s], capacity [samples per heater]\n
     Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
         - _duration_us (int): elapsed time in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data (Current Error Threshold [A])
+        - response (dict): status of the capture
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Current Error Threshold"
-    )
-    # Send the request and get the response
     try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
+        capture = start_capture(request)
     except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=422, detail=str(e))
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "_mid": 0,
+        "_duration_us": 0,
+        "message": "",
+        "response": capture.status(),
     }
 
-@router.post("/current-error-threshold/")
-async def set_current_error_threshold(
-    heater: MeerstetterIDs,
-    setpoint: float):
+@router.get("/capture/{run_id}", response_model=dict, tags=["TEC"])
+async def get_run_capture(run_id: str):
+    """Returns the state and number of samples of a run capture"""
+    return {
+        "_sid": READER_SUBSYSTEM_ID,
+        "_mid": 0,
+        "_duration_us": 0,
+        "message": "",
+        "response": get_capture(run_id).status(),
+    }
+
+@router.post("/capture/{run_id}/stop", response_model=dict, tags=["TEC"])
+async def stop_run_capture(run_id: str):
+    """Stop a run capture, its samples stay available for analytics"""
+    capture = get_capture(run_id)
+    capture.stop()
+    return {
+        "_sid": READER_SUBSYSTEM_ID,
+        "_mid": 0,
+        "_duration_us": 0,
+        "message": "",
+        "response": capture.status(),
+    }
+
+@router.get("/analytics", response_model=dict, tags=["TEC"])
+async def get_run_analytics(run: str, band: float = Query(default=ANALYTICS_BAND, gt=0)):
     """
-    Set the current error threshold for the selected heater\n
+    Returns thermal metrics of a captured run for every heater and every setpoint segment
+    (ramp rate, overshoot, settling time, time at temperature, stability windows)
     \n
     Parameters:\n
-        - heater (MeerstetterIDs): heater to be used\n
-        - setpoint (float): current error threshold [A] for the heater\n
-    Returns:
+        - run (str): run capture id\n
+        - band (float): distance from the setpoint [C] counted as at temperature\n
+    Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
+        - _duration_us (int): time spent computing the analytics in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data (Current Error Threshold [A])
+        - response (dict): capture status and segment metrics by heater
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.SET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Current Error Threshold",
-        value=setpoint
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    capture = get_capture(run)
+    begin = time.perf_counter_ns()
+    heaters = capture.analytics(band)
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "_mid": 0,
+        "_duration_us": (time.perf_counter_ns() - begin) // 1000,
+        "message": "",
+        "response": {"capture": capture.status(), "band": band, "heaters": heaters},
     }
 
-@router.get("/voltage-error-threshold/", response_model=dict, tags=["TEC"])
-async def get_voltage_error_threshold(heater: MeerstetterIDs):
+@router.get("/eta", response_model=dict, tags=["TEC"])
+async def get_eta(heater: Optional[MeerstetterIDs] = None):
     """
-    Returns the voltage error threshold for the selected heater
+    Returns the predicted time until each heater (or the selected heater) reaches its target
+    temperature, from a first order model updated with every watcher sample
     \n
     Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
+        - heater (MeerstetterIDs): only this heater (optional)\n
     Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
         - _duration_us (int): elapsed time in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data (Voltage Error Threshold [V])
+        - response (dict): by heater, eta_s (0 at target, None if unknown), eta_at (unix time), model
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Voltage Error Threshold"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
-    }
-
-@router.post("/voltage-error-threshold/")
-async def set_voltage_error_threshold(
-    heater: MeerstetterIDs,
-    setpoint: float):
-    """
-    Set the voltage error threshold for the selected heater\n
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): heater to be used\n
-        - setpoint (float): voltage error threshold [V] for the heater\n
-    Returns:
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Voltage Error Threshold [V])
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.SET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Voltage Error Threshold",
-        value=setpoint
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
-    }
-
-@router.get("/object-upper-error-threshold/", response_model=dict, tags=["TEC"])
-async def get_object_upper_error_threshold(heater: MeerstetterIDs):
-    """
-    Returns the object upper error threshold for the selected heater
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Current Error Threshold [A])
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Object Upper Error Threshold"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
-    }
-
-@router.get("/object-lower-error-threshold/", response_model=dict, tags=["TEC"])
-async def get_object_lower_error_threshold(heater: MeerstetterIDs):
-    """
-    Returns the object lower error threshold for the selected heater
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Current Error Threshold [A])
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Object Lower Error Threshold"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
-    }
-
-@router.get("/sink-upper-error-threshold/", response_model=dict, tags=["TEC"])
-async def get_sink_upper_error_threshold(heater: MeerstetterIDs):
-    """
-    Returns the sink upper error threshold for the selected heater
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Current Error Threshold [A])
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Sink Upper Error Threshold"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
-    }
-
-@router.get("/sink-lower-error-threshold/", response_model=dict, tags=["TEC"])
-async def get_sink_lower_error_threshold(heater: MeerstetterIDs):
-    """
-    Returns the sink lower error threshold for the selected heater
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Current Error Threshold [A])
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Sink Lower Error Threshold"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
-    }
-
-@router.get("/temperature-is-stable/", response_model=dict, tags=["TEC"])
-async def get_temperature_is_stable(heater: MeerstetterIDs):
-    """
-    Returns the temperature is stable result for the selected heater
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Current Error Threshold [A])
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Temperature is Stable"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    if (pkt.data == 0):
-        response = "Temperature regulation is not active"
-    elif (pkt.data == 1):
-        response = "Is not stable"
-    elif (pkt.data):
-        response = "Is stable"
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": response,
-    }
-
-@router.get("/temperature-control/", response_model=dict, tags=["TEC"])
-async def get_chx_output_stage_enabled(heater: MeerstetterIDs):
-    """
-    Returns the status of the CHx Output Stage Enabled for the selected heater
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Current Error Threshold [A])
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Status"
-    )
-    # Send the request and get the response
-    response = "Off"
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-        response = "Off" if pkt.data == ChxOutputStageEnableIntOption.Off else "On"
-    except ValueError as e:
-        #response = options.get_option(-1)
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": response,
-    }
-
-
-
-@router.post("/temperature-control/")
-async def set_chx_output_stage_enabled(
-    heater: MeerstetterIDs,
-    status: ChxOutputStageEnableStrOption):
-    """
-    Set the CHx Output Stage Enable for the selected heater\n
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): heater to be used\n
-        - setpoint (float): target object temperature for the heater\n
-    Returns:
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Get the int option from the str option for CHx Output Stage Enable
-    status = 1 if (status == ChxOutputStageEnableStrOption.On.value) else 0
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.SET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Status",
-        value=status
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-        response = str(pkt.data)
-    except ValueError as e:
-        response = -1
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": response,
-    }
-
-@router.post("/fan-control/")
-async def set_chx_fan_control_enable(
-    heater: MeerstetterIDs,
-    status: FanControlEnableStateStrOption):
-    """
-    Set the CHx Fan Control for the selected heater\n
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): heater to be used\n
-        - status (FanControlEnableStateStrOption): state of the fan\n
-    Returns:
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Get the int option from the str option for CHx Fan Control State
-    status = 1 if (status == FanControlEnableStateStrOption.Enabled.value) else 0
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.SET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Fan Control Enable",
-        value=status
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-        response = str(pkt.data)
-    except ValueError as e:
-        response = -1
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": response,
-    }
-
-@router.get("/fan-control/")
-async def get_chx_fan_control_enable(
-    heater: MeerstetterIDs):
-    """
-    Set the CHx Fan Control for the selected heater\n
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): heater to be used\n
-    Returns:
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Fan Control Enable"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-        response = str(pkt.data)
-    except ValueError as e:
-        response = -1
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": response,
-    }
-
-@router.get("/Kp/", response_model=dict, tags=["TEC"])
-async def get_pid_Kp(heater: MeerstetterIDs):
-    """
-    Returns the current proportional PID value for the selected heater
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Object Temperature)
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Kp"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-        response = str(pkt.data)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-        response = "None"
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": response,
-    }
-
-@router.post("/Kp/")
-async def set_pid_Kp(
-    heater: MeerstetterIDs,
-    setpoint: float):
-    """
-    Set the PID proportional term for the selected heater\n
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): heater to be used\n
-        - setpoint (float): Proportional term for the PID\n
-    Returns:
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.SET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Kp",
-        value=setpoint
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
-    }
-
-@router.get("/Ti/", response_model=dict, tags=["TEC"])
-async def get_pid_Ti(heater: MeerstetterIDs):
-    """
-    Returns the current integral PID value for the selected heater
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Object Temperature)
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Ti"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-        response = str(pkt.data)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-        response = "None"
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": response,
-    }
-
-@router.post("/Ti/")
-async def set_pid_Ti(
-    heater: MeerstetterIDs,
-    setpoint: float):
-    """
-    Set the PID integral term for the selected heater\n
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): heater to be used\n
-        - setpoint (float): Integral term for the PID\n
-    Returns:
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.SET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Ti",
-        value=setpoint
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
-    }
-
-@router.get("/Td/", response_model=dict, tags=["TEC"])
-async def get_pid_Td(heater: MeerstetterIDs):
-    """
-    Returns the current derivative PID value for the selected heater
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data (Object Temperature)
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Td"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-        response = str(pkt.data)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-        response = "None"
+    heaters = [heater] if heater is not None else list(MeerstetterIDs)
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": response,
+        "_mid": 0 if heater is None else heater_id(heater),
+        "_duration_us": 0,
+        "message": "",
+        "response": {
+            "band": TEC_ETA.band,
+            "watcher_running": TEC_WATCHER.is_running,
+            "heaters": {h.value: TEC_ETA.estimate(h) for h in heaters},
+        },
     }
 
-@router.post("/Td/")
-async def set_pid_Td(
-    heater: MeerstetterIDs,
-    setpoint: float):
+@router.get("/watcher", response_model=dict, tags=["TEC"])
+async def get_watcher():
     """
-    Set the PID derivative term for the selected heater\n
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): heater to be used\n
-        - setpoint (float): Proportional term for the PID\n
-    Returns:
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (float): deserialized data
+    Returns the state of the TEC fault watcher: the last status and error number of every heater
+    and the event log of their transitions
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.SET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Td",
-        value=setpoint
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "_mid": 0,
+        "_duration_us": 0,
+        "message": "",
+        "response": TEC_WATCHER.status(),
     }
 
-@router.get("/firmware-version/", response_model=dict, tags=["TEC"])
-async def get_firmware_version(heater: MeerstetterIDs):
-    """
-    Returns the firmware version loaded on the TEC
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (str): deserialized data (Firmware Version)
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Firmware Version"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@router.post("/watcher/start", response_model=dict, tags=["TEC"])
+async def start_watcher():
+    """Start sampling the status and error number of the heaters (started with the server)"""
+    TEC_WATCHER.start()
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data)[:-2] + "." + str(pkt.data)[-2:],
+        "_mid": 0,
+        "_duration_us": 0,
+        "message": "",
+        "response": TEC_WATCHER.status(),
     }
 
-@router.get("/device-status/", response_model=dict, tags=["TEC"])
-async def get_device_status(heater: MeerstetterIDs):
-    """
-    Returns the Device Status for the TEC
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (str): deserialized data (Device Status)
-    """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Device Status"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+@router.post("/watcher/stop", response_model=dict, tags=["TEC"])
+async def stop_watcher():
+    """Stop the watcher and release its Meerstetter connection"""
+    TEC_WATCHER.stop()
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": TEC_DEVICE_STATUSES[pkt.data],
+        "_mid": 0,
+        "_duration_us": 0,
+        "message": "",
+        "response": {"running": False},
     }
 
-@router.get("/device-address/", response_model=dict, tags=["TEC"])
-async def get_device_address(heater: MeerstetterIDs):
+@router.get("/watcher/events", tags=["TEC"])
+async def watch_events(since: int = 0, last_event_id: Optional[int] = Header(default=None)):
     """
-    Returns the Device Address for the TEC
-    \n
-    Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
-    Returns:\n
-        - _sid (int): submodule id\n
-        - _mid (int): module id\n
-        - _duration_us (int): elapsed time in microseconds\n
-        - message (str): raw packet\n
-        - response (str): deserialized data (Device Address)
+    Server-sent event stream of heater status transitions (e.g. Run -> Error with the error description).
+    Events in the log after since (or the Last-Event-ID header when reconnecting) are sent first.
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Device Address"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": str(pkt.data),
-    }
+    if last_event_id is not None:
+        since = last_event_id
+    return StreamingResponse(TEC_WATCHER.stream(since), media_type="text/event-stream")
 
-@router.get("/error-number/", response_model=dict, tags=["TEC"])
-async def get_error_number(heater: MeerstetterIDs):
+# NOTE: The alias routes match any single path segment, keep them at the end of this file
+@router.get("/{alias}/", response_model=dict, tags=["TEC"])
+async def get_parameter_alias(alias: TecGetAlias, heater: MeerstetterIDs, refresh: bool = False):
     """
-    Returns the error number for the selected heater's fan
+    Returns a TEC parameter of the selected heater using the original per-parameter URLs
+    (e.g. /tec/object-temperature/, /tec/Kp/, /tec/error-description/), unknown ones return a 422
     \n
     Parameters:\n
         - heater (MeerstetterIDs): name of the heater to be checked\n
+        - refresh (bool): read configuration parameters from the device instead of the cache\n
     Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
         - _duration_us (int): elapsed time in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data (Target Fan Speed (C))
+        - response (str): deserialized and formatted data
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Error Number"
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    parameter, response_format = TEC_GET_ALIASES[alias.value]
+    pkt, elapsed = await read_tec_parameter(heater, parameter, refresh)
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
+        "_mid": heater_id(heater),
         "_duration_us": elapsed,
         "message": pkt.raw_packet,
-        "response": str(pkt.data),
+        "response": response_format(pkt.data),
     }
 
-@router.get("/error-description/", response_model=dict, tags=["TEC"])
-async def get_error_description(heater: MeerstetterIDs):
+@router.post("/{alias}/", response_model=dict, tags=["TEC"])
+async def set_parameter_alias(
+    alias: TecSetAlias,
+    heater: MeerstetterIDs,
+    setpoint: Optional[float] = Query(default=None, description="Value for numeric parameters"),
+    status: Optional[str] = Query(default=None, description="On/Off (temperature-control) or Enabled/Disabled (fan-control)")):
     """
-    Returns the error number for the selected heater's fan
+    Set a TEC parameter of the selected heater using the original per-parameter URLs
+    (e.g. /tec/object-temperature/?setpoint=, /tec/temperature-control/?status=On), unknown ones return a 422
     \n
     Parameters:\n
-        - heater (MeerstetterIDs): name of the heater to be checked\n
+        - heater (MeerstetterIDs): heater to be used\n
+        - setpoint (float): value for numeric parameters\n
+        - status (str): state for temperature-control (On/Off) and fan-control (Enabled/Disabled)\n
     Returns:\n
         - _sid (int): submodule id\n
         - _mid (int): module id\n
         - _duration_us (int): elapsed time in microseconds\n
         - message (str): raw packet\n
-        - response (float): deserialized data (Target Fan Speed (C))
+        - response (str): deserialized data
     """
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.GET_PARAMETER, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-        parameter="Error Number"
-    )
-    # Send the request and get the response
-    resp = "-1"
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-        resp = MEERSTETTER_ERRORS[int(pkt.data)]
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
-    return {
-        "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
-        "_duration_us": elapsed,
-        "message": pkt.raw_packet,
-        "response": resp,
-    }
-
-@router.post("/meerstetter/reset/")
-async def reset(
-    heater: MeerstetterIDs
-):
-    """Reset the Heater Channel"""
-    # Convert string to address
-    meerstetter_ids_dict = MeerstetterIDs.get_ids(MeerstetterIDs)
-    meerstetter_address_dict = MeerstetterIDs.get_addresses(MeerstetterIDs)
-    id = meerstetter_ids_dict[heater]
-    address = meerstetter_address_dict[id]
-    if id not in list(meerstetter_ids_dict.values()):
-        raise HTTPException(
-            status_code=500, detail=f"Meerstetter at ID {id} not available"
-        )
-    # Build the request/response packet
-    pkt = MeerstetterBusPacket(
-        MeerstetterBusPacketType.SYS_RESET, 
-        address=MEERSTETTER_BUS_ADDR[id],
-        sequence= rand_request_id(),
-    )
-    # Send the request and get the response
-    try:
-        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
-    except ValueError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+    parameter, option_type, on_option = TEC_SET_ALIASES[alias.value]
+    if option_type is None:
+        if setpoint is None:
+            raise HTTPException(status_code=422, detail=f"setpoint is required for {alias.value}")
+        value = setpoint
+    else:
+        try:
+            value = 1 if option_type(status) == on_option else 0
+        except ValueError:
+            options = ", ".join(option.value for option in option_type)
+            raise HTTPException(status_code=422, detail=f"status must be one of: {options}")
+    pkt, elapsed = await write_tec_parameter(heater, parameter, value)
     return {
         "_sid": READER_SUBSYSTEM_ID,
-        "_mid": id,
+        "_mid": heater_id(heater),
         "_duration_us": elapsed,
         "message": pkt.raw_packet,
         "response": str(pkt.data),
     }
-
-
@@ -0,0 +1,118 @@
+
+# Version: Test
+"""
+Vectorized thermal analytics of captured heater runs.
+
+A run is a time vector and (samples x heaters) matrices of object temperature and
+target temperature. Every heater's run is split into segments of constant setpoint
+(one per step, so one per phase of every cycle) and each segment is reduced to its
+ramp rate, overshoot, settling time, time at temperature and stability windows.
+All heaters are flattened into one array (heater-major) so every metric is a single
+NumPy reduction over segment boundaries instead of a Python loop over samples.
+A setpoint that is not known for a sample (NaN, e.g. its read failed during the
+capture) is taken to be the last known setpoint of the heater, so it does not split
+the segment.
+"""
+from typing import Dict
+
+from chassis_controller.app.lazy import lazy_import
+
+np = lazy_import("numpy")
+ANALYTICS_BAND = 0.5  # A sample is at temperature when within this many C of the setpoint
+
+
+def segment_metrics(t: "np.ndarray", temperature: "np.ndarray", setpoint: "np.ndarray", band: float = ANALYTICS_BAND) -> Dict[str, "np.ndarray"]:
+    """
+    Metrics of every constant-setpoint segment of every heater, returned as arrays with
+    one entry per segment (ordered by heater then time). NaN where a metric does not apply
+    (e.g. no overshoot for the first segment, settling time of a segment that never settled).
+    """
+    n, heaters = temperature.shape
+    size = n * heaters
+    if size == 0:
+        return {"heater": np.zeros(0, dtype=int)}
+    temp = temperature.T.astype(np.float64).ravel()
+    # Carry the last known setpoint over the unknown (NaN) ones, NaN stays only before the first known one
+    sp = setpoint.T.astype(np.float64)
+    known_at = np.maximum.accumulate(np.where(np.isnan(sp), 0, np.arange(n)), axis=1)
+    sp = np.take_along_axis(sp, known_at, axis=1).ravel()
+    tt = np.tile(np.asarray(t, dtype=np.float64), heaters)
+    idx = np.arange(size)
+
+    # Segment boundaries: setpoint changes and the first sample of every heater
+    change = np.empty(size, dtype=bool)
+    change[0] = True
+    change[1:] = (sp[1:] != sp[:-1]) & ~(np.isnan(sp[1:]) & np.isnan(sp[:-1]))
+    change[::n] = True
+    starts = np.flatnonzero(change)
+    ends = np.append(starts[1:], size)  # Exclusive
+    last = ends - 1
+    seg = np.cumsum(change) - 1
+    heater = starts // n
+
+    target = sp[starts]
+    previous = np.where(starts % n == 0, np.nan, sp[starts - 1])
+    direction = np.nan_to_num(np.sign(target - previous))
+
+    err = temp - sp
+    inband = np.abs(err) <= band
+    # Time each sample stands for: up to the next sample of the same segment
+    dt = np.zeros(size)
+    dt[:-1] = tt[1:] - tt[:-1]
+    dt[last] = 0.0
+
+    # Overshoot past the setpoint in the direction of the step
+    overshoot = np.maximum.reduceat(direction[seg] * err, starts)
+    overshoot = np.where(direction != 0, np.clip(overshoot, 0.0, None), np.nan)
+
+    # Settled from the sample after the last one outside the band
+    last_out = np.maximum.reduceat(np.where(inband, -1, idx), starts)
+    settled = last_out < last
+    settle_at = np.where(last_out < 0, starts, np.minimum(last_out + 1, last))
+    settling = np.where(settled, tt[settle_at] - tt[starts], np.nan)
+
+    # Ramp rate from the start of the segment until the band is first reached
+    first_in = np.minimum.reduceat(np.where(inband, idx, size), starts)
+    reached = first_in < ends
+    first_in = np.minimum(first_in, last)
+    ramp_time = tt[first_in] - tt[starts]
+    ramp_rate = np.where(reached & (ramp_time > 0), (temp[first_in] - temp[starts]) / np.where(ramp_time > 0, ramp_time, 1.0), np.nan)
+
+    time_at_temperature = np.add.reduceat(dt * inband, starts)
+
+    # Stability windows: runs of consecutive in-band samples within a segment
+    entered = inband.copy()
+    entered[1:] &= ~inband[:-1]
+    entered[starts] = inband[starts]
+    left = inband.copy()
+    left[:-1] &= ~inband[1:]
+    left[last] = inband[last]
+    windows = np.add.reduceat(entered.astype(np.int64), starts)
+    window_start, window_end = np.flatnonzero(entered), np.flatnonzero(left)
+    in_time = np.cumsum(dt * inband)
+    window_time = in_time[window_end] - in_time[window_start] + dt[window_start] * inband[window_start]
+    longest = np.zeros(starts.size)
+    np.maximum.at(longest, seg[window_start], window_time)
+
+    # Cycle: how many times the heater was at this setpoint before (0 for the first visit)
+    order = np.lexsort((starts, target, heater))
+    first_visit = np.ones(starts.size, dtype=bool)
+    first_visit[1:] = (heater[order][1:] != heater[order][:-1]) | (target[order][1:] != target[order][:-1])
+    positions = np.arange(starts.size)
+    cycle = np.empty(starts.size, dtype=np.int64)
+    cycle[order] = positions - np.maximum.accumulate(np.where(first_visit, positions, 0))
+
+    return {
+        "heater": heater,
+        "start_s": tt[starts],
+        "end_s": tt[last],
+        "from": previous,
+        "setpoint": target,
+        "cycle": cycle,
+        "ramp_rate_c_per_s": ramp_rate,
+        "overshoot_c": overshoot,
+        "settling_time_s": settling,
+        "time_at_temperature_s": time_at_temperature,
+        "stable_windows": windows,
+        "longest_stable_s": longest,
+    }
@@ -0,0 +1,288 @@
+
+# Version: Test
+"""
+PID autotune of a TEC heater from a setpoint step response.
+
+The run reads a baseline, writes a setpoint step and then samples Object Temperature
+and Actual Output Current back-to-back (as fast as the MeCom link answers) into
+preallocated NumPy buffers. The captured response is reduced to rise time, overshoot
+and settling time. A first order plus dead time (FOPDT) model is fitted with the
+two-point method (28.3% / 63.2% of the step) and IMC PID gains are proposed for it.
+The gains are only written to the heater when the request asks for it. The baseline
+must be read in full before the step: a failed read ends the run in error.
+
+The step is applied to the setpoint with the heater's PID loop closed, so the fitted
+model is the closed-loop response to the output current under the present gains, not
+the open-loop plant. Its steady-state gain is the plant's, but its time constant and
+dead time are shaped by the present gains. The proposed gains are a starting point to
+check on the heater, not a tuning of the plant (see AUTOTUNE_IDENTIFICATION).
+"""
+import asyncio
+import time
+import uuid
+from typing import Callable, Optional
+
+from pydantic import BaseModel
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs
+from chassis_controller.app.lazy import lazy_import
+from chassis_controller.app.routers.interfaces.utils import rand_request_id
+from chassis_controller.app.routers.interfaces.utils_meerstetter import (
+    TEC_PARAMETER_LIST,
+    MeerstetterBusPacket,
+    MeerstetterBusPacketType,
+)
+from chassis_controller.app.routers.interfaces.MeerstetterBus import (
+    hold_meerstetter_connection,
+    meerstetter_bus_timed_exchanges,
+    release_meerstetter_connection,
+)
+from chassis_controller.app.tec.bus import heater_address, read_parameters, write_parameter
+from chassis_controller.app.tec.profile import ProfileRunState, check_heaters_idle, register_run
+
+np = lazy_import("numpy")  # Only loaded when a run starts, keeps it off the server's startup
+
+AUTOTUNE_DURATION = 120.0  # Default capture time after the step [s]
+AUTOTUNE_MAX_SAMPLES = 20000  # Size of the capture buffers
+AUTOTUNE_SETTLING_BAND = 0.02  # Settled when within 2% of the step
+AUTOTUNE_STEADY_FRACTION = 0.1  # Last part of the capture averaged as the steady state
+AUTOTUNE_LAMBDA_RATIO = 0.2  # IMC closed loop time constant, at least this fraction of the model time constant
+
+AUTOTUNE_PARAMETERS = ["Object Temperature", "Actual Output Current"]
+
+# How the model was identified, reported with every result
+AUTOTUNE_IDENTIFICATION = (
+    "closed-loop setpoint step: the model is the response under the present PID gains, "
+    "not the open-loop plant, the proposed gains are a starting point to verify"
+)
+
+
+class AutotuneRequest(BaseModel):
+    heater: MeerstetterIDs
+    step: float = 5.0  # Setpoint step from the current target [C]
+    duration: float = AUTOTUNE_DURATION  # Capture time after the step [s]
+    apply: bool = False  # Write the proposed Kp/Ti/Td when the fit succeeds
+    restore_setpoint: bool = True  # Write the original target temperature back afterwards
+
+
+def _first_crossing(t: "np.ndarray", r: "np.ndarray", level: float) -> Optional[float]:
+    """Time at which the normalized response first reaches the level (linear interpolation)"""
+    above = np.flatnonzero(r >= level)
+    if above.size == 0:
+        return None
+    i = above[0]
+    if i == 0:
+        return float(t[0])
+    return float(t[i - 1] + (level - r[i - 1]) * (t[i] - t[i - 1]) / (r[i] - r[i - 1]))
+
+
+def step_response_metrics(t: "np.ndarray", y: "np.ndarray", y0: float, target: float, band: float = AUTOTUNE_SETTLING_BAND) -> dict:
+    """Rise time (10-90%), overshoot and settling time of a step from y0 to target, times relative to the step"""
+    r = (y - y0) / (target - y0)
+    t10, t90 = _first_crossing(t, r, 0.1), _first_crossing(t, r, 0.9)
+    outside = np.flatnonzero(np.abs(r - 1.0) > band)
+    if outside.size == 0:
+        settling = float(t[0])
+    elif outside[-1] == r.size - 1:
+        settling = None  # Not settled by the end of the capture
+    else:
+        settling = float(t[outside[-1] + 1])
+    return {
+        "rise_time_s": None if t10 is None or t90 is None else round(t90 - t10, 3),
+        "overshoot_pct": round(max(0.0, float(r.max()) - 1.0) * 100, 2),
+        "settling_time_s": None if settling is None else round(settling, 3),
+        "peak_temperature": round(float(y.max() if target > y0 else y.min()), 3),
+    }
+
+
+def fit_fopdt(t: "np.ndarray", y: "np.ndarray", u: "np.ndarray", y0: float, u0: float) -> Optional[dict]:
+    """
+    Fit gain (C/A), time constant and dead time (s) of a FOPDT model to the response of y to the
+    output current u, returns None if the response is too small to fit
+    """
+    tail = max(1, int(t.size * AUTOTUNE_STEADY_FRACTION))
+    dy = float(np.mean(y[-tail:])) - y0
+    du = float(np.mean(u[-tail:])) - u0
+    if abs(dy) < 1e-3 or abs(du) < 1e-3:
+        return None
+    r = (y - y0) / dy
+    t28, t63 = _first_crossing(t, r, 0.283), _first_crossing(t, r, 0.632)
+    if t28 is None or t63 is None or t63 <= t28:
+        return None
+    tau = 1.5 * (t63 - t28)
+    return {"gain": dy / du, "time_constant_s": tau, "dead_time_s": max(0.0, t63 - tau)}
+
+
+def imc_pid_gains(model: dict) -> dict:
+    """IMC PID tuning of a FOPDT model, Kp in A/C and Ti/Td in s like the Meerstetter parameters"""
+    k, tau, dead = abs(model["gain"]), model["time_constant_s"], model["dead_time_s"]
+    lam = max(dead, AUTOTUNE_LAMBDA_RATIO * tau)
+    return {
+        "Kp": round((2 * tau + dead) / (k * (2 * lam + dead)), 4),
+        "Ti": round(tau + dead / 2, 3),
+        "Td": round(tau * dead / (2 * tau + dead), 3),
+    }
+
+
+class AutotuneRun:
+    """Step response capture and PID tuning of one heater"""
+
+    def __init__(
+        self,
+        request: AutotuneRequest,
+        address: int,
+        exchange: Callable = meerstetter_bus_timed_exchanges,
+        read: Callable = read_parameters,
+        write: Callable = write_parameter,
+        hold: Callable = hold_meerstetter_connection,
+        release: Callable = release_meerstetter_connection,
+        clock: Callable[[], float] = time.monotonic,
+        max_samples: int = AUTOTUNE_MAX_SAMPLES,
+    ) -> None:
+        if request.step == 0:
+            raise ValueError("Autotune step must not be 0")
+        if request.duration <= 0:
+            raise ValueError("Autotune duration must be positive")
+        self.run_id = uuid.uuid4().hex[:8]
+        self.heater = request.heater
+        self.request = request
+        self.address = address
+        self.state = ProfileRunState.pending
+        self.error = None
+        self.result = None
+        self.samples = 0
+        self.dropped = 0
+        self._t = np.full(max_samples, np.nan)
+        self._temperature = np.full(max_samples, np.nan)
+        self._current = np.full(max_samples, np.nan)
+        self._exchange = exchange
+        self._read = read
+        self._write = write
+        self._hold = hold
+        self._release = release
+        self._clock = clock
+        self._task = None
+
+    @property
+    def heaters(self):
+        return [self.heater]
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in (ProfileRunState.pending, ProfileRunState.running)
+
+    def trace(self) -> dict:
+        n = self.samples
+        return {
+            "t": self._t[:n].round(4).tolist(),
+            "temperature": self._temperature[:n].round(3).tolist(),
+            "current": self._current[:n].round(4).tolist(),
+        }
+
+    async def _capture(self, deadline: float, started: float) -> None:
+        while self.samples < self._t.size and self._clock() < deadline:
+            pkts = [
+                MeerstetterBusPacket(
+                    MeerstetterBusPacketType.GET_PARAMETER,
+                    address=self.address,
+                    sequence=rand_request_id(),
+                    parameter=parameter,
+                )
+                for parameter in AUTOTUNE_PARAMETERS
+            ]
+            pkts, _, _ = await self._exchange(pkts)
+            if any(pkt.error is not None for pkt in pkts):
+                self.dropped += 1
+                continue
+            n = self.samples
+            self._t[n] = self._clock() - started
+            self._temperature[n] = pkts[0].data
+            self._current[n] = pkts[1].data
+            self.samples += 1
+
+    def _analyze(self, y0: float, u0: float, target: float, elapsed: float) -> dict:
+        n = self.samples
+        if n < 10:
+            raise ValueError(f"Only {n} samples captured")
+        t, y, u = self._t[:n], self._temperature[:n], self._current[:n]
+        model = fit_fopdt(t, y, u, y0, u0)
+        return {
+            "samples": n,
+            "sample_rate_hz": round(n / elapsed, 1),
+            "identification": AUTOTUNE_IDENTIFICATION,
+            "metrics": step_response_metrics(t, y, y0, target),
+            "model": None if model is None else {k: round(v, 4) for k, v in model.items()},
+            "gains": None if model is None else imc_pid_gains(model),
+        }
+
+    async def _apply(self, gains: dict) -> None:
+        for parameter, value in gains.items():
+            TEC_PARAMETER_LIST.get_by_name(parameter).check_value(value)
+        for parameter, value in gains.items():
+            await self._write(self.address, parameter, value)
+
+    async def run(self) -> None:
+        """Capture the step response and tune, this is the body of the run's task"""
+        self.state = ProfileRunState.running
+        setpoint = None
+        held = False
+        try:
+            await self._hold()
+            held = True
+            baseline = await self._read(self.address, ["Target Object Temp (Set)", "Kp", "Ti", "Td"] + AUTOTUNE_PARAMETERS)
+            setpoint = baseline["Target Object Temp (Set)"]
+            y0, u0 = baseline["Object Temperature"], baseline["Actual Output Current"]
+            target = setpoint + self.request.step
+            await self._write(self.address, "Target Object Temp (Set)", float(target))
+            started = self._clock()
+            await self._capture(started + self.request.duration, started)
+            self.result = self._analyze(y0, u0, target, self._clock() - started)
+            self.result["previous_gains"] = {p: baseline[p] for p in ("Kp", "Ti", "Td")}
+            self.result["applied"] = False
+            if self.request.apply and self.result["gains"] is not None:
+                await self._apply(self.result["gains"])
+                self.result["applied"] = True
+            self.state = ProfileRunState.completed
+        except asyncio.CancelledError:
+            self.state = ProfileRunState.aborted
+        except Exception as e:
+            self.state = ProfileRunState.error
+            self.error = str(e)
+        finally:
+            try:
+                if setpoint is not None and self.request.restore_setpoint:
+                    await self._write(self.address, "Target Object Temp (Set)", float(setpoint))
+            finally:
+                if held:
+                    self._release()
+
+    def start(self) -> "AutotuneRun":
+        """Schedule the run on the running event loop"""
+        self._task = asyncio.get_running_loop().create_task(self.run())
+        return self
+
+    def abort(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def status(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "kind": "autotune",
+            "heater": self.heater,
+            "state": self.state,
+            "step": self.request.step,
+            "samples": self.samples,
+            "dropped": self.dropped,
+            "error": self.error,
+            "result": self.result,
+        }
+
+
+def start_autotune(request: AutotuneRequest) -> AutotuneRun:
+    """Start an autotune run, raises ValueError if the request is invalid or the heater is busy.
+    Runs share the profile registry so a heater is never driven by a profile and an autotune at once."""
+    check_heaters_idle([request.heater])
+    run = AutotuneRun(request, heater_address(request.heater))
+    register_run(run)
+    return run.start()
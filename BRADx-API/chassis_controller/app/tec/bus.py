@@ -0,0 +1,116 @@
+
+# Version: Test
+"""
+Helpers shared by the server-side TEC engines (profiles, waits, caches, ...)
+for reading and writing a single Meerstetter parameter by heater name.
+
+A read that gets no valid value and a write the device does not acknowledge raise a
+ValueError: MeerstetterBusPacket.parse only records the failure (pkt.error) and leaves
+data at 0, which a caller would otherwise take for a reading of 0 C or a done write.
+"""
+from typing import Dict, List
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs, MEERSTETTER_BUS_ADDR
+from chassis_controller.app.routers.interfaces.utils import rand_request_id
+from chassis_controller.app.routers.interfaces.utils_meerstetter import (
+    ACK,
+    MeerstetterBusPacket,
+    MeerstetterBusPacketType,
+)
+from chassis_controller.app.routers.interfaces.MeerstetterBus import meerstetter_bus_timed_exchanges
+from chassis_controller.app.tec.config_cache import TEC_CONFIG_CACHE, tec_config_exchange
+
+# Heater name -> module ID, built once instead of on every request
+HEATER_IDS = MeerstetterIDs.get_ids(MeerstetterIDs)
+
+
+def heater_id(heater: MeerstetterIDs) -> int:
+    """Return the reader module ID for the heater"""
+    return HEATER_IDS[heater]
+
+
+def heater_address(heater: MeerstetterIDs) -> int:
+    """Return the Meerstetter bus address for the heater"""
+    return MEERSTETTER_BUS_ADDR[HEATER_IDS[heater]]
+
+
+def acked(pkt: MeerstetterBusPacket) -> bool:
+    """Whether the device acknowledged a write (or reset) packet"""
+    return pkt.error is None and isinstance(pkt.query.RESPONSE, ACK)
+
+
+def check_read(pkt: MeerstetterBusPacket) -> None:
+    """Raise a ValueError if a read packet did not get a valid value"""
+    if pkt.error is not None:
+        raise ValueError(f"Could not read {pkt.parameter.name} from address {pkt.address}: {pkt.error}")
+
+
+def check_write(pkt: MeerstetterBusPacket) -> None:
+    """Raise a ValueError if the device did not acknowledge a write packet"""
+    if not acked(pkt):
+        raise ValueError(f"Write of {pkt.parameter.name} to address {pkt.address} not acknowledged: {pkt.error or 'no ACK'}")
+
+
+async def read_parameter(address: int, parameter: str):
+    """Read a TEC parameter (by name) from the Meerstetter at the given address"""
+    pkt = MeerstetterBusPacket(
+        MeerstetterBusPacketType.GET_PARAMETER,
+        address=address,
+        sequence=rand_request_id(),
+        parameter=parameter,
+    )
+    pkt, _ = await tec_config_exchange(pkt)
+    check_read(pkt)
+    return pkt.data
+
+
+async def write_parameter(address: int, parameter: str, value) -> None:
+    """Write a TEC parameter (by name) to the Meerstetter at the given address"""
+    pkt = MeerstetterBusPacket(
+        MeerstetterBusPacketType.SET_PARAMETER,
+        address=address,
+        sequence=rand_request_id(),
+        parameter=parameter,
+        value=value,
+    )
+    pkt, _ = await tec_config_exchange(pkt)
+    check_write(pkt)
+
+
+async def read_parameters(address: int, parameters: List[str]) -> Dict[str, float]:
+    """Read several TEC parameters (by name) from one Meerstetter over a single connection"""
+    pkts = [
+        MeerstetterBusPacket(
+            MeerstetterBusPacketType.GET_PARAMETER,
+            address=address,
+            sequence=rand_request_id(),
+            parameter=parameter,
+        )
+        for parameter in parameters
+    ]
+    pkts, _, _ = await meerstetter_bus_timed_exchanges(pkts)
+    for pkt in pkts:
+        TEC_CONFIG_CACHE.record(pkt)
+    for pkt in pkts:
+        check_read(pkt)
+    return {parameter: pkt.data for parameter, pkt in zip(parameters, pkts)}
+
+
+async def read_parameter_instances(address: int, parameter: str, instances: List[int]) -> tuple:
+    """Read one TEC parameter (by name) of several instances (channels) of the Meerstetter at the
+    given address in one pipelined exchange, returns ({instance: packet}, elapsed)"""
+    sequence = rand_request_id()
+    pkts = [
+        MeerstetterBusPacket(
+            MeerstetterBusPacketType.GET_PARAMETER,
+            address=address,
+            sequence=(sequence + n) % 0x10000,  # Distinct, responses are matched by sequence number
+            parameter=parameter,
+            parameter_instance=instance,
+        )
+        for n, instance in enumerate(instances)
+    ]
+    pkts, elapsed, _ = await meerstetter_bus_timed_exchanges(pkts, pipelined=True)
+    for pkt in pkts:
+        TEC_CONFIG_CACHE.record(pkt)
+    return ({pkt.parameter_instance: pkt for pkt in pkts}, elapsed)
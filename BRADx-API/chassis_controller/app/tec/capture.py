@@ -0,0 +1,197 @@
+
+# Version: Test
+"""
+Run capture of the TEC heaters for analytics.
+
+A capture samples the object temperature of every heater of the run at a fixed
+interval (absolute deadlines, all heaters in one exchange over a held connection)
+into preallocated NumPy arrays. The setpoints are taken from the configuration
+cache, which every setpoint write goes through, so they cost no bus time unless a
+heater's setpoint is not cached yet. Analytics are computed on demand over the
+samples captured so far (see analytics.py). A capture's buffers take up to ~200 MB,
+so only the last CAPTURE_KEEP_FINISHED finished captures are kept.
+"""
+import asyncio
+import time
+import uuid
+from typing import Callable, Dict, List
+
+from pydantic import BaseModel
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs
+from chassis_controller.app.lazy import lazy_import
+from chassis_controller.app.routers.interfaces.utils import rand_request_id
+from chassis_controller.app.routers.interfaces.utils_meerstetter import (
+    MeerstetterBusPacket,
+    MeerstetterBusPacketType,
+)
+from chassis_controller.app.routers.interfaces.MeerstetterBus import (
+    hold_meerstetter_connection,
+    meerstetter_bus_timed_exchanges,
+    release_meerstetter_connection,
+)
+from chassis_controller.app.tec.analytics import ANALYTICS_BAND, segment_metrics
+from chassis_controller.app.tec.bus import heater_address
+from chassis_controller.app.tec.config_cache import TEC_CONFIG_CACHE, TecConfigCache
+from chassis_controller.app.tec.profile import ProfileRunState, evict_finished
+
+np = lazy_import("numpy")  # Only loaded when a capture starts, keeps it off the server's startup
+
+CAPTURE_INTERVAL = 0.1  # Default seconds between samples
+CAPTURE_CAPACITY = 200000  # Default samples per heater (5.5 h at 10 Hz)
+CAPTURE_MAX_CAPACITY = 5000000
+CAPTURE_SETPOINT = "Target Object Temp (Set)"
+CAPTURE_KEEP_FINISHED = 4  # Finished captures kept for analytics, older ones are dropped when a capture starts
+
+
+class CaptureRequest(BaseModel):
+    heaters: List[MeerstetterIDs] = list(MeerstetterIDs)
+    interval: float = CAPTURE_INTERVAL  # Seconds between samples
+    capacity: int = CAPTURE_CAPACITY  # Samples per heater, the capture stops when full
+
+
+class RunCapture:
+    """Samples the heaters of a run into preallocated arrays until stopped or full"""
+
+    def __init__(
+        self,
+        request: CaptureRequest,
+        exchange: Callable = meerstetter_bus_timed_exchanges,
+        cache: TecConfigCache = TEC_CONFIG_CACHE,
+        hold: Callable = hold_meerstetter_connection,
+        release: Callable = release_meerstetter_connection,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable = asyncio.sleep,
+    ) -> None:
+        if not request.heaters:
+            raise ValueError("Capture has no heaters")
+        if request.interval <= 0:
+            raise ValueError("Capture interval must be positive")
+        if not 0 < request.capacity <= CAPTURE_MAX_CAPACITY:
+            raise ValueError(f"Capture capacity must be between 1 and {CAPTURE_MAX_CAPACITY}")
+        self.run_id = uuid.uuid4().hex[:8]
+        self.heaters = list(dict.fromkeys(request.heaters))
+        self.addresses = [heater_address(h) for h in self.heaters]
+        self.interval = request.interval
+        self.state = ProfileRunState.pending
+        self.error = None
+        self.samples = 0
+        self.missed = 0  # Sampling deadlines skipped because the bus was busy
+        self.t = np.full(request.capacity, np.nan)
+        self.temperature = np.full((request.capacity, len(self.heaters)), np.nan, dtype=np.float32)
+        self.setpoint = np.full((request.capacity, len(self.heaters)), np.nan, dtype=np.float32)
+        self._exchange = exchange
+        self._cache = cache
+        self._hold = hold
+        self._release = release
+        self._clock = clock
+        self._sleep = sleep
+        self._started = None
+        self._task = None
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in (ProfileRunState.pending, ProfileRunState.running)
+
+    def _packet(self, address: int, parameter: str) -> MeerstetterBusPacket:
+        return MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=address, sequence=rand_request_id(), parameter=parameter)
+
+    async def sample(self) -> None:
+        """Read the temperatures (and uncached setpoints) of all heaters in one exchange"""
+        n = self.samples
+        setpoints = [self._cache.get(address, CAPTURE_SETPOINT) for address in self.addresses]
+        pkts = [self._packet(address, "Object Temperature") for address in self.addresses]
+        pkts += [self._packet(address, CAPTURE_SETPOINT) for address, sp in zip(self.addresses, setpoints) if sp is None]
+        pkts, _, _ = await self._exchange(pkts)
+        reads = iter(pkts[len(self.addresses):])
+        for h, pkt in enumerate(pkts[:len(self.addresses)]):
+            if pkt.error is None:
+                self.temperature[n, h] = pkt.data
+            if setpoints[h] is None:
+                read = next(reads)
+                self._cache.record(read)
+                setpoints[h] = read.data if read.error is None else np.nan
+            self.setpoint[n, h] = setpoints[h]
+        self.t[n] = self._clock() - self._started
+        self.samples += 1
+
+    async def run(self) -> None:
+        """Sample until stopped or the buffers are full, this is the body of the capture's task"""
+        self.state = ProfileRunState.running
+        self._started = self._clock()
+        held = False
+        try:
+            await self._hold()
+            held = True
+            deadline = self._started
+            while self.samples < self.t.size:
+                await self.sample()
+                deadline += self.interval
+                now = self._clock()
+                if now > deadline:
+                    skipped = int((now - deadline) // self.interval) + 1
+                    self.missed += skipped
+                    deadline += skipped * self.interval
+                await self._sleep(deadline - now)
+            self.state = ProfileRunState.completed
+        except asyncio.CancelledError:
+            self.state = ProfileRunState.completed  # Stopped by the client
+        except Exception as e:
+            self.state = ProfileRunState.error
+            self.error = str(e)
+        finally:
+            if held:
+                self._release()
+
+    def start(self) -> "RunCapture":
+        """Schedule the capture on the running event loop"""
+        self._task = asyncio.get_running_loop().create_task(self.run())
+        return self
+
+    def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    def status(self) -> dict:
+        n = self.samples
+        return {
+            "run_id": self.run_id,
+            "heaters": self.heaters,
+            "state": self.state,
+            "samples": n,
+            "capacity": self.t.size,
+            "missed": self.missed,
+            "duration_s": None if n == 0 else round(float(self.t[n - 1]), 3),
+            "error": self.error,
+        }
+
+    def analytics(self, band: float = ANALYTICS_BAND) -> Dict[str, List[dict]]:
+        """Per-segment metrics by heater over the samples captured so far"""
+        n = self.samples
+        metrics = segment_metrics(self.t[:n], self.temperature[:n], self.setpoint[:n], band)
+        columns = [name for name in metrics if name != "heater"]
+        rows = np.column_stack([metrics[name] for name in columns]).tolist() if n else []
+        heaters = {heater.value: [] for heater in self.heaters}
+        for h, row in zip(metrics["heater"].tolist(), rows):
+            segment = {}
+            for name, value in zip(columns, row):
+                if value != value:  # NaN
+                    value = None
+                elif name in ("cycle", "stable_windows"):
+                    value = int(value)
+                else:
+                    value = round(value, 3)
+                segment[name] = value
+            heaters[self.heaters[h].value].append(segment)
+        return heaters
+
+
+CAPTURE_RUNS: Dict[str, RunCapture] = {}
+
+
+def start_capture(request: CaptureRequest) -> RunCapture:
+    """Start a run capture, raises ValueError if the request is invalid"""
+    capture = RunCapture(request)
+    CAPTURE_RUNS[capture.run_id] = capture
+    evict_finished(CAPTURE_RUNS, CAPTURE_KEEP_FINISHED)
+    return capture.start()
@@ -0,0 +1,192 @@
+
+# Version: Test
+"""
+Transactional apply of a full TEC configuration document to one heater.
+
+Over a single Meerstetter connection the current values are read back, only the
+parameters that differ are written (in TEC_CONFIG_PARAMETERS order, so the output
+stage is enabled last) and then read again to verify them. If a write is rejected or
+does not verify, the parameters already written are restored to their previous values.
+
+Automatic saving to flash (parameter 108, 0 = enabled, the device default) is disabled
+while writing so that a partially applied configuration is never persisted. Once the new
+configuration is verified, saving is enabled again when the document asks for it (which
+saves the configuration) and otherwise left disabled, so the configuration only lives in
+RAM until the next reset (or a later apply with save_to_flash). If the apply fails or is
+rolled back, the previous saving state is restored, also when the bus fails midway.
+If the device does not acknowledge disabling saving, nothing is written; the reported
+saving state is the last one the device acknowledged.
+
+Values are checked against the parameter ranges (as POST /tec/param does) before anything
+is written; a document that names unknown parameters or holds out of range values is
+rejected with a ConfigRejected error.
+"""
+import time
+from struct import pack, unpack
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from chassis_controller.app.routers.interfaces.utils import rand_request_id
+from chassis_controller.app.routers.interfaces.utils_meerstetter import (
+    TEC_PARAMETER_LIST,
+    MeerstetterBusPacket,
+    MeerstetterBusPacketType,
+)
+from chassis_controller.app.routers.interfaces.MeerstetterBus import meerstetter_connection
+from chassis_controller.app.tec.bus import acked
+from chassis_controller.app.tec.config_cache import TEC_CONFIG_CACHE
+
+# Writable configuration parameters, in the order they are written
+TEC_CONFIG_PARAMETERS = [
+    "Current Limitation",
+    "Voltage Limitation",
+    "Current Error Threshold",
+    "Voltage Error Threshold",
+    "Object Upper Error Threshold",
+    "Object Lower Error Threshold",
+    "Sink Upper Error Threshold",
+    "Sink Lower Error Threshold",
+    "Kp",
+    "Ti",
+    "Td",
+    "Fan Control Enable",
+    "Target Temperature",
+    "0% Speed",
+    "100% Speed",
+    "Target Object Temp (Set)",
+    "Status",
+]
+
+TEC_FLASH_PARAMETER = "Save Data to Flash"
+TEC_FLASH_SAVE_ENABLED = 0
+TEC_FLASH_SAVE_DISABLED = 1
+
+
+class ConfigRejected(ValueError):
+    """The configuration document is invalid, nothing was written"""
+
+
+class TecConfigDocument(BaseModel):
+    parameters: Dict[str, float]  # TEC parameter name -> value
+    save_to_flash: bool = False  # Persist the configuration once it is verified, otherwise it is kept in RAM only
+
+
+def coerce_value(parameter: str, value):
+    """Convert a value to the type the device stores the parameter as"""
+    if TEC_PARAMETER_LIST.get_by_name(parameter).format == "INT32":
+        return int(value)
+    return float(unpack("!f", pack("!f", float(value)))[0])  # FLOAT32 precision
+
+
+def validate_config(document: TecConfigDocument) -> Dict[str, float]:
+    """The document's values in TEC_CONFIG_PARAMETERS order, converted to the device types.
+    Raises ConfigRejected for unknown parameters and out of range values."""
+    unknown = [p for p in document.parameters if p not in TEC_CONFIG_PARAMETERS]
+    if unknown:
+        raise ConfigRejected(f"Not writable configuration parameters: {', '.join(unknown)}")
+    desired = {}
+    for p in TEC_CONFIG_PARAMETERS:
+        if p in document.parameters:
+            try:
+                desired[p] = coerce_value(p, TEC_PARAMETER_LIST.get_by_name(p).check_value(document.parameters[p]))
+            except ValueError as e:
+                raise ConfigRejected(str(e))
+    return desired
+
+
+def _packets(packet_type: MeerstetterBusPacketType, address: int, parameters: List[str], values: Optional[Dict[str, float]] = None) -> List[MeerstetterBusPacket]:
+    values = values or {}
+    sequence = rand_request_id()
+    return [
+        MeerstetterBusPacket(
+            packet_type,
+            address=address,
+            sequence=(sequence + n) % 0x10000,  # Distinct, responses are matched by sequence number
+            parameter=parameter,
+            value=values.get(parameter, 0),
+        )
+        for n, parameter in enumerate(parameters)
+    ]
+
+
+async def _exchange(conn, pkts: List[MeerstetterBusPacket]) -> List[MeerstetterBusPacket]:
+    if pkts:
+        # Reads are pipelined, writes go one at a time so they are applied in order
+        if all(pkt.packet_type == MeerstetterBusPacketType.GET_PARAMETER for pkt in pkts):
+            await conn.exchange_pipelined_async(pkts)
+        else:
+            await conn.exchange_packets_async(pkts)
+        for pkt in pkts:
+            TEC_CONFIG_CACHE.record(pkt)
+    return pkts
+
+
+async def apply_config(
+    address: int,
+    document: TecConfigDocument,
+    connection: Callable = meerstetter_connection,
+) -> dict:
+    """Apply the configuration document to the Meerstetter at the address, see the module docstring"""
+    desired = validate_config(document)
+
+    begin = time.perf_counter_ns()
+    async with connection() as conn:
+        # Read back the current values (and the flash saving state) in one pass
+        reads = await _exchange(conn, _packets(MeerstetterBusPacketType.GET_PARAMETER, address, [TEC_FLASH_PARAMETER] + list(desired)))
+        failed = [pkt.parameter.name for pkt in reads if pkt.error is not None]
+        if failed:
+            raise ValueError(f"Could not read back: {', '.join(failed)}")
+        flash_before = reads[0].data
+        current = {pkt.parameter.name: coerce_value(pkt.parameter.name, pkt.data) for pkt in reads[1:]}
+        changed = [p for p in desired if desired[p] != current[p]]
+
+        written, rejected, mismatched, rolled_back = [], [], [], []
+        flash_after = flash_before
+        if changed:
+            [pkt] = await _exchange(conn, _packets(MeerstetterBusPacketType.SET_PARAMETER, address, [TEC_FLASH_PARAMETER], {TEC_FLASH_PARAMETER: TEC_FLASH_SAVE_DISABLED}))
+            if not acked(pkt):
+                raise ValueError(f"Could not disable saving to flash: {pkt.error or 'not acknowledged'}")
+            flash_after = TEC_FLASH_SAVE_DISABLED
+            try:
+                for pkt in await _exchange(conn, _packets(MeerstetterBusPacketType.SET_PARAMETER, address, changed, desired)):
+                    (written if acked(pkt) else rejected).append(pkt.parameter.name)
+                # Verify what the device now holds
+                for pkt in await _exchange(conn, _packets(MeerstetterBusPacketType.GET_PARAMETER, address, written)):
+                    name = pkt.parameter.name
+                    if pkt.error is not None or coerce_value(name, pkt.data) != desired[name]:
+                        mismatched.append(name)
+                if rejected or mismatched:
+                    for pkt in await _exchange(conn, _packets(MeerstetterBusPacketType.SET_PARAMETER, address, written, current)):
+                        if acked(pkt):
+                            rolled_back.append(pkt.parameter.name)
+            except BaseException:
+                # Bus failure midway, do not leave automatic saving disabled
+                try:
+                    await _exchange(conn, _packets(MeerstetterBusPacketType.SET_PARAMETER, address, [TEC_FLASH_PARAMETER], {TEC_FLASH_PARAMETER: flash_before}))
+                except Exception:
+                    pass  # The bus is gone, the original error is the one to report
+                raise
+
+        applied = not (rejected or mismatched)
+        flash_wanted = flash_after
+        if not applied:
+            flash_wanted = flash_before
+        elif document.save_to_flash:
+            flash_wanted = TEC_FLASH_SAVE_ENABLED
+        if flash_wanted != flash_after:
+            [pkt] = await _exchange(conn, _packets(MeerstetterBusPacketType.SET_PARAMETER, address, [TEC_FLASH_PARAMETER], {TEC_FLASH_PARAMETER: flash_wanted}))
+            if acked(pkt):
+                flash_after = flash_wanted
+
+    return {
+        "applied": applied,
+        "changed": {p: {"from": current[p], "to": desired[p]} for p in changed},
+        "unchanged": [p for p in desired if p not in changed],
+        "written": written,
+        "rejected": rejected,
+        "mismatched": mismatched,
+        "rolled_back": rolled_back,
+        "flash_save": {"before": flash_before, "after": flash_after},
+        "_duration_us": (time.perf_counter_ns() - begin) // 1000,
+    }
@@ -0,0 +1,102 @@
+
+# Version: Test
+"""
+Write-through cache for the TEC configuration parameters.
+
+Configuration parameters (PID gains, error thresholds, fan target, setpoint) only change
+when they are written through this API, so reads are served from the cache once a value
+has been read from, or acknowledged by, the device. A heater's entries are dropped when it
+is reset, when an exchange with it fails and when the watcher sees it go to Init or Error
+or change its error number. Reads answered from the cache have an empty raw packet.
+"""
+from typing import Dict, Optional, Tuple
+
+from chassis_controller.app.routers.interfaces.utils_meerstetter import (
+    ACK,
+    MeerstetterBusPacket,
+    MeerstetterBusPacketType,
+)
+from chassis_controller.app.routers.interfaces.MeerstetterBus import meerstetter_bus_timed_exchange
+
+TEC_CACHED_PARAMETERS = {
+    "Kp",
+    "Ti",
+    "Td",
+    "Current Error Threshold",
+    "Voltage Error Threshold",
+    "Object Upper Error Threshold",
+    "Object Lower Error Threshold",
+    "Sink Upper Error Threshold",
+    "Sink Lower Error Threshold",
+    "Target Temperature",
+    "Target Object Temp (Set)",
+}
+
+
+class TecConfigCache:
+    """Configuration parameter values by Meerstetter address, parameter name and instance (channel)"""
+
+    def __init__(self) -> None:
+        self._values: Dict[int, Dict[Tuple[str, int], float]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, address: int, parameter: str, instance: int = 1) -> Optional[float]:
+        return self._values.get(address, {}).get((parameter, instance))
+
+    def put(self, address: int, parameter: str, value, instance: int = 1) -> None:
+        if parameter in TEC_CACHED_PARAMETERS:
+            self._values.setdefault(address, {})[(parameter, instance)] = value
+
+    def invalidate(self, address: Optional[int] = None) -> None:
+        """Drop the cached values of one address (or of every address)"""
+        if address is None:
+            self._values.clear()
+        else:
+            self._values.pop(address, None)
+
+    def record(self, pkt: MeerstetterBusPacket) -> None:
+        """Update the cache from a packet that has been exchanged with the device"""
+        if pkt.error is not None or pkt.packet_type == MeerstetterBusPacketType.SYS_RESET:
+            self.invalidate(pkt.address)
+        elif pkt.packet_type == MeerstetterBusPacketType.GET_PARAMETER:
+            self.put(pkt.address, pkt.parameter.name, pkt.data, pkt.parameter_instance)
+        elif pkt.packet_type == MeerstetterBusPacketType.SET_PARAMETER:
+            if isinstance(pkt.query.RESPONSE, ACK):
+                self.put(pkt.address, pkt.parameter.name, pkt.value, pkt.parameter_instance)
+            else:
+                self.invalidate(pkt.address)
+
+    def snapshot(self) -> Dict[int, Dict[str, float]]:
+        """Cached values by address and parameter name (suffixed with the instance for instances other than 1)"""
+        return {
+            address: {name if instance == 1 else f"{name} [{instance}]": value for (name, instance), value in values.items()}
+            for address, values in self._values.items()
+        }
+
+
+TEC_CONFIG_CACHE = TecConfigCache()
+
+
+async def tec_config_exchange(pkt: MeerstetterBusPacket, refresh: bool = False) -> tuple:
+    """
+    Drop-in replacement for meerstetter_bus_timed_exchange that goes through the configuration
+    cache: reads of cached parameters are answered without a bus exchange (elapsed 0) unless
+    refresh is set, and every exchange updates or invalidates the cache.
+    """
+    if pkt.packet_type == MeerstetterBusPacketType.GET_PARAMETER and not refresh:
+        value = TEC_CONFIG_CACHE.get(pkt.address, pkt.parameter.name, pkt.parameter_instance)
+        if value is not None:
+            TEC_CONFIG_CACHE.hits += 1
+            pkt.data = value
+            pkt.raw_packet = ""  # No response was received
+            return (pkt, 0)
+        if pkt.parameter.name in TEC_CACHED_PARAMETERS:
+            TEC_CONFIG_CACHE.misses += 1
+    try:
+        pkt, elapsed = await meerstetter_bus_timed_exchange(pkt)
+    except Exception:
+        TEC_CONFIG_CACHE.invalidate(pkt.address)
+        raise
+    TEC_CONFIG_CACHE.record(pkt)
+    return (pkt, elapsed)
@@ -0,0 +1,113 @@
+
+# Version: Test
+"""
+Online time-to-setpoint (ETA) estimator for the TEC heaters.
+
+Each heater is modelled as a first order system whose approach rate is limited by
+the output current: far from the target it moves at a roughly constant maximum rate,
+close to it the error decays exponentially (de/dt = -e / tau). The approach rate, the
+maximum rate and the decay rate 1/tau are updated with exponentially weighted averages
+from each pair of consecutive samples, so every update and estimate is O(1) and no
+history is kept. Samples come from the TEC watcher, which reads Object Temperature and
+Target Object Temperature in the same exchange as its status reads.
+"""
+import math
+import time
+from typing import Dict, Optional
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs
+from chassis_controller.app.tec.watcher import TEC_WATCHER
+
+ETA_PARAMETERS = ["Object Temperature", "Target Object Temperature"]
+ETA_BAND = 0.5  # At target when within this many C
+ETA_ALPHA = 0.3  # Weight of the newest sample in the averages
+ETA_RATE_DECAY = 0.99  # Per sample decay of the observed maximum rate
+ETA_LIMITED_FRACTION = 0.9  # Approaching at this fraction of the maximum rate counts as current limited
+
+
+class HeaterEta:
+    """Incremental model of one heater's approach to its target"""
+
+    def __init__(self) -> None:
+        self.t = None
+        self.temperature = None
+        self.target = None
+        self.rate = None  # Average approach rate towards the target [C/s]
+        self.max_rate = 0.0  # Highest recent approach rate [C/s]
+        self.decay = None  # Average exponential decay rate of the error [1/s]
+
+    def update(self, t: float, temperature: float, target: float, band: float = ETA_BAND) -> None:
+        if self.target is not None and target != self.target:
+            # New setpoint, the approach so far says nothing about the new one
+            self.rate = None
+            self.decay = None
+        elif self.t is not None and t > self.t:
+            dt = t - self.t
+            previous_error = abs(self.temperature - target)
+            error = abs(temperature - target)
+            rate = (previous_error - error) / dt
+            self.rate = rate if self.rate is None else ETA_ALPHA * rate + (1 - ETA_ALPHA) * self.rate
+            self.max_rate = max(self.max_rate * ETA_RATE_DECAY, rate)
+            # Only use clear exponential steps: slower than the current limit (a constant rate
+            # is the current limited phase) and not dominated by noise near the target
+            limited = rate >= ETA_LIMITED_FRACTION * self.max_rate
+            if not limited and previous_error > 2 * band and 0 < error < previous_error:
+                decay = math.log(previous_error / error) / dt
+                self.decay = decay if self.decay is None else ETA_ALPHA * decay + (1 - ETA_ALPHA) * self.decay
+        self.t = t
+        self.temperature = temperature
+        self.target = target
+
+    def estimate(self, band: float = ETA_BAND) -> dict:
+        """Predicted seconds until the heater is within the band of its target (None if unknown)"""
+        if self.t is None:
+            return {"eta_s": None, "model": None}
+        error = abs(self.temperature - self.target)
+        if error <= band:
+            return {"eta_s": 0.0, "model": "at target"}
+        if self.decay is not None and self.decay > 0:
+            # Current limited at max_rate until the exponential approach is slower than that
+            switch = self.max_rate / self.decay
+            if self.max_rate > 0 and error > switch > band:
+                eta = (error - switch) / self.max_rate + math.log(switch / band) / self.decay
+            else:
+                eta = math.log(error / band) / self.decay
+            return {"eta_s": eta, "model": "first order"}
+        if self.rate is not None and self.rate > 0:
+            return {"eta_s": (error - band) / self.rate, "model": "linear"}
+        return {"eta_s": None, "model": None}
+
+
+class EtaEstimator:
+    """ETA models of every heater, fed by the watcher samples"""
+
+    def __init__(self, band: float = ETA_BAND) -> None:
+        self.band = band
+        self.heaters: Dict[MeerstetterIDs, HeaterEta] = {}
+        self._updated: Dict[MeerstetterIDs, float] = {}
+
+    def update(self, heater: MeerstetterIDs, values: Dict[str, float], t: float) -> None:
+        self.heaters.setdefault(heater, HeaterEta()).update(
+            t, values["Object Temperature"], values["Target Object Temperature"], self.band)
+        self._updated[heater] = time.time()
+
+    def estimate(self, heater: MeerstetterIDs) -> Optional[dict]:
+        model = self.heaters.get(heater)
+        if model is None:
+            return None
+        estimate = model.estimate(self.band)
+        eta = estimate["eta_s"]
+        return {
+            "temperature": model.temperature,
+            "target": model.target,
+            "eta_s": None if eta is None else round(eta, 1),
+            "eta_at": None if eta is None else round(self._updated[heater] + eta, 1),
+            "model": estimate["model"],
+            "rate_c_per_s": None if model.rate is None else round(model.rate, 4),
+            "tau_s": None if not model.decay else round(1 / model.decay, 2),
+            "sampled_at": round(self._updated[heater], 3),
+        }
+
+
+TEC_ETA = EtaEstimator()
+TEC_WATCHER.add_listener(ETA_PARAMETERS, TEC_ETA.update)
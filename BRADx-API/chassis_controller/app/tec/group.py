@@ -0,0 +1,190 @@
+
+# Version: Test
+"""
+Synchronized control of several TEC heaters.
+
+All frames of a group operation are sent back-to-back over a single Meerstetter
+connection, so the heaters of the group receive a new setpoint within one bus
+round trip of each other. The spread (skew) between the first and last ACK and
+between the times each heater reached stability are measured and reported.
+
+A group operation only succeeds when every heater answered: a write any heater did
+not acknowledge, or a read any heater did not answer, raises a GroupError naming the
+failed heaters (so a group program step fails instead of going on without them).
+"""
+import time
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs
+from chassis_controller.app.routers.interfaces.utils import rand_request_id
+from chassis_controller.app.routers.interfaces.utils_meerstetter import (
+    TEC_PARAMETER_LIST,
+    MeerstetterBusPacket,
+    MeerstetterBusPacketType,
+)
+from chassis_controller.app.routers.interfaces.MeerstetterBus import meerstetter_bus_timed_exchanges
+from chassis_controller.app.tec.bus import acked, heater_address
+from chassis_controller.app.tec.config_cache import TEC_CONFIG_CACHE
+from chassis_controller.app.tec.profile import (
+    ProfileRun,
+    ProfileStep,
+    TEC_TEMPERATURE_IS_STABLE,
+    check_heaters_idle,
+    register_run,
+)
+
+ALL_HEATERS = list(MeerstetterIDs)
+
+
+class GroupError(ValueError):
+    """A group operation failed on some heaters, errors holds the reason by heater and
+    ack_us the ACK times of the heaters that did acknowledge a write"""
+
+    def __init__(self, operation: str, errors: Dict[MeerstetterIDs, str], ack_us: Optional[Dict[MeerstetterIDs, int]] = None) -> None:
+        self.errors = errors
+        self.ack_us = ack_us or {}
+        detail = "; ".join(f"{h.value}: {reason}" for h, reason in errors.items())
+        super().__init__(f"{operation} failed on {len(errors)} heater(s): {detail}")
+
+
+class GroupProgram(BaseModel):
+    heaters: List[MeerstetterIDs] = ALL_HEATERS
+    steps: List[ProfileStep]
+
+
+class HeaterGroup:
+    """Reads and writes the same parameter on a group of heaters over one connection"""
+
+    def __init__(
+        self,
+        heaters: List[MeerstetterIDs],
+        exchange: Callable = meerstetter_bus_timed_exchanges,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if len(heaters) == 0:
+            raise ValueError("Heater group is empty")
+        self.heaters = list(dict.fromkeys(heaters))  # Drop duplicates, keep order
+        self.addresses = [heater_address(h) for h in self.heaters]
+        self._exchange = exchange
+        self._clock = clock
+        self.write_skew_us = None  # Spread of the ACKs of the last group write
+        self.max_write_skew_us = None
+        self.stable_skew_s = None  # Spread of the times the heaters became stable after the last write
+        self._written_at = None
+        self._stable_at: Dict[MeerstetterIDs, float] = {}
+
+    async def write(self, _address, parameter: str, value) -> dict:
+        """Write the parameter to every heater of the group, returns the ACK times and skew.
+        Raises a ValueError, before anything is sent, if the parameter is not writable or the value
+        is out of its range, and a GroupError if any heater did not acknowledge the write."""
+        value = TEC_PARAMETER_LIST.get_by_name(parameter).check_value(value)
+        pkts = [
+            MeerstetterBusPacket(
+                MeerstetterBusPacketType.SET_PARAMETER,
+                address=address,
+                sequence=rand_request_id(),
+                parameter=parameter,
+                value=value,
+            )
+            for address in self.addresses
+        ]
+        pkts, elapsed, offsets = await self._exchange(pkts)
+        for pkt in pkts:
+            TEC_CONFIG_CACHE.record(pkt)
+        errors = {h: pkt.error or "No ACK" for h, pkt in zip(self.heaters, pkts) if not acked(pkt)}
+        if errors:
+            acks = {h: offset for h, offset in zip(self.heaters, offsets) if h not in errors}
+            raise GroupError(f"Write of {parameter}", errors, acks)
+        self._written_at = self._clock()
+        self._stable_at = {}
+        self.stable_skew_s = None
+        self.write_skew_us = max(offsets) - min(offsets)
+        self.max_write_skew_us = max(self.write_skew_us, self.max_write_skew_us or 0)
+        return {
+            "_duration_us": elapsed,
+            "ack_us": dict(zip(self.heaters, offsets)),
+            "skew_us": self.write_skew_us,
+        }
+
+    async def read_all(self, parameter: str) -> Dict[MeerstetterIDs, float]:
+        """Read the parameter from every heater of the group, raises a GroupError if any heater did not answer"""
+        pkts = [
+            MeerstetterBusPacket(
+                MeerstetterBusPacketType.GET_PARAMETER,
+                address=address,
+                sequence=rand_request_id(),
+                parameter=parameter,
+            )
+            for address in self.addresses
+        ]
+        pkts, _, _ = await self._exchange(pkts)
+        for pkt in pkts:
+            TEC_CONFIG_CACHE.record(pkt)
+        errors = {h: pkt.error for h, pkt in zip(self.heaters, pkts) if pkt.error is not None}
+        if errors:
+            raise GroupError(f"Read of {parameter}", errors)
+        values = {h: pkt.data for h, pkt in zip(self.heaters, pkts)}
+        if parameter == "Temperature is Stable":
+            now = self._clock()
+            for h, v in values.items():
+                if v == TEC_TEMPERATURE_IS_STABLE:
+                    self._stable_at.setdefault(h, now)
+                else:
+                    self._stable_at.pop(h, None)
+            if len(self._stable_at) == len(self.heaters):
+                self.stable_skew_s = max(self._stable_at.values()) - min(self._stable_at.values())
+        return values
+
+    async def read(self, _address, parameter: str):
+        """Group read used by the profile engine, the group is stable only once every heater is"""
+        values = await self.read_all(parameter)
+        if parameter == "Temperature is Stable":
+            return min(values.values())
+        return values[self.heaters[0]]
+
+    def stable_times(self) -> Dict[MeerstetterIDs, Optional[float]]:
+        """Seconds from the last group write until each heater was seen stable"""
+        if self._written_at is None:
+            return {h: None for h in self.heaters}
+        return {
+            h: None if h not in self._stable_at else round(self._stable_at[h] - self._written_at, 3)
+            for h in self.heaters
+        }
+
+    def status(self) -> dict:
+        return {
+            "heaters": self.heaters,
+            "write_skew_us": self.write_skew_us,
+            "max_write_skew_us": self.max_write_skew_us,
+            "stable_after_s": self.stable_times(),
+            "stable_skew_s": None if self.stable_skew_s is None else round(self.stable_skew_s, 3),
+        }
+
+
+class GroupProfileRun(ProfileRun):
+    """Runs one step program in lockstep on a group of heaters"""
+
+    def __init__(self, group: HeaterGroup, steps: List[ProfileStep], **kwargs) -> None:
+        super().__init__(group.heaters[0], None, steps, read=group.read, write=group.write, **kwargs)
+        self.group = group
+
+    @property
+    def heaters(self) -> List[MeerstetterIDs]:
+        return self.group.heaters
+
+    def status(self) -> dict:
+        status = super().status()
+        status["heater"] = None
+        status["group"] = self.group.status()
+        return status
+
+
+def start_group_program(program: GroupProgram) -> GroupProfileRun:
+    """Validate and start a group step program, raises ValueError if it is invalid or a heater is busy"""
+    group = HeaterGroup(program.heaters)
+    check_heaters_idle(group.heaters)
+    run = GroupProfileRun(group, program.steps)
+    register_run(run)
+    return run.start()
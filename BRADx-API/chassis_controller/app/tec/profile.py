@@ -0,0 +1,280 @@
+
+# Version: Test
+"""
+Server-side temperature profile executor for the TEC heaters.
+
+A profile is a list of steps run against one heater:
+    - setpoint: write the target temperature, optionally waiting for the stability flag
+    - ramp: move the target temperature to a new value at a fixed rate (C/s)
+    - hold: keep the current target for a duration (s)
+    - cycle: jump back to an earlier step a number of times (e.g. PCR denature/anneal loops)
+
+Step timing is scheduled on the event loop against the monotonic clock using absolute
+deadlines, so bus round trips do not accumulate into the hold and ramp times.
+"""
+import asyncio
+import time
+import uuid
+from collections import deque
+from enum import Enum
+from typing import Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs
+from chassis_controller.app.tec.bus import heater_address, read_parameter, write_parameter
+
+PROFILE_RAMP_INTERVAL = 0.5  # Seconds between intermediate setpoints while ramping
+PROFILE_STABLE_POLL = 0.5  # Seconds between stability flag reads
+PROFILE_STABLE_TIMEOUT = 600.0  # Default max wait for the stability flag (seconds)
+PROFILE_MAX_EVENTS = 256  # Events kept per run
+PROFILE_KEEP_FINISHED = 32  # Finished runs kept for their results, older ones are dropped when a run starts
+
+TEC_TEMPERATURE_IS_STABLE = 2  # "Temperature is Stable" value when the object temperature is stable
+
+
+class ProfileStepType(str, Enum):
+    setpoint = "setpoint"
+    ramp = "ramp"
+    hold = "hold"
+    cycle = "cycle"
+
+
+class ProfileRunState(str, Enum):
+    pending = "pending"
+    running = "running"
+    completed = "completed"
+    aborted = "aborted"
+    error = "error"
+
+
+class ProfileStep(BaseModel):
+    type: ProfileStepType
+    temperature: Optional[float] = None  # setpoint/ramp: target temperature [C]
+    rate: Optional[float] = None  # ramp: rate [C/s]
+    duration: Optional[float] = None  # hold: time [s]
+    wait_stable: bool = False  # setpoint: wait for the stability flag before the next step
+    timeout: Optional[float] = None  # setpoint: max wait for the stability flag [s]
+    goto: Optional[int] = None  # cycle: index of the step to jump back to
+    count: Optional[int] = None  # cycle: number of times to jump back
+
+
+class TemperatureProfile(BaseModel):
+    heater: MeerstetterIDs
+    steps: List[ProfileStep]
+
+
+def validate_profile(steps: List[ProfileStep]) -> None:
+    """Raise a ValueError describing the first invalid step of the profile"""
+    if len(steps) == 0:
+        raise ValueError("Profile has no steps")
+    for i, step in enumerate(steps):
+        if step.type in (ProfileStepType.setpoint, ProfileStepType.ramp) and step.temperature is None:
+            raise ValueError(f"Step {i}: {step.type.value} requires a temperature")
+        if step.type == ProfileStepType.ramp and (step.rate is None or step.rate <= 0):
+            raise ValueError(f"Step {i}: ramp requires a positive rate")
+        if step.type == ProfileStepType.hold and (step.duration is None or step.duration < 0):
+            raise ValueError(f"Step {i}: hold requires a duration")
+        if step.type == ProfileStepType.cycle:
+            if step.goto is None or not 0 <= step.goto < i:
+                raise ValueError(f"Step {i}: cycle goto must point to an earlier step")
+            if step.count is None or step.count < 0:
+                raise ValueError(f"Step {i}: cycle requires a count")
+
+
+class ProfileRun:
+    """Runs the steps of a temperature profile against one heater"""
+
+    def __init__(
+        self,
+        heater: MeerstetterIDs,
+        address: int,
+        steps: List[ProfileStep],
+        read: Callable = read_parameter,
+        write: Callable = write_parameter,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable = asyncio.sleep,
+    ) -> None:
+        validate_profile(steps)
+        self.run_id = uuid.uuid4().hex[:8]
+        self.heater = heater
+        self.address = address
+        self.steps = steps
+        self.state = ProfileRunState.pending
+        self.step_index = 0
+        self.setpoint = None  # Last target temperature written by this run
+        self.error = None
+        self.events = deque(maxlen=PROFILE_MAX_EVENTS)
+        self._read = read
+        self._write = write
+        self._clock = clock
+        self._sleep = sleep
+        self._cycles_left = {i: s.count for i, s in enumerate(steps) if s.type == ProfileStepType.cycle}
+        self._started = None
+        self._finished = None
+        self._step_started = None
+        self._step_deadline = None
+        self._task = None
+
+    def _elapsed(self) -> float:
+        return 0.0 if self._started is None else (self._finished or self._clock()) - self._started
+
+    def _log(self, event: str, **kwargs) -> None:
+        self.events.append({"t": round(self._elapsed(), 3), "step": self.step_index, "event": event, **kwargs})
+
+    async def _sleep_until(self, deadline: float) -> None:
+        delay = deadline - self._clock()
+        if delay > 0:
+            await self._sleep(delay)
+
+    async def _set(self, temperature: float) -> None:
+        await self._write(self.address, "Target Object Temp (Set)", float(temperature))
+        self.setpoint = temperature
+
+    async def _run_setpoint(self, step: ProfileStep) -> None:
+        await self._set(step.temperature)
+        self._log("setpoint", temperature=step.temperature)
+        if not step.wait_stable:
+            return
+        timeout = PROFILE_STABLE_TIMEOUT if step.timeout is None else step.timeout
+        self._step_deadline = self._step_started + timeout
+        next_poll = self._clock()
+        while True:
+            if await self._read(self.address, "Temperature is Stable") == TEC_TEMPERATURE_IS_STABLE:
+                self._log("stable", after_s=round(self._clock() - self._step_started, 3))
+                return
+            next_poll += PROFILE_STABLE_POLL
+            if next_poll > self._step_deadline:
+                raise TimeoutError(f"Heater not stable at {step.temperature} C after {timeout} s")
+            await self._sleep_until(next_poll)
+
+    async def _run_ramp(self, step: ProfileStep) -> None:
+        start = self.setpoint
+        if start is None:
+            start = await self._read(self.address, "Target Object Temp (Set)")
+        delta = step.temperature - start
+        duration = abs(delta) / step.rate
+        self._step_deadline = self._step_started + duration
+        self._log("ramp", start=start, temperature=step.temperature, duration_s=round(duration, 3))
+        k = 1
+        while True:
+            t = self._step_started + k * PROFILE_RAMP_INTERVAL
+            if t >= self._step_deadline:
+                break
+            await self._sleep_until(t)
+            await self._set(start + delta * (t - self._step_started) / duration)
+            k += 1
+        await self._sleep_until(self._step_deadline)
+        await self._set(step.temperature)
+
+    async def _run_hold(self, step: ProfileStep) -> None:
+        self._step_deadline = self._step_started + step.duration
+        self._log("hold", duration_s=step.duration)
+        await self._sleep_until(self._step_deadline)
+
+    async def run(self) -> None:
+        """Execute the profile, this is the body of the run's task"""
+        self.state = ProfileRunState.running
+        self._started = self._clock()
+        self._log("start")
+        try:
+            while self.step_index < len(self.steps):
+                step = self.steps[self.step_index]
+                self._step_started = self._clock()
+                self._step_deadline = None
+                if step.type == ProfileStepType.setpoint:
+                    await self._run_setpoint(step)
+                elif step.type == ProfileStepType.ramp:
+                    await self._run_ramp(step)
+                elif step.type == ProfileStepType.hold:
+                    await self._run_hold(step)
+                elif step.type == ProfileStepType.cycle:
+                    if self._cycles_left[self.step_index] > 0:
+                        self._cycles_left[self.step_index] -= 1
+                        self._log("cycle", remaining=self._cycles_left[self.step_index])
+                        self.step_index = step.goto
+                        continue
+                    # Re-arm the counter so nested cycles repeat on the next outer pass
+                    self._cycles_left[self.step_index] = step.count
+                self.step_index += 1
+            self.state = ProfileRunState.completed
+            self._log("completed")
+        except asyncio.CancelledError:
+            self.state = ProfileRunState.aborted
+            self._log("aborted")
+        except Exception as e:
+            self.state = ProfileRunState.error
+            self.error = str(e)
+            self._log("error", detail=str(e))
+        finally:
+            self._finished = self._clock()
+
+    def start(self) -> "ProfileRun":
+        """Schedule the run on the running event loop"""
+        self._task = asyncio.get_running_loop().create_task(self.run())
+        return self
+
+    def abort(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    @property
+    def heaters(self) -> List[MeerstetterIDs]:
+        return [self.heater]
+
+    @property
+    def is_active(self) -> bool:
+        return self.state in (ProfileRunState.pending, ProfileRunState.running)
+
+    def status(self) -> dict:
+        step = self.steps[self.step_index] if self.step_index < len(self.steps) else None
+        remaining = None
+        if self.is_active and self._step_deadline is not None:
+            remaining = round(max(0.0, self._step_deadline - self._clock()), 3)
+        return {
+            "run_id": self.run_id,
+            "heater": self.heater,
+            "state": self.state,
+            "step_index": self.step_index,
+            "step_type": None if step is None else step.type,
+            "step_remaining_s": remaining,
+            "cycles_left": self._cycles_left,
+            "setpoint": self.setpoint,
+            "elapsed_s": round(self._elapsed(), 3),
+            "error": self.error,
+            "events": list(self.events),
+        }
+
+
+# Profile runs by ID (also group programs and autotune runs), the last PROFILE_KEEP_FINISHED finished
+# runs are kept so their results can still be read
+PROFILE_RUNS: Dict[str, ProfileRun] = {}
+
+
+def evict_finished(runs: Dict[str, object], keep: int) -> None:
+    """Drop the oldest finished runs of a registry (in start order) so that at most keep of them remain"""
+    finished = [run_id for run_id, run in runs.items() if not run.is_active]
+    for run_id in finished[:max(0, len(finished) - keep)]:
+        del runs[run_id]
+
+
+def check_heaters_idle(heaters: List[MeerstetterIDs]) -> None:
+    """Raise a ValueError if any of the heaters is already running a profile"""
+    for run in PROFILE_RUNS.values():
+        busy = set(run.heaters).intersection(heaters)
+        if run.is_active and busy:
+            raise ValueError(f"{', '.join(sorted(h.value for h in busy))} already running profile {run.run_id}")
+
+
+def register_run(run) -> None:
+    """Add a run to PROFILE_RUNS, dropping the oldest finished runs beyond PROFILE_KEEP_FINISHED"""
+    PROFILE_RUNS[run.run_id] = run
+    evict_finished(PROFILE_RUNS, PROFILE_KEEP_FINISHED)
+
+
+def start_profile(profile: TemperatureProfile) -> ProfileRun:
+    """Validate and start a profile, raises ValueError if it is invalid or the heater is busy"""
+    check_heaters_idle([profile.heater])
+    run = ProfileRun(profile.heater, heater_address(profile.heater), profile.steps)
+    register_run(run)
+    return run.start()
@@ -0,0 +1,66 @@
+
+# Version: Test
+"""
+Server-side wait for a TEC heater to reach and settle at its setpoint.
+
+The object temperature is sampled with an interval that scales with the distance to
+the setpoint (fast when close, slow when far away) and the temperature, setpoint and
+stability flag are read together over one connection per sample.
+"""
+import asyncio
+import time
+from typing import Callable, Optional
+
+from chassis_controller.app.tec.bus import read_parameters
+from chassis_controller.app.tec.profile import TEC_TEMPERATURE_IS_STABLE
+
+WAIT_STABLE_MIN_INTERVAL = 0.1  # Sampling interval at the setpoint (seconds)
+WAIT_STABLE_MAX_INTERVAL = 2.0  # Sampling interval far from the setpoint (seconds)
+WAIT_STABLE_BAND = 5.0  # Distance from the setpoint (C) at which the interval reaches the maximum
+
+WAIT_STABLE_PARAMETERS = ["Object Temperature", "Target Object Temp (Set)", "Temperature is Stable"]
+
+
+def sample_interval(error: float) -> float:
+    """Return the next sampling interval (seconds) for a distance to the setpoint (C)"""
+    fraction = min(abs(error) / WAIT_STABLE_BAND, 1.0)
+    return WAIT_STABLE_MIN_INTERVAL + fraction * (WAIT_STABLE_MAX_INTERVAL - WAIT_STABLE_MIN_INTERVAL)
+
+
+async def wait_stable(
+    address: int,
+    timeout: float,
+    tolerance: Optional[float] = None,
+    read: Callable = read_parameters,
+    clock: Callable[[], float] = time.monotonic,
+    sleep: Callable = asyncio.sleep,
+) -> dict:
+    """
+    Wait until the heater at the address is stable or the timeout (seconds) expires.
+    The heater is stable when the device reports a stable temperature and, if a tolerance
+    is given, the object temperature is within the tolerance (C) of the setpoint.
+    A failed read raises (ValueError from read_parameters) instead of counting as not stable,
+    so a heater that does not answer ends the wait at once rather than at the timeout.
+    """
+    begin = clock()
+    deadline = begin + timeout
+    samples = 0
+    while True:
+        values = await read(address, WAIT_STABLE_PARAMETERS)
+        samples += 1
+        now = clock()
+        error = values["Object Temperature"] - values["Target Object Temp (Set)"]
+        stable = values["Temperature is Stable"] == TEC_TEMPERATURE_IS_STABLE
+        if tolerance is not None:
+            stable = stable and abs(error) <= tolerance
+        if stable or now >= deadline:
+            return {
+                "stable": stable,
+                "time_to_stable_s": round(now - begin, 3) if stable else None,
+                "waited_s": round(now - begin, 3),
+                "samples": samples,
+                "temperature": values["Object Temperature"],
+                "setpoint": values["Target Object Temp (Set)"],
+                "error": error,
+            }
+        await sleep(min(sample_interval(error), deadline - now))
@@ -0,0 +1,225 @@
+
+# Version: Test
+"""
+Background watcher for TEC faults.
+
+Device Status (104) and Error Number (105) of every heater are sampled together
+over one held Meerstetter connection (other TEC requests share it). A change of
+a heater's status or error number (e.g. Run -> Error) becomes an event. Events
+are kept in a bounded log and pushed to every subscriber queue, so clients are
+told about faults instead of polling /tec/device-status/ and /tec/error-number/.
+A heater going to Init or Error, or changing its error number, drops its cached
+configuration (the device may have been reset or reconfigured itself).
+Other background consumers (e.g. the ETA estimator) add their parameters to the
+same exchange with add_listener instead of sampling the bus themselves.
+"""
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs
+from chassis_controller.app.routers.interfaces.utils import rand_request_id
+from chassis_controller.app.routers.interfaces.utils_meerstetter import (
+    MEERSTETTER_ERRORS,
+    TEC_DEVICE_STATUSES,
+    MeerstetterBusPacket,
+    MeerstetterBusPacketType,
+)
+from chassis_controller.app.routers.interfaces.MeerstetterBus import (
+    hold_meerstetter_connection,
+    meerstetter_bus_timed_exchanges,
+    release_meerstetter_connection,
+)
+from chassis_controller.app.tec.bus import heater_address
+from chassis_controller.app.tec.config_cache import TEC_CONFIG_CACHE
+
+WATCHER_INTERVAL = 1.0  # Seconds between samples
+WATCHER_RETRY_INTERVAL = 10.0  # Seconds between samples while the controller cannot be reached
+WATCHER_MAX_EVENTS = 256  # Events kept in the log
+WATCHER_QUEUE_SIZE = 64  # Events buffered per subscriber, the oldest are dropped first
+WATCHER_KEEPALIVE = 15.0  # Seconds between keep-alive comments on an idle event stream
+
+WATCHER_PARAMETERS = ["Device Status", "Error Number"]
+UNREACHABLE = "Unreachable"
+
+
+def sse_event(event: dict) -> str:
+    """Format a watcher event as a server-sent event"""
+    return f"id: {event['id']}\nevent: tec-status\ndata: {json.dumps(event)}\n\n"
+
+
+class TecWatcher:
+    """Samples the status of the heaters and publishes their transitions"""
+
+    def __init__(
+        self,
+        heaters: List[MeerstetterIDs] = list(MeerstetterIDs),
+        interval: float = WATCHER_INTERVAL,
+        exchange: Callable = meerstetter_bus_timed_exchanges,
+        hold: Callable = hold_meerstetter_connection,
+        release: Callable = release_meerstetter_connection,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable = asyncio.sleep,
+    ) -> None:
+        self.heaters = list(heaters)
+        self.interval = interval
+        self.parameters = list(WATCHER_PARAMETERS)
+        self._exchange = exchange
+        self._hold = hold
+        self._release = release
+        self._clock = clock
+        self._sleep = sleep
+        self._listeners: List[Callable] = []
+        self.states: Dict[MeerstetterIDs, dict] = {}
+        self.events = deque(maxlen=WATCHER_MAX_EVENTS)
+        self.samples = 0
+        self.last_error: Optional[str] = None
+        self._next_id = 1
+        self._subscribers: List[asyncio.Queue] = []
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def add_listener(self, parameters: List[str], listener: Callable) -> None:
+        """Sample the parameters along with the status and call listener(heater, values, t) for
+        every heater that answered, after each sample"""
+        for parameter in parameters:
+            if parameter not in self.parameters:
+                self.parameters.append(parameter)
+        self._listeners.append(listener)
+
+    def subscribe(self) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=WATCHER_QUEUE_SIZE)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    def events_since(self, event_id: int = 0) -> List[dict]:
+        return [event for event in self.events if event["id"] > event_id]
+
+    async def stream(self, since: int = 0):
+        """Server-sent events: the logged events after since, then new events as they happen"""
+        queue = self.subscribe()
+        try:
+            for event in self.events_since(since):
+                since = event["id"]
+                yield sse_event(event)
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), WATCHER_KEEPALIVE)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+                    continue
+                if event["id"] > since:  # Skip events already sent from the log
+                    since = event["id"]
+                    yield sse_event(event)
+        finally:
+            self.unsubscribe(queue)
+
+    def _publish(self, event: dict) -> None:
+        event["id"] = self._next_id
+        self._next_id += 1
+        self.events.append(event)
+        for queue in self._subscribers:
+            if queue.full():
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def _update(self, heater: MeerstetterIDs, status: str, error_number: Optional[int]) -> None:
+        """Record the heater's state, publish an event if it changed"""
+        previous = self.states.get(heater)
+        if previous is not None and previous["status"] == status and previous["error_number"] == error_number:
+            return
+        self.states[heater] = {"status": status, "error_number": error_number}
+        if status in ("Init", "Error") or (previous is not None and previous["error_number"] != error_number):
+            TEC_CONFIG_CACHE.invalidate(heater_address(heater))
+        self._publish({
+            "time": time.time(),
+            "heater": heater.value,
+            "from": previous["status"] if previous is not None else None,
+            "to": status,
+            "error_number": error_number,
+            "error": MEERSTETTER_ERRORS.get(error_number, "Unknown error") if error_number is not None else None,
+        })
+
+    async def sample(self) -> None:
+        """Read status, error number (and the listeners' parameters) of every heater in one exchange
+        and publish the changes"""
+        pkts = [
+            MeerstetterBusPacket(
+                MeerstetterBusPacketType.GET_PARAMETER,
+                address=heater_address(heater),
+                sequence=rand_request_id(),
+                parameter=parameter,
+            )
+            for heater in self.heaters
+            for parameter in self.parameters
+        ]
+        pkts, _, _ = await self._exchange(pkts)
+        now = self._clock()
+        self.samples += 1
+        count = len(self.parameters)
+        for n, heater in enumerate(self.heaters):
+            heater_pkts = pkts[n * count:(n + 1) * count]
+            status, error = heater_pkts[0], heater_pkts[1]
+            if status.error is not None or error.error is not None:
+                self._update(heater, UNREACHABLE, -1)
+                continue
+            self._update(heater, TEC_DEVICE_STATUSES.get(status.data, str(status.data)), int(error.data))
+            if self._listeners and all(pkt.error is None for pkt in heater_pkts):
+                values = {pkt.parameter.name: pkt.data for pkt in heater_pkts}
+                for listener in self._listeners:
+                    listener(heater, values, now)
+
+    async def run(self) -> None:
+        held = False
+        try:
+            while True:
+                try:
+                    if not held:
+                        await self._hold()
+                        held = True
+                    await self.sample()
+                    self.last_error = None
+                    delay = self.interval
+                except Exception as e:
+                    # Controller missing or the connection dropped, open a new one next time
+                    self.last_error = str(e) or type(e).__name__
+                    if held:
+                        self._release()
+                        held = False
+                    delay = WATCHER_RETRY_INTERVAL
+                await self._sleep(delay)
+        finally:
+            if held:
+                self._release()
+
+    def start(self) -> asyncio.Task:
+        if not self.is_running:
+            self._task = asyncio.ensure_future(self.run())
+        return self._task
+
+    def stop(self) -> None:
+        if self.is_running:
+            self._task.cancel()
+
+    def status(self) -> dict:
+        return {
+            "running": self.is_running,
+            "interval_s": self.interval,
+            "samples": self.samples,
+            "subscribers": len(self._subscribers),
+            "last_error": self.last_error,
+            "heaters": {heater.value: state for heater, state in self.states.items()},
+            "events": list(self.events),
+        }
+
+
+TEC_WATCHER = TecWatcher()
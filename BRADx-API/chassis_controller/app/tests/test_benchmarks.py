@@ -0,0 +1,66 @@
+
+# Version: Test
+import subprocess
+import sys
+
+import pytest
+
+from chassis_controller.benchmarks import codecs, runner, startup
+
+
+#####################################################
+# Benchmark Suite Tests
+#####################################################
+@pytest.mark.parametrize("name", sorted(codecs.CASES))
+def test_codec_case_runs(name):
+    codecs.CASES[name]()
+
+
+def test_measure():
+    result = runner.measure(lambda: sum(range(10)), repeat=2, min_time=0.001)
+    assert result["number"] >= 1
+    assert result["best_ns"] <= result["median_ns"]
+    assert result["ops_per_s"] == pytest.approx(1e9 / result["best_ns"])
+
+
+def test_compare():
+    baseline = {"a": {"best_ns": 100.0}, "b": {"best_ns": 100.0}}
+    results = {"a": {"best_ns": 105.0}, "b": {"best_ns": 120.0}, "c": {"best_ns": 1.0}}
+    assert runner.compare(results, baseline, threshold=0.1) == ["b"]
+
+
+IMPORTTIME = """import time: self [us] | cumulative | imported package
+import time:       300 |        300 |   certifi
+import time:      1000 |       1300 | site
+import time:        50 |         50 |       numbers
+import time:       200 |        250 |     fractions
+import time:       100 |        100 |     json
+import time:       400 |        750 |   chassis_controller.app.routers.tec_submodule
+import time:        20 |         20 |   chassis_controller.app
+import time:        30 |        800 | chassis_controller.app.main
+"""
+
+
+def test_parse_importtime():
+    profile = startup.parse_importtime(IMPORTTIME)
+    assert len(profile) == 8
+    assert profile[2] == startup.ImportTime("numbers", 3, 50, 50)
+    assert profile[-1] == startup.ImportTime(startup.APP_MODULE, 0, 30, 800)
+
+
+def test_summarize_profile():
+    summary = startup.summarize_profile(startup.parse_importtime(IMPORTTIME), top=1)
+    assert summary["total_us"] == 800
+    assert summary["modules"] == 6  # Without the interpreter's startup imports (site)
+    assert [entry["module"] for entry in summary["top_cumulative"]] == ["chassis_controller.app.routers.tec_submodule"]
+    assert [entry["module"] for entry in summary["top_self"]] == ["chassis_controller.app.routers.tec_submodule"]
+
+
+def test_startup_defers_heavy_imports():
+    code = (
+        "import sys; import chassis_controller.app.main; "
+        "print(sorted(name for name in sys.modules if name.startswith(('numpy.', 'tkinter', 'pythonnet')) "
+        "or name.endswith(('pipettor_gantry_submodule', 'prep_deck_submodule'))))"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=startup.TOP_LEVEL_DIR)
+    assert proc.stdout.strip() == "[]"
@@ -0,0 +1,135 @@
+
+# Version: Test
+import asyncio
+import threading
+import time
+
+import httpx
+import pytest
+
+from chassis_controller.app.loop_monitor import LoopLagMonitor
+from chassis_controller.app.main import app
+from chassis_controller.app.routers.interfaces import BRADxBus
+from chassis_controller.app.routers.interfaces.BRADxBus import BRADxBusRouterInterface
+from chassis_controller.app.routers.interfaces.breaker import BUS_BREAKERS
+from chassis_controller.benchmarks.load import CHASSIS_RAW
+
+
+class SlowConnection:
+    """Stands in for a connection whose port takes a while to find and open"""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self.thread = None
+        self.disconnected = False
+
+    def find_and_connect(self, cls):
+        self.thread = threading.current_thread().name
+        time.sleep(self.delay)
+        return self
+
+    def disconnect(self):
+        self.disconnected = True
+
+
+@pytest.fixture
+def slow_port(monkeypatch):
+    """Make opening the BRADx port take 0.3 s, returns the connection"""
+    conn = SlowConnection(0.3)
+    monkeypatch.setattr(BRADxBusRouterInterface, "find_and_connect", classmethod(conn.find_and_connect))
+    monkeypatch.setattr(BRADxBus, "BRADX_BUS_LOCK", asyncio.Lock())  # Bound to this test's event loop
+    yield conn
+    for breakers in BUS_BREAKERS.values():
+        breakers.reset()
+
+
+async def ticks_while(coro, interval: float = 0.01):
+    """Await the coroutine and count the loop's ticks meanwhile"""
+    task = asyncio.ensure_future(coro)
+    ticks = 0
+    while not task.done():
+        await asyncio.sleep(interval)
+        ticks += 1
+    return await task, ticks
+
+
+#####################################################
+# Bus I/O Thread Pool Tests
+#####################################################
+def test_connect_runs_off_the_event_loop(slow_port):
+    conn, ticks = asyncio.run(ticks_while(BRADxBusRouterInterface.find_and_connect_async()))
+    assert conn is slow_port
+    assert slow_port.thread.startswith("bus-io")
+    assert ticks >= 10  # The loop kept running while the port was opened
+
+
+def test_cancelled_connect_is_closed(slow_port):
+    async def cancel():
+        task = asyncio.ensure_future(BRADxBusRouterInterface.find_and_connect_async())
+        await asyncio.sleep(0.05)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        await asyncio.sleep(0.4)  # The open completes in its thread
+
+    asyncio.run(cancel())
+    assert slow_port.disconnected
+
+
+def test_requests_answered_while_a_port_opens(slow_port):
+    raw = CHASSIS_RAW[0]
+
+    async def requests():
+        transport = httpx.ASGITransport(app=app, raise_app_exceptions=False)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            opening = asyncio.ensure_future(client.get(raw.path, params=raw.params))
+            await asyncio.sleep(0.05)
+            begin = time.perf_counter()
+            resp = await client.get("/serial-number/")
+            elapsed = time.perf_counter() - begin
+            await opening
+            return resp, elapsed
+
+    resp, elapsed = asyncio.run(requests())
+    assert resp.status_code == 200
+    assert slow_port.thread.startswith("bus-io")
+    assert elapsed < 0.2  # Not held up by the 0.3 s open
+
+
+#####################################################
+# Loop Lag Monitor Tests
+#####################################################
+def block_the_loop(seconds):
+    time.sleep(seconds)
+
+
+def test_loop_lag_monitor_samples_the_stack():
+    monitor = LoopLagMonitor(threshold=0.05)
+
+    async def stall():
+        monitor.start()
+        await asyncio.sleep(0.05)
+        block_the_loop(0.3)
+        await asyncio.sleep(0.05)
+        monitor.stop()
+
+    asyncio.run(stall())
+    snapshot = monitor.snapshot()
+    assert snapshot["stalls"] >= 1
+    assert snapshot["max_lag_ms"] >= 250
+    event = max(snapshot["events"], key=lambda event: event["lag_ms"])
+    assert event["stack"] is not None
+    assert "block_the_loop" in event["stack"][-1]
+
+
+def test_loop_lag_monitor_quiet_loop():
+    monitor = LoopLagMonitor(threshold=0.2)
+
+    async def idle():
+        monitor.start()
+        await asyncio.sleep(0.2)
+        monitor.stop()
+
+    asyncio.run(idle())
+    assert monitor.stalls == 0
+    assert not monitor.is_running
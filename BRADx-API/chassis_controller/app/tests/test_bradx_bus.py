@@ -0,0 +1,136 @@
+
+# Version: Test
+import asyncio
+
+import pytest
+
+from chassis_controller.app.routers.interfaces import BRADxBus, utils
+from chassis_controller.app.routers.interfaces.BRADxBus import *
+from chassis_controller.app.routers.interfaces.utils import *
+
+
+def response_frame(subsystem_id, module_id, data):
+    body = bytes([subsystem_id, module_id, BRADxBusPacketType.RESPONSE.value, len(data), len(data)]) + data.encode()
+    return b"$" + body + crc16_ccitt(body).to_bytes(2, "little") + b"\r"
+
+
+@pytest.fixture
+def crc_check(monkeypatch):
+    """Response CRC checking enabled, as it is with BRADX_RESPONSE_CRC_CHECK=1"""
+    monkeypatch.setattr(utils, "BRADX_RESPONSE_CRC_CHECK", True)
+
+
+def corrupted(frame):
+    return frame[:6] + bytes([frame[6] ^ 0x01]) + frame[7:]
+
+
+class FakeSerial:
+    """Chassis controller port returning the given responses in turn"""
+
+    def __init__(self, responses):
+        self.is_open = True
+        self.timeout = None
+        self.responses = list(responses)
+        self.writes = 0
+        self.flushes = 0
+
+    def write(self, data):
+        self.writes += 1
+
+    async def read_async(self, size):
+        return self.responses.pop(0)
+
+    def reset_input_buffer(self):
+        self.flushes += 1
+
+    def close(self):
+        pass  # Opened again by the next find_and_connect
+
+
+@pytest.fixture
+def chassis(monkeypatch):
+    """Install a fake chassis controller, returns a function setting its responses"""
+    def connect(responses):
+        fake = FakeSerial(responses)
+        conn = BRADxBusRouterInterface("fake")
+        conn._connection = fake
+        monkeypatch.setattr(BRADxBusRouterInterface, "find_and_connect", classmethod(lambda cls: conn))
+        return fake
+
+    yield connect
+    BRADxBus.BRADX_BREAKERS.reset()
+
+
+def request(command):
+    message = BRADXRequest(0x01, 0x1234, command, [])
+    return BRADxBusPacket(READER_SUBSYSTEM_ID, READER_X_AXIS, message.raw, 25, BRADxBusPacketType.REQUEST)
+
+
+#####################################################
+# CRC Tests
+#####################################################
+def test_bradx_bus_packet_crc():
+    frame = response_frame(0x03, 0x01, "<01,1234,1,2,3,0\r")
+    pkt = BRADxBusPacket.parse(frame)
+    assert pkt.data == "<01,1234,1,2,3,0\r"
+    assert pkt.crc == crc16_ccitt(frame[1:-3])
+
+    with pytest.raises(ValueError):
+        BRADxBusPacket.parse(corrupted(frame), check_crc=True)
+    assert BRADxBusPacket.parse(corrupted(frame), check_crc=False).module_id == 0x01
+
+
+def test_bradx_response_crc_is_not_checked_by_default():
+    frame = response_frame(0x03, 0x01, "<01,1234,1,2,3,0\r")
+    assert BRADxBusPacket.parse(corrupted(frame)).module_id == 0x01
+
+
+def test_bradx_response_crc_check_setting(crc_check):
+    frame = response_frame(0x03, 0x01, "<01,1234,1,2,3,0\r")
+    with pytest.raises(ValueError):
+        BRADxBusPacket.parse(corrupted(frame))
+
+
+#####################################################
+# Retry Tests
+#####################################################
+def test_bradx_exchange_retries_corrupted_reads(chassis, crc_check):
+    frame = response_frame(READER_SUBSYSTEM_ID, READER_X_AXIS, "<01,1234,100,0\r")
+    fake = chassis([corrupted(frame), frame])
+    pkt, _ = asyncio.run(bradx_bus_timed_exchange(request("?pos")))
+    assert pkt.retries == 1
+    assert fake.writes == 2 and fake.flushes == 1
+
+
+def test_bradx_exchange_retries_are_bounded(chassis, crc_check):
+    frame = corrupted(response_frame(READER_SUBSYSTEM_ID, READER_X_AXIS, "<01,1234,100,0\r"))
+    fake = chassis([frame] * (BRADX_BUS_RETRIES + 2))
+    with pytest.raises(ValueError):
+        asyncio.run(bradx_bus_timed_exchange(request("?pos")))
+    assert fake.writes == BRADX_BUS_RETRIES + 1
+
+
+def test_bradx_exchange_does_not_retry_unsafe_writes(chassis, crc_check):
+    frame = response_frame(READER_SUBSYSTEM_ID, READER_X_AXIS, "<01,1234,0\r")
+    fake = chassis([corrupted(frame), frame])
+    with pytest.raises(ValueError):
+        asyncio.run(bradx_bus_timed_exchange(request("mrel")))
+    assert fake.writes == 1
+
+    fake = chassis([corrupted(frame), frame])
+    pkt, _ = asyncio.run(bradx_bus_timed_exchange(request("mrel"), idempotent=True))
+    assert pkt.retries == 1
+
+
+def test_bradx_exchange_reports_request_retries(chassis, crc_check):
+    frame = response_frame(READER_SUBSYSTEM_ID, READER_X_AXIS, "<01,1234,100,0\r")
+    chassis([corrupted(frame), frame, frame])
+
+    async def handle():
+        retries = []
+        BRADX_REQUEST_RETRIES.set(retries)
+        await bradx_bus_timed_exchange(request("?pos"))
+        await bradx_bus_timed_exchange(request("?pos"))
+        return retries
+
+    assert asyncio.run(handle()) == [1, 0]
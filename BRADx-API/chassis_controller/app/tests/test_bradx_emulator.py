@@ -0,0 +1,70 @@
+
+# Version: Test
+import asyncio
+
+import pytest
+
+from chassis_controller.app.config.BRADx_config import READER_SUBSYSTEM_ID, READER_X_AXIS, READER_LED
+from chassis_controller.app.routers.interfaces import BRADxBus
+from chassis_controller.app.routers.interfaces.BRADxBus import BRADxBusRouterInterface, bradx_bus_timed_exchange
+from chassis_controller.app.routers.interfaces.utils import BRADXRequest, BRADxBusPacket, BRADxBusPacketType
+from chassis_controller.emulators.bradx import BRADX_FRAME_SIZE, BRADxEmulator
+
+
+@pytest.fixture
+def emulator():
+    with BRADxEmulator() as emu:
+        yield emu
+
+
+def exchange(port, module_id, command, parameters=()):
+    message = BRADXRequest(0x01, 0x1234, command, list(parameters))
+    req = BRADxBusPacket(READER_SUBSYSTEM_ID, module_id, message.raw, 25, BRADxBusPacketType.REQUEST)
+    conn = BRADxBusRouterInterface(port, timeout=1.0)
+    conn.connect()
+    try:
+        resp = asyncio.run(conn.exchange_async(req.raw_packet))
+    finally:
+        conn.disconnect()
+    assert len(resp) == BRADX_FRAME_SIZE
+    return BRADxBusPacket.parse(resp)
+
+
+#####################################################
+# BRADx Emulator Tests
+#####################################################
+def test_bradx_emulator_version(emulator):
+    pkt = exchange(emulator.port, READER_X_AXIS, "?ver")
+    assert pkt.data == "<1,1234,100\r"
+    assert "v" + pkt.data[8] + "." + pkt.data[9] + "." + pkt.data[10] == "v1.0.0"
+
+
+def test_bradx_emulator_motion(emulator):
+    exchange(emulator.port, READER_X_AXIS, "mabs", ["1000", "50"])
+    exchange(emulator.port, READER_X_AXIS, "mrel", ["-250", "50"])
+    assert exchange(emulator.port, READER_X_AXIS, "?pos").data == "<1,1234,750\r"
+    exchange(emulator.port, READER_X_AXIS, "home")
+    assert emulator.module(READER_SUBSYSTEM_ID, READER_X_AXIS).homed
+
+
+def test_bradx_emulator_led(emulator):
+    exchange(emulator.port, READER_LED, "set", ["2", "500"])
+    pkt = exchange(emulator.port, READER_LED, "?led", ["2"])
+    assert int(pkt.data.strip("\r").split(",")[-1]) == 500
+
+
+def test_bradx_emulator_concurrent_exchanges(emulator, monkeypatch):
+    # Concurrent exchanges take turns on the port instead of reading each other's responses
+    monkeypatch.setattr(BRADxBus, "BRADX_PORT", emulator.port)
+    monkeypatch.setattr(BRADxBus, "BRADX_BUS_LOCK", asyncio.Lock())  # Bound to this test's event loop
+    emulator.default_latency = 0.005
+
+    async def positions():
+        reqs = [
+            BRADxBusPacket(READER_SUBSYSTEM_ID, READER_X_AXIS, BRADXRequest(0x01, n, "?pos", []).raw, 25, BRADxBusPacketType.REQUEST)
+            for n in range(8)
+        ]
+        return await asyncio.gather(*(bradx_bus_timed_exchange(req) for req in reqs))
+
+    results = asyncio.run(positions())
+    assert [pkt.data for pkt, _ in results] == [f"<1,{n:04x},0\r" for n in range(8)]
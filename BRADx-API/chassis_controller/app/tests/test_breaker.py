@@ -0,0 +1,92 @@
+
+# Version: Test
+import asyncio
+
+import pytest
+
+from chassis_controller.app.routers.interfaces.breaker import *
+from chassis_controller.app.routers.interfaces.MeerstetterBus import MeerstetterBusRouterInterface
+from chassis_controller.app.routers.interfaces.utils_meerstetter import MeerstetterBusPacket, MeerstetterBusPacketType
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class SilentSerial:
+    """Serial port of a Meerstetter that is powered off"""
+
+    def __init__(self):
+        self.is_open = True
+        self.timeout = None
+        self.writes = 0
+
+    def write(self, data):
+        self.writes += 1
+
+    async def read_until_async(self, expected, size):
+        return b""
+
+
+#####################################################
+# Circuit Breaker Tests
+#####################################################
+def test_breaker_opens_after_consecutive_timeouts():
+    clock = FakeClock()
+    breaker = CircuitBreaker("bradx/3/1", clock=clock)
+    for _ in range(BREAKER_THRESHOLD - 1):
+        breaker.check()
+        breaker.record(timed_out=True)
+    breaker.record(timed_out=False)  # Not consecutive
+    for _ in range(BREAKER_THRESHOLD):
+        breaker.check()
+        breaker.record(timed_out=True)
+    assert breaker.is_open
+    with pytest.raises(ModuleUnavailable) as e:
+        breaker.check()
+    assert e.value.retry_after == BREAKER_RESET_S
+    assert breaker.rejected == 1
+
+
+def test_breaker_half_open_probe():
+    clock = FakeClock()
+    breaker = CircuitBreaker("meerstetter/1", threshold=1, clock=clock)
+    breaker.record(timed_out=True)
+    assert not breaker.allow()
+
+    clock.now += BREAKER_RESET_S
+    assert breaker.allow()  # The probe
+    assert breaker.state == BREAKER_HALF_OPEN
+    assert not breaker.allow()  # Only one probe at a time
+    breaker.record(timed_out=True)
+    assert breaker.is_open and breaker.retry_after() == BREAKER_RESET_S
+
+    clock.now += BREAKER_RESET_S
+    assert breaker.allow()
+    breaker.record(timed_out=False)
+    assert breaker.state == BREAKER_CLOSED
+    assert breaker.allow()
+
+
+def test_breaker_fails_meerstetter_exchanges_fast():
+    fake = SilentSerial()
+    conn = MeerstetterBusRouterInterface("fake")
+    conn._connection = fake
+    pkts = [
+        MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=0x7E, sequence=n, parameter="Object Temperature")
+        for n in range(BREAKER_THRESHOLD + 2)
+    ]
+    try:
+        asyncio.run(conn.exchange_packets_async(pkts))
+        # Only the exchanges up to the threshold waited for their timeouts
+        assert fake.writes == BREAKER_THRESHOLD
+        assert all(pkt.error is not None for pkt in pkts)
+        with pytest.raises(ModuleUnavailable):
+            asyncio.run(conn.exchange_packets_async(pkts[:1]))
+        assert fake.writes == BREAKER_THRESHOLD
+    finally:
+        MEERSTETTER_BREAKERS.reset()
@@ -0,0 +1,125 @@
+
+# Version: Test
+import asyncio
+import time
+
+import pytest
+
+from chassis_controller.app.config.BRADx_config import READER_SUBSYSTEM_ID, READER_X_AXIS
+from chassis_controller.app.routers.interfaces.BRADxBus import BRADxBusRouterInterface
+from chassis_controller.app.routers.interfaces.MeerstetterBus import MeerstetterBusRouterInterface
+from chassis_controller.app.routers.interfaces.breaker import MEERSTETTER_BREAKERS
+from chassis_controller.app.routers.interfaces.recorder import (
+    BUS_RECORDER,
+    RECORD_READ,
+    RECORD_WRITE,
+    BusExchange,
+    RecordingConnection,
+    log_exchanges,
+    read_log,
+)
+from chassis_controller.app.routers.interfaces.utils import BRADXRequest, BRADxBusPacket, BRADxBusPacketType
+from chassis_controller.app.routers.interfaces.utils_meerstetter import MeerstetterBusPacket, MeerstetterBusPacketType
+from chassis_controller.emulators.bradx import BRADxEmulator
+from chassis_controller.emulators.mecom import MeComEmulator
+from chassis_controller.emulators.replay import ReplayConnection, replay
+
+
+@pytest.fixture
+def log_path(tmp_path):
+    path = str(tmp_path / "session.log")
+    BUS_RECORDER.start(path)
+    yield path
+    BUS_RECORDER.stop()
+
+
+def record_session():
+    """Exchange with the BRADx and MeCom emulators through the bus interfaces"""
+    MEERSTETTER_BREAKERS.reset()
+    with BRADxEmulator() as bradx, MeComEmulator() as mecom:
+        conn = BRADxBusRouterInterface(bradx.port, timeout=1.0)
+        assert isinstance(conn._connection, RecordingConnection)
+        conn.connect()
+        for request_id in range(3):
+            message = BRADXRequest(0x01, request_id, "?pos", [])
+            req = BRADxBusPacket(READER_SUBSYSTEM_ID, READER_X_AXIS, message.raw, 25, BRADxBusPacketType.REQUEST)
+            asyncio.run(conn.exchange_async(req.raw_packet))
+        conn.disconnect()
+
+        conn = MeerstetterBusRouterInterface(mecom.port, timeout=1.0)
+        conn.connect()
+        pkts = [
+            MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=1, sequence=n, parameter="Object Temperature")
+            for n in range(1, 5)
+        ]
+        asyncio.run(conn.exchange_pipelined_async(pkts))
+        conn.disconnect()
+    MEERSTETTER_BREAKERS.reset()
+    BUS_RECORDER.stop()
+
+
+#####################################################
+# Bus Recorder Tests
+#####################################################
+def test_recorder_log(log_path):
+    record_session()
+    records = list(read_log(log_path))
+    assert len(records) == 14
+    assert [r.bus for r in records].count("bradx") == 6
+    assert [r.time_ns for r in records] == sorted(r.time_ns for r in records)
+
+    exchanges = log_exchanges(records)
+    assert len(exchanges) == 7
+    for exchange in exchanges:
+        assert exchange.received_ns > exchange.sent_ns
+        assert exchange.response.endswith(b"\r")
+    # Pipelined responses are matched to their requests by order
+    mecom = [e for e in exchanges if e.bus == "meerstetter"]
+    assert [e.request[3:7] for e in mecom] == [e.response[3:7] for e in mecom]
+
+
+def test_recorder_appends(log_path):
+    record_session()
+    BUS_RECORDER.start(log_path)
+    record_session()
+    assert len(log_exchanges(read_log(log_path))) == 14
+
+
+def test_recorder_truncated_log(log_path):
+    record_session()
+    with open(log_path, "ab") as log:
+        log.write(b"\x01\x02\x03")  # Record cut short
+    assert len(list(read_log(log_path))) == 14
+
+
+def test_recorder_not_active():
+    conn = MeerstetterBusRouterInterface("replay")
+    assert not isinstance(conn._connection, RecordingConnection)
+
+
+def test_replay_connection_timing():
+    exchanges = [
+        BusExchange("meerstetter", 1, 0, b"a\r", 20_000_000, b"A\r"),
+        BusExchange("meerstetter", 2, 0, b"b\r", 0, b""),
+    ]
+    transport = ReplayConnection(exchanges, scale=1.0)
+
+    async def exchange(request):
+        transport.write(request)
+        return await transport.read_until_async(b"\r", 256)
+
+    begin = time.perf_counter()
+    assert asyncio.run(exchange(b"a\r")) == b"A\r"
+    assert time.perf_counter() - begin >= 0.02
+    assert asyncio.run(exchange(b"x\r")) == b""
+    assert transport.mismatches == 1
+
+
+def test_replay_session(log_path):
+    record_session()
+    summary = asyncio.run(replay(log_path, scale=0))
+    assert summary["bradx"]["exchanges"] == 3
+    assert summary["meerstetter"]["exchanges"] == 4
+    for bus in summary.values():
+        assert bus["errors"] == 0
+        assert bus["mismatches"] == 0
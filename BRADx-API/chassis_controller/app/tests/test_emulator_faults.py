@@ -0,0 +1,84 @@
+
+# Version: Test
+import asyncio
+import json
+
+import pytest
+
+from chassis_controller.app.routers.interfaces.MeerstetterBus import MeerstetterBusRouterInterface
+from chassis_controller.app.routers.interfaces.breaker import MEERSTETTER_BREAKERS
+from chassis_controller.app.routers.interfaces.utils_meerstetter import MeerstetterBusPacket, MeerstetterBusPacketType
+from chassis_controller.emulators.faults import FaultProfile, Jitter, Stall, load_scenario
+from chassis_controller.emulators.mecom import MeComEmulator
+
+RESPONSE = b"!01123400000000ABCD\r"
+
+
+def get(address):
+    return MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=address, sequence=0x1234, parameter="Object Temperature")
+
+
+#####################################################
+# Fault Injection Tests
+#####################################################
+@pytest.mark.parametrize(
+    "distribution, params, low, high",
+    [
+        ("fixed", {"value": 0.01}, 0.01, 0.01),
+        ("uniform", {"low": 0.01, "high": 0.02}, 0.01, 0.02),
+        ("pareto", {"scale": 0.001, "alpha": 1.5}, 0.001, float("inf")),
+    ],
+)
+def test_jitter_range(distribution, params, low, high):
+    jitter = Jitter(distribution, **params)
+    rng = FaultProfile(seed=1).rng
+    assert all(low <= jitter.sample(rng) <= high for _ in range(100))
+
+
+def test_jitter_unknown_distribution():
+    with pytest.raises(ValueError):
+        Jitter("normal")
+
+
+def test_faults_rates():
+    faults = FaultProfile(drop_rate=0.1, corrupt_rate=0.1, truncate_rate=0.1, seed=7)
+    results = [faults.apply("1", RESPONSE)[0] for _ in range(2000)]
+    assert 100 < faults.counts["dropped"] < 300
+    assert 100 < faults.counts["corrupted"] < 300
+    assert results.count(None) == faults.counts["dropped"]
+    assert all(resp.endswith(b"\r") for resp in results if resp is not None)
+    assert sum(len(resp) == len(RESPONSE) - 1 for resp in results if resp is not None) == faults.counts["truncated"]
+
+
+def test_faults_stalls():
+    faults = FaultProfile(stalls={"2": Stall(None), "3": Stall(0.5, every=2)})
+    assert faults.apply("1", RESPONSE) == (RESPONSE, 0.0)
+    assert faults.apply("2", RESPONSE) == (None, 0.0)
+    assert [faults.apply("3", RESPONSE)[1] for _ in range(4)] == [0.0, 0.5, 0.0, 0.5]
+    assert faults.counts["stalled"] == 3
+
+
+def test_load_scenario(tmp_path):
+    path = tmp_path / "scenarios.json"
+    path.write_text(json.dumps({"stall": {"jitter": {"distribution": "fixed", "value": 0.1}, "stalls": {"2": {"delay": None}}}}))
+    faults = load_scenario(str(path), "stall")
+    assert faults.jitter.sample(faults.rng) == 0.1
+    assert faults.stalls["2"].delay is None
+    with pytest.raises(ValueError):
+        load_scenario(str(path), "missing")
+
+
+def test_faults_on_emulator():
+    MEERSTETTER_BREAKERS.reset()
+    with MeComEmulator() as emulator:
+        emulator.faults = FaultProfile(stalls={"2": Stall(None)})
+        conn = MeerstetterBusRouterInterface(emulator.port, timeout=0.05)
+        conn.connect()
+        try:
+            answered, stalled = get(1), get(2)
+            asyncio.run(conn.exchange_packets_async([answered, stalled]))
+        finally:
+            conn.disconnect()
+    MEERSTETTER_BREAKERS.reset()
+    assert answered.error is None
+    assert stalled.error is not None
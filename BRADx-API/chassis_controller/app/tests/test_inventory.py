@@ -0,0 +1,86 @@
+
+# Version: Test
+import asyncio
+
+import pytest
+
+from chassis_controller.app.inventory.registry import DeviceInventory
+
+
+class FakeBuses:
+    """Devices answering their version after a bus delay, recording the order of the reads"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.reads = []
+
+    def clock(self):
+        return self.now
+
+    def device(self, key, version="v1.0.0", delay=0.01):
+        async def fetch():
+            self.reads.append(key)
+            await asyncio.sleep(delay)
+            if version is None:
+                raise ValueError(f"No response from {key}")
+            return (version, f"?ver {key}", 100)
+        return fetch
+
+
+def inventory(buses, ttl=60.0):
+    inv = DeviceInventory(ttl=ttl, clock=buses.clock)
+    inv.register("chassis", buses.device("chassis"), "bradx")
+    inv.register("reader/axis/1", buses.device("reader/axis/1", "v1.2.3"), "bradx")
+    inv.register("tec/Heater A", buses.device("tec/Heater A", {"Firmware Version": 501}), "meerstetter")
+    return inv
+
+
+#####################################################
+# Device Inventory Tests
+#####################################################
+def test_inventory_lookup_is_cached_until_ttl():
+    buses = FakeBuses()
+    inv = inventory(buses)
+    assert asyncio.run(inv.lookup("reader/axis/1")) == ("v1.2.3", "?ver reader/axis/1", 100)
+    assert asyncio.run(inv.lookup("reader/axis/1")) == ("v1.2.3", "?ver reader/axis/1", 0)
+    assert buses.reads == ["reader/axis/1"]
+
+    buses.now = 61.0
+    asyncio.run(inv.lookup("reader/axis/1"))
+    asyncio.run(inv.lookup("reader/axis/1", refresh=True))
+    assert len(buses.reads) == 3
+
+
+def test_inventory_refresh_reads_buses_concurrently():
+    buses = FakeBuses()
+    inv = inventory(buses)
+    asyncio.run(inv.refresh())
+    # Devices on one bus are read in turn, the Meerstetter bus does not wait for the BRADx bus
+    assert buses.reads == ["chassis", "tec/Heater A", "reader/axis/1"]
+    snapshot = inv.snapshot()
+    assert snapshot["tec/Heater A"]["value"] == {"Firmware Version": 501}
+    assert snapshot["chassis"]["bus"] == "bradx"
+
+    asyncio.run(inv.refresh(stale_only=True))
+    assert len(buses.reads) == 3
+
+
+def test_inventory_invalidate():
+    buses = FakeBuses()
+    inv = inventory(buses)
+    asyncio.run(inv.refresh())
+    inv.invalidate("tec/")
+    assert inv.get("tec/Heater A") is None
+    assert inv.get("chassis") is not None
+    inv.invalidate()
+    assert inv.get("chassis") is None
+
+
+def test_inventory_records_errors():
+    buses = FakeBuses()
+    inv = inventory(buses)
+    inv.register("reader/axis/2", buses.device("reader/axis/2", None), "bradx")
+    asyncio.run(inv.refresh())
+    assert inv.snapshot()["reader/axis/2"] == {"bus": "bradx", "value": None, "error": "No response from reader/axis/2"}
+    with pytest.raises(ValueError):
+        asyncio.run(inv.lookup("reader/axis/2"))
@@ -0,0 +1,78 @@
+
+# Version: Test
+import pytest
+
+from chassis_controller.app.routers.interfaces.latency import *
+
+
+#####################################################
+# Latency Histogram Tests
+#####################################################
+def test_latency_histogram_percentiles():
+    hist = LatencyHistogram()
+    for n in range(100):
+        hist.add(0.010 if n < 90 else 0.100)
+    assert 0.010 <= hist.percentile(50) < 0.013
+    assert 0.100 <= hist.percentile(99) < 0.126
+    assert hist.max == 0.100
+    assert sum(hist.as_dict()["buckets"].values()) == 100
+
+
+def test_latency_histogram_window():
+    hist = LatencyHistogram()
+    for _ in range(LATENCY_WINDOW):
+        hist.add(1.0)
+    assert hist.count < LATENCY_WINDOW
+    for _ in range(3 * LATENCY_WINDOW):
+        hist.add(0.001)
+    # Old samples have decayed away
+    assert hist.percentile(90) < 0.0013
+
+
+#####################################################
+# Adaptive Timeout Tests
+#####################################################
+def test_timeout_default_until_warmed_up():
+    tracker = LatencyTracker(30.0, (0.1, 30.0))
+    key = (0, 1, "?ver")
+    assert tracker.timeout(key) == 30.0
+    for _ in range(LATENCY_MIN_SAMPLES):
+        tracker.record(key, 0.005)
+    # Derived from the percentile, then clamped to the lower bound
+    assert tracker.timeout(key) == 0.1
+    for _ in range(LATENCY_MIN_SAMPLES):
+        tracker.record(key, 2.0)
+    assert tracker.timeout(key) == pytest.approx(2.0 * 10 ** 0.1 * LATENCY_TIMEOUT_FACTOR + LATENCY_TIMEOUT_MARGIN_S, rel=0.01)
+
+
+def test_motion_timeouts_keep_their_floor():
+    tracker = LatencyTracker(30.0, (0.1, 30.0), {"mabs": 30.0})
+    move, query = (3, 1, "mabs"), (3, 1, "?pos")
+    for _ in range(LATENCY_MIN_SAMPLES):
+        # Short moves answer quickly, a long one must still get the whole floor
+        tracker.record(move, 0.05)
+        tracker.record(query, 0.05)
+    assert tracker.timeout(move) == 30.0
+    assert tracker.timeout(query) < 1.0
+    assert BRADX_LATENCY.timeout((3, 1, "mrel")) == BRADX_LATENCY.timeout((3, 1, "home")) == 30.0
+
+
+def test_timeout_backs_off_after_timeouts():
+    tracker = LatencyTracker(0.08, (0.02, 0.5))
+    key = (3, 1, "GET_PARAMETER")
+    for _ in range(LATENCY_MIN_SAMPLES):
+        tracker.record(key, 0.004)
+    base = tracker.timeout(key)
+    tracker.record(key, base, timed_out=True)
+    assert tracker.timeout(key) == pytest.approx(2 * base)
+    for _ in range(10):
+        tracker.record(key, base, timed_out=True)
+    assert tracker.timeout(key) == 0.5
+    tracker.record(key, 0.004)
+    assert tracker.timeout(key) == base
+    assert tracker.snapshot()["exchanges"]["3/1/GET_PARAMETER"]["timeouts"] == 11
+
+
+def test_bradx_latency_key():
+    assert bradx_latency_key(0, 2, ">2,1f,?ver,a1b2\r") == (0, 2, "?ver")
+    assert bradx_latency_key(3, 1, ">1,00,move,100,200,a1b2\r") == (3, 1, "move")
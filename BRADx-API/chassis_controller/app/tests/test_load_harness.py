@@ -0,0 +1,57 @@
+
+# Version: Test
+import asyncio
+
+import httpx
+import pytest
+
+from chassis_controller.app.main import app
+from chassis_controller.app.routers.interfaces import BRADxBus, MeerstetterBus
+from chassis_controller.app.routers.interfaces.breaker import BUS_BREAKERS
+from chassis_controller.benchmarks.load import MIXES, Sample, percentile, run_load, summarize
+from chassis_controller.emulators.bradx import BRADxEmulator
+from chassis_controller.emulators.mecom import MeComEmulator
+
+
+@pytest.fixture
+def emulated(monkeypatch):
+    for breakers in BUS_BREAKERS.values():
+        breakers.reset()
+    with BRADxEmulator() as bradx, MeComEmulator() as mecom:
+        monkeypatch.setattr(BRADxBus, "BRADX_PORT", bradx.port)
+        monkeypatch.setattr(MeerstetterBus, "MEERSTETTER_PORT", mecom.port)
+        monkeypatch.setattr(BRADxBus, "BRADX_BUS_LOCK", asyncio.Lock())  # Bound to this test's event loop
+        monkeypatch.setattr(MeerstetterBus, "MEERSTETTER_BUS_LOCK", asyncio.Lock())
+        yield
+    for breakers in BUS_BREAKERS.values():
+        breakers.reset()
+
+
+#####################################################
+# Load Harness Tests
+#####################################################
+def test_percentile():
+    latencies = [n / 1000 for n in range(1, 1001)]
+    assert percentile(latencies, 50) == 0.5
+    assert percentile(latencies, 99.9) == 0.999
+    assert percentile([0.1], 99) == 0.1
+    assert percentile([], 50) is None
+
+
+def test_summarize():
+    samples = [Sample("a", 0.01, True)] * 9 + [Sample("a", 0.1, False)]
+    summary = summarize(samples, 2.0)
+    assert summary["requests"] == 10
+    assert summary["error_rate"] == 0.1
+    assert summary["throughput_rps"] == 5.0
+    assert summary["p50_ms"] == pytest.approx(10.0)
+    assert summary["max_ms"] == pytest.approx(100.0)
+
+
+def test_load_mixed(emulated):
+    steps = asyncio.run(run_load("http://test", MIXES["mixed"], [1, 3], 0.5, transport=httpx.ASGITransport(app=app)))
+    assert [step["concurrency"] for step in steps] == [1, 3]
+    for step in steps:
+        assert step["requests"] > 0
+        assert step["errors"] == 0
+    assert set(steps[1]["endpoints"]) <= {endpoint.name for endpoint in MIXES["mixed"]}
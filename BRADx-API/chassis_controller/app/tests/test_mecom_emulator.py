@@ -0,0 +1,148 @@
+
+# Version: Test
+import asyncio
+
+import pytest
+
+from chassis_controller.app.routers.interfaces import MeerstetterBus
+from chassis_controller.app.routers.interfaces.MeerstetterBus import MeerstetterBusRouterInterface
+from chassis_controller.app.routers.interfaces.breaker import MEERSTETTER_BREAKERS
+from chassis_controller.app.routers.interfaces.utils_meerstetter import MeerstetterBusPacket, MeerstetterBusPacketType
+from chassis_controller.emulators.mecom import (
+    ERROR_OBJECT_TOO_HIGH,
+    STABILITY_STABLE,
+    STATUS_ERROR,
+    STATUS_RUN,
+    MeComEmulator,
+)
+
+
+class Clock:
+    """Virtual clock, the plants only move when the test advances it"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def emulator(clock):
+    MEERSTETTER_BREAKERS.reset()
+    with MeComEmulator(clock=clock) as emu:
+        yield emu
+    MEERSTETTER_BREAKERS.reset()
+
+
+def exchange(port, *pkts):
+    conn = MeerstetterBusRouterInterface(port, timeout=1.0)
+    conn.connect()
+    try:
+        asyncio.run(conn.exchange_packets_async(list(pkts)))
+    finally:
+        conn.disconnect()
+    return pkts
+
+
+def get(parameter, address=1, sequence=0x1234):
+    return MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=address, sequence=sequence, parameter=parameter)
+
+
+def write(parameter, value, address=1, sequence=0x1235):
+    return MeerstetterBusPacket(MeerstetterBusPacketType.SET_PARAMETER, address=address, sequence=sequence, parameter=parameter, value=value)
+
+
+#####################################################
+# MeCom Emulator Tests
+#####################################################
+def test_mecom_emulator_get(emulator):
+    (pkt,) = exchange(emulator.port, get("Object Temperature"))
+    assert pkt.error is None
+    assert pkt.data == pytest.approx(25.0)
+    assert emulator.crc_errors == 0
+
+
+def test_mecom_emulator_set(emulator):
+    pkts = exchange(emulator.port, write("Target Object Temp (Set)", 60.0), write("Status", 1, sequence=0x1236), get("Device Status"))
+    assert [pkt.error for pkt in pkts] == [None, None, None]
+    assert emulator.heaters[1].params["Target Object Temp (Set)"] == pytest.approx(60.0)
+    assert pkts[2].data == STATUS_RUN
+
+
+def test_mecom_emulator_device_info_and_reset(emulator):
+    info, reset = exchange(
+        emulator.port,
+        MeerstetterBusPacket(MeerstetterBusPacketType.DEVICE_INFO, address=2),
+        MeerstetterBusPacket(MeerstetterBusPacketType.SYS_RESET, address=2, sequence=7),
+    )
+    assert info.error is None
+    assert reset.error is None
+
+
+def test_mecom_emulator_unknown_address(emulator):
+    # Nobody answers at 0x51, the exchange times out
+    conn = MeerstetterBusRouterInterface(emulator.port, timeout=0.05)
+    conn.connect()
+    try:
+        resp = asyncio.run(conn.exchange_frame_async(get("Object Temperature", address=0x51).raw_packet))
+    finally:
+        conn.disconnect()
+    assert resp == b""
+
+
+def test_mecom_emulator_heats_to_setpoint(emulator, clock):
+    exchange(emulator.port, write("Target Object Temp (Set)", 60.0), write("Status", 1, sequence=0x1236))
+    clock.now += 5.0
+    (pkt,) = exchange(emulator.port, get("Object Temperature"))
+    assert 25.0 < pkt.data < 60.0
+    clock.now += 300.0
+    emulator.advance()  # Outside of an exchange, simulating that long takes longer than the bus timeout
+    temperature, stable = exchange(emulator.port, get("Object Temperature"), get("Temperature is Stable", sequence=0x1237))
+    assert temperature.data == pytest.approx(60.0, abs=0.5)
+    assert stable.data == STABILITY_STABLE
+
+
+def test_mecom_emulator_error_threshold(emulator, clock):
+    exchange(
+        emulator.port,
+        write("Object Upper Error Threshold", 40.0),
+        write("Target Object Temp (Set)", 60.0, sequence=0x1236),
+        write("Status", 1, sequence=0x1237),
+    )
+    clock.now += 300.0
+    emulator.advance()  # Outside of an exchange, simulating that long takes longer than the bus timeout
+    status, error = exchange(emulator.port, get("Device Status"), get("Error Number", sequence=0x1238))
+    assert status.data == STATUS_ERROR
+    assert error.data == ERROR_OBJECT_TOO_HIGH
+    assert emulator.heaters[1].current == 0.0
+
+    # Reset clears the error, the output stage runs again
+    exchange(emulator.port, write("Object Upper Error Threshold", 120.0), MeerstetterBusPacket(MeerstetterBusPacketType.SYS_RESET, address=1))
+    (status,) = exchange(emulator.port, get("Device Status"))
+    assert status.data == STATUS_RUN
+
+
+#####################################################
+# Connection Tests
+#####################################################
+def test_missing_meerstetter_is_an_io_error(monkeypatch):
+    monkeypatch.setattr(MeerstetterBus, "MEERSTETTER_PORT", None)
+    monkeypatch.setattr(MeerstetterBus, "current_os", "Linux")
+    with pytest.raises(IOError, match="MEERSTETTER_PORT"):
+        MeerstetterBusRouterInterface.find_and_connect()
+
+    async def exchange_without_device():
+        async with MeerstetterBus.meerstetter_connection():
+            pass
+
+    with pytest.raises(IOError, match="No Meerstetter"):
+        asyncio.run(exchange_without_device())
+    with pytest.raises(IOError, match="No Meerstetter"):
+        asyncio.run(MeerstetterBus.hold_meerstetter_connection())
+
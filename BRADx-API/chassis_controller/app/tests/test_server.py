@@ -0,0 +1,41 @@
+
+# Version: Test
+import os
+
+import pytest
+
+from chassis_controller.util.server import SERVER_APP, SERVER_PROFILES, TOP_LEVEL_DIR, Server, server_settings
+
+
+#####################################################
+# Server Profile Tests
+#####################################################
+def test_app_dir_holds_the_package():
+    assert os.path.isfile(os.path.join(TOP_LEVEL_DIR, "chassis_controller", "app", "main.py"))
+
+
+def test_dev_profile_reloads():
+    settings = server_settings("dev", "127.0.0.1", 8000)
+    assert settings["app"] == SERVER_APP
+    assert settings["reload"] is True
+    assert all(os.path.isdir(path) for path in settings["reload_dirs"])
+
+
+def test_production_profile():
+    settings = server_settings("production", "0.0.0.0", 8080)
+    assert (settings["host"], settings["port"]) == ("0.0.0.0", 8080)
+    assert settings["reload"] is False
+    assert settings["workers"] == 1
+    assert settings["loop"] in ("uvloop", "asyncio")
+    assert settings["http"] in ("httptools", "h11")
+
+
+def test_unknown_profile():
+    with pytest.raises(ValueError):
+        server_settings("fast")
+
+
+def test_server_process_settings():
+    server = Server("production", port=8123)
+    assert server.settings == server_settings("production", port=8123)
+    assert set(SERVER_PROFILES) == {"dev", "production"}
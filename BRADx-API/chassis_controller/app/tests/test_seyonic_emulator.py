@@ -0,0 +1,100 @@
+
+# Version: Test
+import asyncio
+
+import pytest
+
+from chassis_controller.app.routers.interfaces import PipettorBus
+from chassis_controller.app.routers.interfaces.PipettorBus import PipettorBusRouterInterface, pipettor_bus_timed_exchange
+from chassis_controller.app.routers.interfaces.breaker import PIPETTOR_BREAKERS
+from chassis_controller.app.routers.interfaces.utils import PipettorRequest, PipettorResponse
+from chassis_controller.emulators.seyonic import (
+    PIPETTOR_CMD_ASPIRATE,
+    PIPETTOR_CMD_DISPENSE,
+    PIPETTOR_CMD_GET_PRESSURE,
+    PIPETTOR_CMD_GET_VOLUME,
+    PIPETTOR_CMD_SET_PRESSURE,
+    PIPETTOR_CMD_STATUS,
+    PIPETTOR_DISPENSER_ADDRESS,
+    PIPETTOR_ERR_BUSY,
+    PIPETTOR_ERR_INVALID_VALUE,
+    PIPETTOR_ERR_UNKNOWN_COMMAND,
+    PIPETTOR_OK,
+    PIPETTOR_PRESSURE_ADDRESS,
+    PIPETTOR_SYSTEM_ADDRESS,
+    SeyonicEmulator,
+)
+
+
+class Clock:
+    """Virtual clock, simulated time only moves when the test advances it"""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+
+@pytest.fixture
+def emulator(clock, monkeypatch):
+    PIPETTOR_BREAKERS.reset()
+    with SeyonicEmulator(clock=clock) as emu:
+        monkeypatch.setattr(PipettorBus, "PIPETTOR_PORT", emu.port)
+        yield emu
+    PIPETTOR_BREAKERS.reset()
+
+
+def exchange(address, command_hi, command_lo=0, data=0):
+    pkt, elapsed = asyncio.run(pipettor_bus_timed_exchange(PipettorRequest(address, command_lo, command_hi, data)))
+    assert elapsed > 0
+    return pkt
+
+
+#####################################################
+# Seyonic Emulator Tests
+#####################################################
+def test_seyonic_emulator_pressure(emulator, clock):
+    assert exchange(PIPETTOR_PRESSURE_ADDRESS, PIPETTOR_CMD_SET_PRESSURE, data=-200 & 0xFFFF).error_code == PIPETTOR_OK
+    assert exchange(PIPETTOR_PRESSURE_ADDRESS, PIPETTOR_CMD_STATUS).data == 0
+    clock.now += 1.0
+    pkt = exchange(PIPETTOR_PRESSURE_ADDRESS, PIPETTOR_CMD_GET_PRESSURE)
+    assert pkt.data - 0x10000 == -200
+    assert exchange(PIPETTOR_PRESSURE_ADDRESS, PIPETTOR_CMD_STATUS).data == 1
+
+
+def test_seyonic_emulator_aspirate_dispense(emulator, clock):
+    assert exchange(PIPETTOR_DISPENSER_ADDRESS, PIPETTOR_CMD_ASPIRATE, 3, 20000).error_code == PIPETTOR_OK
+    assert exchange(PIPETTOR_DISPENSER_ADDRESS, PIPETTOR_CMD_STATUS, 3).data == 1
+    assert exchange(PIPETTOR_SYSTEM_ADDRESS, PIPETTOR_CMD_STATUS).data == 0b100
+    assert exchange(PIPETTOR_DISPENSER_ADDRESS, PIPETTOR_CMD_DISPENSE, 3, 5000).error_code == PIPETTOR_ERR_BUSY
+
+    clock.now += 2.0  # 20 uL at 10 uL/s
+    assert exchange(PIPETTOR_SYSTEM_ADDRESS, PIPETTOR_CMD_STATUS).data == 0
+    assert exchange(PIPETTOR_DISPENSER_ADDRESS, PIPETTOR_CMD_DISPENSE, 3, 5000).error_code == PIPETTOR_OK
+    assert exchange(PIPETTOR_DISPENSER_ADDRESS, PIPETTOR_CMD_GET_VOLUME, 3).data == 15000
+    clock.now += 1.0
+    assert exchange(PIPETTOR_DISPENSER_ADDRESS, PIPETTOR_CMD_DISPENSE, 3, 20000).error_code == PIPETTOR_ERR_INVALID_VALUE
+
+
+def test_seyonic_emulator_errors(emulator):
+    assert exchange(PIPETTOR_SYSTEM_ADDRESS, PIPETTOR_CMD_ASPIRATE).error_code == PIPETTOR_ERR_UNKNOWN_COMMAND
+    assert exchange(PIPETTOR_DISPENSER_ADDRESS, PIPETTOR_CMD_STATUS, 9).error_code == PIPETTOR_ERR_INVALID_VALUE
+
+
+def test_seyonic_emulator_response_checksum(emulator):
+    conn = PipettorBusRouterInterface(emulator.port, timeout=1.0)
+    conn.connect()
+    try:
+        resp = asyncio.run(conn.exchange(PipettorRequest(PIPETTOR_DISPENSER_ADDRESS, 1, PIPETTOR_CMD_GET_VOLUME, 0).raw_packet))
+        bad = asyncio.run(conn.exchange(b"30 01 22 00 00 00\r"))
+    finally:
+        conn.disconnect()
+    assert PipettorResponse.parse(resp, checksum=True).address == PIPETTOR_DISPENSER_ADDRESS
+    assert bad == b""
+    assert emulator.checksum_errors == 1
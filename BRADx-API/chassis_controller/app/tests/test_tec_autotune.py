@@ -0,0 +1,124 @@
+
+# Version: Test
+import asyncio
+
+import numpy as np
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs
+from chassis_controller.app.tec import bus
+from chassis_controller.app.tec.autotune import *
+
+
+class FakePlant:
+    """FOPDT heater (gain 4 C/A, time constant 20 s, dead time 2 s) sampled every 50 ms"""
+
+    def __init__(self, start=40.0, current=1.0):
+        self.now = 0.0
+        self.start = start
+        self.current = current
+        self.step_at = None
+        self.step = 0.0
+        self.writes = []
+
+    def clock(self):
+        return self.now
+
+    def temperature(self):
+        if self.step_at is None or self.now - self.step_at < 2.0:
+            return self.start
+        return self.start + self.step * (1 - np.exp(-(self.now - self.step_at - 2.0) / 20.0))
+
+    async def exchange(self, pkts):
+        self.now += 0.05
+        pkts[0].data = self.temperature()
+        pkts[1].data = self.current + (0.0 if self.step_at is None else self.step / 4.0)
+        return (pkts, 50000, [0, 25000])
+
+    async def read(self, address, parameters):
+        values = {"Target Object Temp (Set)": self.start, "Kp": 10.0, "Ti": 30.0, "Td": 0.0,
+                  "Object Temperature": self.start, "Actual Output Current": self.current}
+        return {p: values[p] for p in parameters}
+
+    async def write(self, address, parameter, value):
+        self.writes.append((parameter, value))
+        if parameter == "Target Object Temp (Set)" and self.step_at is None:
+            self.step_at = self.now
+            self.step = value - self.start
+
+    async def hold(self):
+        pass
+
+    def release(self):
+        pass
+
+
+def autotune(plant, **kwargs):
+    request = AutotuneRequest(heater=MeerstetterIDs.heater_a, step=5.0, duration=150.0, **kwargs)
+    run = AutotuneRun(request, 1, exchange=plant.exchange, read=plant.read, write=plant.write,
+                      hold=plant.hold, release=plant.release, clock=plant.clock)
+    asyncio.run(run.run())
+    return run
+
+
+#####################################################
+# Step Response Analysis Tests
+#####################################################
+def test_step_response_metrics():
+    t = np.linspace(0, 10, 1001)
+    y = 1 - np.exp(-t)
+    metrics = step_response_metrics(t, y, 0.0, 1.0)
+    assert abs(metrics["rise_time_s"] - np.log(9)) < 0.01
+    assert metrics["overshoot_pct"] == 0
+    assert abs(metrics["settling_time_s"] - np.log(50)) < 0.01
+
+
+#####################################################
+# Autotune Run Tests
+#####################################################
+def test_autotune_fits_plant():
+    plant = FakePlant()
+    run = autotune(plant)
+    assert run.state == ProfileRunState.completed, run.error
+    model = run.result["model"]
+    assert abs(model["gain"] - 4.0) < 0.1
+    assert abs(model["time_constant_s"] - 20.0) < 1.0
+    assert abs(model["dead_time_s"] - 2.0) < 0.5
+    assert run.result["sample_rate_hz"] > 15
+    assert run.result["identification"] == AUTOTUNE_IDENTIFICATION
+    assert not run.result["applied"]
+    # Setpoint step, then the original setpoint restored
+    assert plant.writes == [("Target Object Temp (Set)", 45.0), ("Target Object Temp (Set)", 40.0)]
+
+
+def test_autotune_applies_gains():
+    plant = FakePlant()
+    run = autotune(plant, apply=True)
+    assert run.result["applied"]
+    assert [p for p, _ in plant.writes[1:4]] == ["Kp", "Ti", "Td"]
+
+
+def test_autotune_failed_baseline_read_does_not_step(monkeypatch):
+    plant = FakePlant()
+
+    async def exchanges(pkts):
+        pkts[0].error = "No response"  # Target Object Temp (Set)
+        return (pkts, 0, [0] * len(pkts))
+
+    monkeypatch.setattr(bus, "meerstetter_bus_timed_exchanges", exchanges)
+    request = AutotuneRequest(heater=MeerstetterIDs.heater_a, step=5.0, duration=1.0)
+    run = AutotuneRun(request, 1, exchange=plant.exchange, read=bus.read_parameters, write=plant.write,
+                      hold=plant.hold, release=plant.release, clock=plant.clock)
+    asyncio.run(run.run())
+    assert run.state == ProfileRunState.error
+    assert "Target Object Temp (Set)" in run.error
+    assert plant.writes == []  # Neither a step from 0 nor a "restore"
+
+
+def test_autotune_no_response():
+    plant = FakePlant()
+    run = AutotuneRun(AutotuneRequest(heater=MeerstetterIDs.heater_a, duration=1.0), 1, exchange=plant.exchange,
+                      read=plant.read, write=lambda *args: asyncio.sleep(0), hold=plant.hold, release=plant.release,
+                      clock=plant.clock)
+    asyncio.run(run.run())
+    assert run.state == ProfileRunState.completed
+    assert run.result["gains"] is None
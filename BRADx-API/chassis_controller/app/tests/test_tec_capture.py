@@ -0,0 +1,130 @@
+
+# Version: Test
+import asyncio
+
+import numpy as np
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs
+from chassis_controller.app.tec.bus import heater_address
+from chassis_controller.app.tec.config_cache import TecConfigCache
+from chassis_controller.app.tec.analytics import segment_metrics
+from chassis_controller.app.tec.capture import *
+from chassis_controller.app.tec.profile import evict_finished
+
+
+def pcr_run(cycles=3, dt=0.1):
+    """Two heaters cycling 95/60 C every 10 s, heater 2 overshooting by 1 C for 1 s after each step"""
+    n = int(cycles * 20 / dt)
+    t = np.arange(n) * dt
+    k = np.arange(n) % int(10 / dt)
+    setpoint = np.where((np.arange(n) // int(10 / dt)) % 2 == 0, 95.0, 60.0)
+    temperature = setpoint.copy()
+    temperature[k < 20] = np.where(setpoint[k < 20] == 95.0, 80.0, 75.0)  # Ramping for 2 s
+    overshoot = temperature.copy()
+    overshoot[(k >= 20) & (k < 30)] += np.where(setpoint[(k >= 20) & (k < 30)] == 95.0, 1.0, -1.0)
+    return t, np.stack([temperature, overshoot], 1), np.stack([setpoint, setpoint], 1)
+
+
+#####################################################
+# Analytics Tests
+#####################################################
+def test_segment_metrics_per_heater_and_cycle():
+    t, temperature, setpoint = pcr_run()
+    m = segment_metrics(t, temperature, setpoint, band=0.5)
+    assert m["heater"].tolist() == [0] * 6 + [1] * 6
+    assert m["cycle"].tolist() == [0, 0, 1, 1, 2, 2] * 2
+    assert np.isnan(m["overshoot_c"][0])
+    assert m["overshoot_c"][1] == 0
+    assert m["overshoot_c"][7] == 1.0
+    np.testing.assert_allclose(m["settling_time_s"][1:6], 2.0)
+    np.testing.assert_allclose(m["settling_time_s"][7:12], 3.0)
+    np.testing.assert_allclose(m["time_at_temperature_s"][1], 7.9)  # Last sample of a segment counts 0 s
+    assert m["stable_windows"][7] == 1
+    np.testing.assert_allclose(m["longest_stable_s"][7], 6.9)
+    assert m["ramp_rate_c_per_s"][2] > 0 > m["ramp_rate_c_per_s"][1]
+
+
+def test_segment_metrics_unsettled():
+    t = np.arange(10.0)
+    m = segment_metrics(t, np.full((10, 1), 20.0), np.full((10, 1), 60.0))
+    assert np.isnan(m["settling_time_s"][0])
+    assert np.isnan(m["ramp_rate_c_per_s"][0])
+    assert m["stable_windows"][0] == 0
+
+
+def test_segment_metrics_carry_unknown_setpoints():
+    t, temperature, setpoint = pcr_run()
+    expected = segment_metrics(t, temperature, setpoint)
+    holes = setpoint.copy()
+    holes[5::7] = np.nan  # Failed setpoint reads
+    m = segment_metrics(t, temperature, holes)
+    assert m["heater"].tolist() == expected["heater"].tolist()
+    np.testing.assert_allclose(m["settling_time_s"], expected["settling_time_s"])
+
+    holes[:3] = np.nan  # Unknown until the first read succeeds
+    m = segment_metrics(t, temperature, holes)
+    assert m["heater"].tolist() == [0] * 7 + [1] * 7
+    assert np.isnan(m["setpoint"][0]) and m["setpoint"][1] == 95.0
+
+
+#####################################################
+# Capture Tests
+#####################################################
+class FakeHeaters:
+    def __init__(self):
+        self.now = 0.0
+        self.frames = []
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += delay
+
+    async def exchange(self, pkts):
+        self.frames.append(len(pkts))
+        self.now += 0.01
+        for pkt in pkts:
+            pkt.data = 60.0 if pkt.parameter.name == "Target Object Temp (Set)" else min(60.0, 59.0 + self.now / 2)
+        return (pkts, 10000, [0] * len(pkts))
+
+    async def hold(self):
+        pass
+
+    def release(self):
+        pass
+
+
+def test_capture_fills_buffers_and_uses_cached_setpoints():
+    heaters = FakeHeaters()
+    cache = TecConfigCache()
+    cache.put(heater_address(MeerstetterIDs.heater_a), "Target Object Temp (Set)", 60.0)
+    request = CaptureRequest(heaters=[MeerstetterIDs.heater_a, MeerstetterIDs.heater_b], interval=0.1, capacity=50)
+    capture = RunCapture(request, exchange=heaters.exchange, cache=cache, hold=heaters.hold,
+                         release=heaters.release, clock=heaters.clock, sleep=heaters.sleep)
+    asyncio.run(capture.run())
+
+    assert capture.state == ProfileRunState.completed
+    assert capture.samples == 50
+    # Heater B's setpoint is read once and then served from the cache
+    assert heaters.frames[:2] == [3, 2]
+    np.testing.assert_allclose(np.diff(capture.t[:50]), 0.1)
+    segments = capture.analytics(band=0.5)
+    assert list(segments) == ["Heater A", "Heater B"]
+    assert segments["Heater A"][0]["setpoint"] == 60.0
+    assert segments["Heater A"][0]["settling_time_s"] is not None
+
+
+def test_finished_captures_are_evicted():
+    request = CaptureRequest(heaters=[MeerstetterIDs.heater_a], capacity=5)
+    runs = {}
+    for _ in range(CAPTURE_KEEP_FINISHED + 2):
+        capture = RunCapture(request)
+        capture.state = ProfileRunState.completed
+        runs[capture.run_id] = capture
+    running = RunCapture(request)
+    running.state = ProfileRunState.running
+    runs[running.run_id] = running
+    finished = list(runs)[:-1]
+    evict_finished(runs, CAPTURE_KEEP_FINISHED)
+    assert list(runs) == finished[-CAPTURE_KEEP_FINISHED:] + [running.run_id]
@@ -0,0 +1,137 @@
+
+# Version: Test
+import asyncio
+from contextlib import asynccontextmanager
+
+import pytest
+
+from chassis_controller.app.routers.interfaces.utils_meerstetter import ACK, MeerstetterBusPacketType
+from chassis_controller.app.tec.config_apply import *
+
+
+class FakeConnection:
+    """Meerstetter holding parameters in a dict, optionally refusing some writes"""
+
+    def __init__(self, values, read_only=(), unanswered=(), fail_on=None):
+        self.values = dict(values)
+        self.read_only = read_only
+        self.unanswered = unanswered  # (parameter, value) writes left without a response
+        self.fail_on = fail_on  # Exchange (1-based) that loses the connection
+        self.sets = []
+        self.exchanges = 0
+        self.pipelined = 0
+
+    async def exchange_pipelined_async(self, pkts):
+        assert len({pkt.sequence for pkt in pkts}) == len(pkts)
+        self.pipelined += 1
+        return await self.exchange_packets_async(pkts)
+
+    async def exchange_packets_async(self, pkts):
+        self.exchanges += 1
+        if self.exchanges == self.fail_on:
+            raise IOError("Meerstetter interface not connected")
+        for pkt in pkts:
+            name = pkt.parameter.name
+            if pkt.packet_type == MeerstetterBusPacketType.GET_PARAMETER:
+                pkt.data = self.values[name]
+            elif name in self.read_only:
+                pkt.error = "Parameter is read only"
+            elif (name, pkt.value) in self.unanswered:
+                pkt.error = "No response"
+            else:
+                self.values[name] = pkt.value
+                self.sets.append((name, pkt.value))
+                pkt.query.RESPONSE = ACK()
+        return [0] * len(pkts)
+
+    @asynccontextmanager
+    async def connection(self):
+        yield self
+
+
+DEVICE = {"Save Data to Flash": 0, "Kp": 10.0, "Ti": 20.0, "Td": 0.5, "Status": 0}
+
+
+#####################################################
+# Configuration Apply Tests
+#####################################################
+def test_config_apply_writes_only_changes():
+    conn = FakeConnection(DEVICE)
+    doc = TecConfigDocument(parameters={"Status": 1, "Kp": 10.0, "Ti": 25.0})
+    result = asyncio.run(apply_config(1, doc, connection=conn.connection))
+
+    assert result["applied"]
+    assert result["unchanged"] == ["Kp"]
+    assert result["written"] == ["Ti", "Status"]  # Output stage is enabled last
+    # Automatic saving stays disabled, the new configuration is not persisted
+    assert conn.sets == [("Save Data to Flash", 1), ("Ti", 25.0), ("Status", 1)]
+    assert result["flash_save"] == {"before": 0, "after": 1}
+    assert conn.pipelined == 2  # Read back and verify
+
+
+def test_config_apply_stops_when_saving_is_not_disabled():
+    conn = FakeConnection(DEVICE, unanswered=[("Save Data to Flash", 1)])
+    with pytest.raises(ValueError):
+        asyncio.run(apply_config(1, TecConfigDocument(parameters={"Kp": 12.0}), connection=conn.connection))
+    assert conn.sets == []
+    assert conn.values == DEVICE
+
+
+def test_config_apply_reports_unconfirmed_saving():
+    conn = FakeConnection(DEVICE, unanswered=[("Save Data to Flash", 0)])
+    doc = TecConfigDocument(parameters={"Kp": 12.0}, save_to_flash=True)
+    result = asyncio.run(apply_config(1, doc, connection=conn.connection))
+
+    assert result["applied"]
+    assert result["flash_save"] == {"before": 0, "after": 1}  # Enabling was not acknowledged
+
+
+def test_config_apply_saves_to_flash():
+    conn = FakeConnection({**DEVICE, "Save Data to Flash": 1})
+    doc = TecConfigDocument(parameters={"Kp": 12.0}, save_to_flash=True)
+    result = asyncio.run(apply_config(1, doc, connection=conn.connection))
+
+    assert result["flash_save"] == {"before": 1, "after": 0}
+    assert conn.values["Save Data to Flash"] == 0
+
+
+def test_config_apply_no_changes():
+    conn = FakeConnection(DEVICE)
+    result = asyncio.run(apply_config(1, TecConfigDocument(parameters={"Kp": 10}), connection=conn.connection))
+
+    assert result["applied"]
+    assert result["written"] == []
+    assert conn.sets == []
+    assert conn.exchanges == 1
+
+
+def test_config_apply_rolls_back():
+    conn = FakeConnection(DEVICE, read_only=("Td",))
+    doc = TecConfigDocument(parameters={"Kp": 1.0, "Td": 2.0})
+    result = asyncio.run(apply_config(1, doc, connection=conn.connection))
+
+    assert not result["applied"]
+    assert result["rejected"] == ["Td"]
+    assert result["rolled_back"] == ["Kp"]
+    assert conn.values["Kp"] == 10.0
+    assert conn.values["Save Data to Flash"] == 0  # Previous saving state restored
+
+
+def test_config_apply_unknown_parameter():
+    with pytest.raises(ValueError):
+        asyncio.run(apply_config(1, TecConfigDocument(parameters={"Object Temperature": 1}), connection=None))
+
+
+@pytest.mark.parametrize("parameters", [{"Kp": -5}, {"Status": 7}, {"Fan Control Enable": 0.5}])
+def test_config_apply_checks_ranges(parameters):
+    conn = FakeConnection(DEVICE)
+    with pytest.raises(ConfigRejected):
+        asyncio.run(apply_config(1, TecConfigDocument(parameters=parameters), connection=conn.connection))
+    assert conn.exchanges == 0
+
+
+def test_config_apply_restores_flash_saving_on_bus_failure():
+    conn = FakeConnection(DEVICE, fail_on=3)  # Read back, disable saving, then the writes fail
+    with pytest.raises(IOError):
+        asyncio.run(apply_config(1, TecConfigDocument(parameters={"Kp": 12.0}), connection=conn.connection))
+    assert conn.values["Save Data to Flash"] == 0
@@ -0,0 +1,54 @@
+
+# Version: Test
+from chassis_controller.app.routers.interfaces.utils_meerstetter import (
+    MeerstetterBusPacket,
+    MeerstetterBusPacketType,
+)
+from chassis_controller.app.tec.config_cache import TecConfigCache
+
+
+def exchanged(packet_type, response, **kwargs):
+    pkt = MeerstetterBusPacket(packet_type, address=0x51, sequence=0xF006, **kwargs)
+    pkt.parse(response)
+    return pkt
+
+
+#####################################################
+# Configuration Cache Tests
+#####################################################
+def test_config_cache_write_through():
+    cache = TecConfigCache()
+    pkt = exchanged(MeerstetterBusPacketType.SET_PARAMETER, b"!51F0061234\r", parameter="Kp", value=12.5)
+    cache.record(pkt)
+    assert cache.get(0x51, "Kp") == 12.5
+
+
+def test_config_cache_read_fill():
+    cache = TecConfigCache()
+    pkt = exchanged(MeerstetterBusPacketType.GET_PARAMETER, b"!51F00641B2B852B862\r", parameter="Ti")
+    cache.record(pkt)
+    assert 22.33 < cache.get(0x51, "Ti") < 22.35
+
+
+def test_config_cache_skips_live_values():
+    cache = TecConfigCache()
+    pkt = exchanged(MeerstetterBusPacketType.GET_PARAMETER, b"!51F00641B2B852B862\r", parameter="Object Temperature")
+    cache.record(pkt)
+    assert cache.get(0x51, "Object Temperature") is None
+
+
+def test_config_cache_invalidated_by_error_and_reset():
+    cache = TecConfigCache()
+    cache.put(0x51, "Kp", 1.0)
+    cache.put(0x52, "Kp", 2.0)
+    # Wrong sequence number in the response
+    pkt = exchanged(MeerstetterBusPacketType.GET_PARAMETER, b"!51000141B2B852B862\r", parameter="Td")
+    assert pkt.error is not None
+    cache.record(pkt)
+    assert cache.get(0x51, "Kp") is None
+    assert cache.get(0x52, "Kp") == 2.0
+
+    pkt = MeerstetterBusPacket(MeerstetterBusPacketType.SYS_RESET, address=0x52, sequence=0xF006)
+    pkt.parse(b"!52F0061234\r")
+    cache.record(pkt)
+    assert cache.get(0x52, "Kp") is None
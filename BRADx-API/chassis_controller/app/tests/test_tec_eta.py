@@ -0,0 +1,64 @@
+
+# Version: Test
+import math
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs
+from chassis_controller.app.tec.eta import *
+
+
+def approach(model, target=60.0, start=20.0, tau=10.0, max_rate=1.0, seconds=200, dt=1.0):
+    """Feed a current limited first order approach, yields (t, temperature) after each sample"""
+    temperature = start
+    for k in range(int(seconds / dt)):
+        t = k * dt
+        model.update(t, temperature, target)
+        yield t, temperature
+        temperature += math.copysign(min(max_rate, abs(target - temperature) / tau), target - temperature) * dt
+
+
+def time_to_band(target=60.0, start=20.0, tau=10.0, max_rate=1.0, dt=1.0):
+    for t, temperature in approach(HeaterEta(), target, start, tau, max_rate, dt=dt):
+        if abs(target - temperature) <= ETA_BAND:
+            return t
+
+
+#####################################################
+# ETA Estimator Tests
+#####################################################
+def test_eta_first_order_approach():
+    actual = time_to_band()
+    model = HeaterEta()
+    for t, temperature in approach(model):
+        if abs(60.0 - temperature) < 8.0:  # Exponential phase
+            break
+    estimate = model.estimate()
+    assert estimate["model"] == "first order"
+    assert abs(t + estimate["eta_s"] - actual) < 0.15 * actual
+
+
+def test_eta_linear_phase():
+    model = HeaterEta()
+    model.update(0.0, 20.0, 60.0)
+    model.update(1.0, 21.0, 60.0)
+    estimate = model.estimate()
+    assert estimate["model"] == "linear"
+    assert estimate["eta_s"] == 38.5
+
+
+def test_eta_resets_on_new_target():
+    model = HeaterEta()
+    model.update(0.0, 20.0, 60.0)
+    model.update(1.0, 21.0, 60.0)
+    model.update(2.0, 22.0, 95.0)
+    assert model.estimate() == {"eta_s": None, "model": None}
+    model.update(3.0, 94.8, 95.0)
+    assert model.estimate() == {"eta_s": 0.0, "model": "at target"}
+
+
+def test_eta_estimator_fed_by_watcher_values():
+    estimator = EtaEstimator()
+    estimator.update(MeerstetterIDs.heater_a, {"Object Temperature": 20.0, "Target Object Temperature": 60.0}, 0.0)
+    estimator.update(MeerstetterIDs.heater_a, {"Object Temperature": 22.0, "Target Object Temperature": 60.0}, 1.0)
+    estimate = estimator.estimate(MeerstetterIDs.heater_a)
+    assert estimate["eta_s"] == 18.8
+    assert estimator.estimate(MeerstetterIDs.heater_b) is None
@@ -0,0 +1,109 @@
+
+# Version: Test
+import asyncio
+from struct import pack
+
+import pytest
+
+from chassis_controller.app.routers.interfaces.MeerstetterBus import MeerstetterBusRouterInterface
+from chassis_controller.app.routers.interfaces.utils_meerstetter import (
+    MeerstetterBusPacket,
+    MeerstetterBusPacketType,
+    crc16_ccitt_xmodem,
+)
+from chassis_controller.app.tec.config_cache import TecConfigCache
+
+
+def response(request: bytes, value: float) -> bytes:
+    """Parameter value response to a GET request, with the request's address and sequence"""
+    frame = b"!" + request[1:7] + pack("!f", value).hex().upper().encode()
+    return frame + "{:04X}".format(crc16_ccitt_xmodem(frame)).encode() + b"\r"
+
+
+class FakeSerial:
+    """Meerstetter answering the latest request first, with the instance number as value"""
+
+    def __init__(self, answered=None):
+        self.is_open = True
+        self.timeout = None
+        self.requests = []
+        self.pending = []
+        self.answered = answered  # Number of requests answered before going silent
+
+    def write(self, data):
+        self.requests.append(data)
+        self.pending.append(data)
+
+    async def read_until_async(self, expected, size):
+        if not self.pending or (self.answered is not None and self.answered <= 0):
+            return b""
+        if self.answered is not None:
+            self.answered -= 1
+        request = self.pending.pop()
+        return response(request, float(int(request[14:16], 16)))
+
+
+def interface(fake):
+    conn = MeerstetterBusRouterInterface("fake")
+    conn._connection = fake
+    return conn
+
+
+def get_packets(instances, sequence=0x1000):
+    return [
+        MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=0x51, sequence=sequence + n, parameter="Object Temperature", parameter_instance=instance)
+        for n, instance in enumerate(instances)
+    ]
+
+
+#####################################################
+# Parameter Instance Tests
+#####################################################
+def test_parameter_instance_in_request():
+    pkt = MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=0x51, sequence=0xF436, parameter="Object Temperature", parameter_instance=2)
+    assert pkt.raw_packet[7:16] == b"?VR03E802"
+
+
+def test_parameter_instance_validated():
+    with pytest.raises(ValueError):
+        MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=0x51, parameter="Object Temperature", parameter_instance=0)
+    with pytest.raises(ValueError):
+        MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=0x51, parameter="Object Temperature", parameter_instance=256)
+
+
+def test_config_cache_separates_instances():
+    cache = TecConfigCache()
+    cache.put(0x51, "Kp", 1.0)
+    cache.put(0x51, "Kp", 2.0, instance=2)
+    assert cache.get(0x51, "Kp") == 1.0
+    assert cache.get(0x51, "Kp", instance=2) == 2.0
+    assert cache.snapshot() == {0x51: {"Kp": 1.0, "Kp [2]": 2.0}}
+
+
+#####################################################
+# Pipelined Exchange Tests
+#####################################################
+def test_pipelined_exchange_matches_out_of_order_responses():
+    fake = FakeSerial()
+    pkts = get_packets([1, 2, 3, 4, 5, 6])
+    offsets = asyncio.run(interface(fake).exchange_pipelined_async(pkts, depth=4))
+
+    assert [pkt.error for pkt in pkts] == [None] * 6
+    assert [pkt.data for pkt in pkts] == [1.0, 2.0, 3.0, 4.0, 5.0, 6.0]
+    assert all(offset is not None for offset in offsets)
+    assert len(fake.requests) == 6
+
+
+def test_pipelined_exchange_timeout():
+    fake = FakeSerial(answered=1)
+    pkts = get_packets([1, 2, 3])
+    asyncio.run(interface(fake).exchange_pipelined_async(pkts, depth=4))
+
+    assert pkts[2].error is None and pkts[2].data == 3.0  # Answered first
+    assert pkts[0].error == pkts[1].error == "No response"
+
+
+def test_pipelined_exchange_needs_distinct_sequences():
+    pkts = get_packets([1, 2]) + get_packets([3])
+    with pytest.raises(ValueError):
+        asyncio.run(interface(FakeSerial()).exchange_pipelined_async(pkts))
@@ -0,0 +1,190 @@
+
+# Version: Test
+import asyncio
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from chassis_controller.app.inventory.registry import DEVICE_INVENTORY
+from chassis_controller.app.routers import tec_submodule
+from chassis_controller.app.routers.interfaces.utils_meerstetter import ACK, TEC_PARAMETER_LIST, MeerstetterBusPacketType
+from chassis_controller.app.routers.tec_submodule import TEC_GET_ALIASES, TEC_SET_ALIASES
+from chassis_controller.app.tec import config_cache
+from chassis_controller.app.tec.config_cache import TEC_CONFIG_CACHE
+
+# Values read from the fake heater, the other parameters read 21.5
+DEVICE_VALUES = {
+    "Firmware Version": 123,
+    "Device Status": 2,
+    "Device Address": 2,
+    "Error Number": 108,
+    "Temperature is Stable": 2,
+    "Status": 1,
+    "Fan Control Enable": 1,
+}
+
+# (message, response) of every alias URL for Heater B, as answered by the per-parameter handlers
+# the aliases replaced. The fake bus sets the message to the heater address and the parameter id.
+FORMER_GET_BODIES = {
+    "object-temperature": ("!021000", "21.5"),
+    "sink-temperature": ("!021001", "21.5"),
+    "target-object-temperature": ("!021010", "21.5"),
+    "actual-output-current": ("!021020", "21.5"),
+    "actual-output-voltage": ("!021021", "21.5"),
+    "relative-cooling-power": ("!021100", "21.5"),
+    "actual-fan-speed": ("!021102", "21.5"),
+    "target-fan-temperature": ("!026211", "21.5"),
+    "current-error-threshold": ("!022032", "21.5"),
+    "voltage-error-threshold": ("!022033", "21.5"),
+    "object-upper-error-threshold": ("!024011", "21.5"),
+    "object-lower-error-threshold": ("!024010", "21.5"),
+    "sink-upper-error-threshold": ("!025011", "21.5"),
+    "sink-lower-error-threshold": ("!025010", "21.5"),
+    "temperature-is-stable": ("!021200", "Is stable"),
+    "temperature-control": ("!022010", "On"),
+    "fan-control": ("!026200", "1"),
+    "Kp": ("!023010", "21.5"),
+    "Ti": ("!023011", "21.5"),
+    "Td": ("!023012", "21.5"),
+    "firmware-version": ("!02103", "1.23"),
+    "device-status": ("!02104", "Run"),
+    "device-address": ("!022051", "2"),
+    "error-number": ("!02105", "108"),
+    "error-description": (
+        "!02105",
+        "Output Stage saturation error. Check input current is sufficient and Vout not set too close to Vin. "
+        "Try to reduce the 'Current Limitation' in the 'Operation' tab.",
+    ),
+}
+
+# Query of every POST alias URL with its former (message, response)
+FORMER_SET_BODIES = {
+    "object-temperature": ({"setpoint": 12.5}, "!023000", "0"),
+    "target-fan-temperature": ({"setpoint": 12.5}, "!026211", "0"),
+    "current-error-threshold": ({"setpoint": 12.5}, "!022032", "0"),
+    "voltage-error-threshold": ({"setpoint": 12.5}, "!022033", "0"),
+    "Kp": ({"setpoint": 12.5}, "!023010", "0"),
+    "Ti": ({"setpoint": 12.5}, "!023011", "0"),
+    "Td": ({"setpoint": 12.5}, "!023012", "0"),
+    "temperature-control": ({"status": "On"}, "!022010", "0"),
+    "fan-control": ({"status": "Enabled"}, "!026200", "0"),
+}
+
+
+async def fake_exchange(pkt):
+    if pkt.packet_type == MeerstetterBusPacketType.SET_PARAMETER:
+        pkt.query.RESPONSE = ACK()
+        pkt.raw_packet = f"!{pkt.address:02X}{pkt.parameter.id}"
+    elif pkt.packet_type == MeerstetterBusPacketType.GET_PARAMETER:
+        pkt.data = DEVICE_VALUES.get(pkt.parameter.name, 21.5)
+        pkt.raw_packet = f"!{pkt.address:02X}{pkt.parameter.id}"
+    else:
+        pkt.query.RESPONSE = SimpleNamespace(PAYLOAD="TEC-1091")
+        pkt.raw_packet = f"!{pkt.address:02X}IF"
+    return (pkt, 250)
+
+
+async def fake_exchanges(pkts):
+    for pkt in pkts:
+        await fake_exchange(pkt)
+    return (pkts, 250, None)
+
+
+@pytest.fixture
+def tec(monkeypatch):
+    """Sends an HTTP request to the TEC router on a fake heater bus, with empty configuration cache and inventory"""
+    monkeypatch.setattr(config_cache, "meerstetter_bus_timed_exchange", fake_exchange)
+    monkeypatch.setattr(tec_submodule, "meerstetter_bus_timed_exchanges", fake_exchanges)
+    TEC_CONFIG_CACHE.invalidate()
+    DEVICE_INVENTORY.invalidate()
+    app = FastAPI()
+    app.include_router(tec_submodule.router)
+
+    def request(method, url, **params):
+        async def send():
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                return await client.request(method, url, params=params)
+
+        return asyncio.run(send())
+
+    yield request
+    TEC_CONFIG_CACHE.invalidate()
+    DEVICE_INVENTORY.invalidate()
+
+
+#####################################################
+# Parameter Table Tests
+#####################################################
+def test_aliases_map_to_parameters():
+    for parameter, _ in TEC_GET_ALIASES.values():
+        assert TEC_PARAMETER_LIST.get_by_name(parameter)
+    for parameter, _, _ in TEC_SET_ALIASES.values():
+        assert TEC_PARAMETER_LIST.get_by_name(parameter).writable
+
+
+def test_parameter_lookup_by_id_and_name():
+    assert TEC_PARAMETER_LIST.get_by_id(3010) is TEC_PARAMETER_LIST.get_by_name("Kp")
+
+
+def test_parameter_check_value():
+    kp = TEC_PARAMETER_LIST.get_by_name("Kp")
+    assert kp.check_value(12.5) == 12.5
+    with pytest.raises(ValueError):
+        kp.check_value(-1)
+    with pytest.raises(ValueError):
+        TEC_PARAMETER_LIST.get_by_name("Object Temperature").check_value(1)
+    with pytest.raises(ValueError):
+        TEC_PARAMETER_LIST.get_by_name("Status").check_value(0.5)
+    assert TEC_PARAMETER_LIST.get_by_name("Status").check_value(3) == 3  # HW enable
+    with pytest.raises(ValueError):
+        TEC_PARAMETER_LIST.get_by_name("Device Address").check_value(5)
+
+
+#####################################################
+# Alias URL Tests
+#####################################################
+def test_every_alias_is_tested():
+    assert set(FORMER_GET_BODIES) == set(TEC_GET_ALIASES)
+    assert set(FORMER_SET_BODIES) == set(TEC_SET_ALIASES)
+
+
+@pytest.mark.parametrize("alias", sorted(FORMER_GET_BODIES))
+def test_get_alias_body_is_unchanged(tec, alias):
+    message, response = FORMER_GET_BODIES[alias]
+    resp = tec("GET", f"/tec/{alias}/", heater="Heater B")
+    assert resp.status_code == 200
+    assert resp.json() == {"_sid": 3, "_mid": 14, "_duration_us": 250, "message": message, "response": response}
+
+
+@pytest.mark.parametrize("alias", sorted(FORMER_SET_BODIES))
+def test_set_alias_body_is_unchanged(tec, alias):
+    query, message, response = FORMER_SET_BODIES[alias]
+    resp = tec("POST", f"/tec/{alias}/", heater="Heater B", **query)
+    assert resp.status_code == 200
+    assert resp.json() == {"_sid": 3, "_mid": 14, "_duration_us": 250, "message": message, "response": response}
+
+
+def test_unknown_alias_is_rejected(tec):
+    # A 422 from the alias enums, the per-parameter routes answered 404
+    assert tec("GET", "/tec/no-such-parameter/", heater="Heater B").status_code == 422
+    assert tec("POST", "/tec/object-temperature-x/", heater="Heater B", setpoint=1).status_code == 422
+    assert tec("POST", "/tec/sink-temperature/", heater="Heater B", setpoint=1).status_code == 422
+
+
+def test_cached_read_has_no_raw_packet(tec):
+    assert tec("POST", "/tec/param/Kp", heater="Heater B", value=12.5).status_code == 200
+    resp = tec("GET", "/tec/param/Kp", heater="Heater B")
+    assert resp.json()["response"] == 12.5
+    assert resp.json()["_duration_us"] == 0
+    assert resp.json()["message"] == ""
+
+
+def test_group_setpoint_out_of_range_is_rejected(tec):
+    assert tec("POST", "/tec/group/setpoint", setpoint=5000).status_code == 422
+
+
+def test_device_address_is_read_only(tec):
+    assert tec("GET", "/tec/param/Device Address", heater="Heater B").status_code == 200
+    assert tec("POST", "/tec/param/Device Address", heater="Heater B", value=5).status_code == 422
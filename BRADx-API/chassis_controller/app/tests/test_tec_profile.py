@@ -0,0 +1,251 @@
+
+# Version: Test
+import asyncio
+
+import pytest
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs
+from chassis_controller.app.routers.interfaces.utils_meerstetter import ACK
+from chassis_controller.app.tec import bus
+from chassis_controller.app.tec import profile as profile_module
+from chassis_controller.app.tec.profile import *
+from chassis_controller.app.tec.group import GroupError, GroupProfileRun, HeaterGroup
+
+
+class FakeHeater:
+    """Fake bus + virtual monotonic clock, sleeping advances the clock"""
+
+    def __init__(self, stable_after=0):
+        self.now = 0.0
+        self.writes = []
+        self.stable_after = stable_after
+        self.stable_reads = 0
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += delay
+
+    async def read(self, address, parameter):
+        if parameter == "Temperature is Stable":
+            self.stable_reads += 1
+            return 2 if self.stable_reads > self.stable_after else 1
+        return 25.0
+
+    async def write(self, address, parameter, value):
+        self.writes.append((self.now, parameter, value))
+
+
+def make_run(fake, steps):
+    return ProfileRun(
+        MeerstetterIDs.heater_a, 1, [ProfileStep(**s) for s in steps],
+        read=fake.read, write=fake.write, clock=fake.clock, sleep=fake.sleep,
+    )
+
+
+#####################################################
+# Profile Validation Tests
+#####################################################
+def test_profile_validation():
+    with pytest.raises(ValueError):
+        validate_profile([])
+    with pytest.raises(ValueError):
+        validate_profile([ProfileStep(type="ramp", temperature=60)])
+    with pytest.raises(ValueError):
+        validate_profile([ProfileStep(type="hold", duration=1), ProfileStep(type="cycle", goto=1, count=2)])
+
+
+#####################################################
+# Profile Execution Tests
+#####################################################
+def test_profile_pcr_cycle():
+    fake = FakeHeater()
+    run = make_run(fake, [
+        {"type": "setpoint", "temperature": 95},
+        {"type": "hold", "duration": 10},
+        {"type": "setpoint", "temperature": 60},
+        {"type": "hold", "duration": 20},
+        {"type": "cycle", "goto": 0, "count": 2},
+    ])
+    asyncio.run(run.run())
+
+    assert run.state == ProfileRunState.completed
+    assert [w[2] for w in fake.writes] == [95, 60] * 3
+    # Hold times come from the server clock only
+    assert fake.now == pytest.approx(90.0)
+
+
+def test_profile_ramp():
+    fake = FakeHeater()
+    run = make_run(fake, [
+        {"type": "setpoint", "temperature": 50},
+        {"type": "ramp", "temperature": 60, "rate": 2.0},
+    ])
+    asyncio.run(run.run())
+
+    assert run.state == ProfileRunState.completed
+    assert fake.now == pytest.approx(5.0)
+    values = [w[2] for w in fake.writes]
+    assert values[0] == 50
+    assert values[-1] == 60
+    assert values == sorted(values)
+    assert fake.writes[1] == (PROFILE_RAMP_INTERVAL, "Target Object Temp (Set)", pytest.approx(51.0))
+
+
+def test_profile_wait_stable_timeout():
+    fake = FakeHeater(stable_after=1000)
+    run = make_run(fake, [{"type": "setpoint", "temperature": 95, "wait_stable": True, "timeout": 5}])
+    asyncio.run(run.run())
+
+    assert run.state == ProfileRunState.error
+    assert fake.now <= 5.0
+
+
+def answering(error=None, response=None):
+    """tec_config_exchange stand-in leaving the packet as parse does (data 0 on a failure)"""
+    async def exchange(pkt, refresh=False):
+        pkt.error = error
+        pkt.query.RESPONSE = response
+        return (pkt, 0)
+    return exchange
+
+
+def test_failed_read_fails_the_ramp(monkeypatch):
+    monkeypatch.setattr(bus, "tec_config_exchange", answering(error="No response"))
+    fake = FakeHeater()
+    run = ProfileRun(
+        MeerstetterIDs.heater_a, 1, [ProfileStep(type="ramp", temperature=70, rate=1.0)],
+        read=bus.read_parameter, write=fake.write, clock=fake.clock, sleep=fake.sleep,
+    )
+    asyncio.run(run.run())
+
+    assert run.state == ProfileRunState.error
+    assert "Could not read Target Object Temp (Set)" in run.error
+    assert fake.writes == []  # Not ramped from 0
+
+
+def test_unacknowledged_write_fails_the_run(monkeypatch):
+    fake = FakeHeater()
+    monkeypatch.setattr(bus, "tec_config_exchange", answering(error="Device Not Responsive"))
+    run = ProfileRun(
+        MeerstetterIDs.heater_a, 1, [ProfileStep(type="setpoint", temperature=60)],
+        read=fake.read, write=bus.write_parameter, clock=fake.clock, sleep=fake.sleep,
+    )
+    asyncio.run(run.run())
+    assert run.state == ProfileRunState.error
+    assert "not acknowledged" in run.error
+
+    monkeypatch.setattr(bus, "tec_config_exchange", answering(response=ACK()))
+    asyncio.run(bus.write_parameter(1, "Target Object Temp (Set)", 60.0))
+
+
+def test_read_parameters_raises_on_a_failed_read(monkeypatch):
+    async def exchanges(pkts):
+        pkts[1].error = "No response"
+        return (pkts, 0, [0, 0])
+
+    monkeypatch.setattr(bus, "meerstetter_bus_timed_exchanges", exchanges)
+    with pytest.raises(ValueError, match="Object Temperature"):
+        asyncio.run(bus.read_parameters(1, ["Target Object Temp (Set)", "Object Temperature"]))
+
+
+def test_finished_runs_are_evicted(monkeypatch):
+    runs = {}
+    monkeypatch.setattr(profile_module, "PROFILE_RUNS", runs)
+    steps = [ProfileStep(type=ProfileStepType.hold, duration=1.0)]
+    started = []
+    for n in range(PROFILE_KEEP_FINISHED + 3):
+        run = ProfileRun(MeerstetterIDs.heater_a, 1, steps)
+        run.state = ProfileRunState.running if n == 0 else ProfileRunState.completed
+        register_run(run)
+        started.append(run.run_id)
+    # The oldest finished runs are dropped, the running one is kept whatever its age
+    assert list(runs) == [started[0]] + started[-PROFILE_KEEP_FINISHED:]
+
+
+#####################################################
+# Group Program Tests
+#####################################################
+def test_group_program_skew():
+    fake = FakeHeater()
+    stable = {1: [1, 2, 2], 2: [2, 2, 2], 3: [1, 1, 2], 4: [2, 2, 2]}
+    written = []
+
+    async def exchange(pkts):
+        offsets = []
+        for i, pkt in enumerate(pkts):
+            if pkt.packet_type.name == "SET_PARAMETER":
+                written.append((pkt.address, pkt.value))
+                pkt.query.RESPONSE = ACK()
+            else:
+                pkt.data = stable[pkt.address].pop(0)
+            offsets.append(100 * i)
+        return pkts, 100 * len(pkts), offsets
+
+    group = HeaterGroup(list(MeerstetterIDs), exchange=exchange, clock=fake.clock)
+    run = GroupProfileRun(group, [ProfileStep(type="setpoint", temperature=95, wait_stable=True)],
+                          clock=fake.clock, sleep=fake.sleep)
+    asyncio.run(run.run())
+
+    assert run.state == ProfileRunState.completed
+    assert sorted(written) == [(1, 95), (2, 95), (3, 95), (4, 95)]
+    status = run.status()["group"]
+    assert status["write_skew_us"] == 300
+    # Heater at address 3 is the last to settle, two polls after the others
+    assert status["stable_skew_s"] == pytest.approx(2 * PROFILE_STABLE_POLL)
+
+
+def unresponsive(address):
+    """Group exchange stand-in where the heater at the address does not answer"""
+    async def exchange(pkts):
+        for pkt in pkts:
+            if pkt.address == address:
+                pkt.error = "Module Heater A is not responding"
+            elif pkt.packet_type.name == "SET_PARAMETER":
+                pkt.query.RESPONSE = ACK()
+            else:
+                pkt.data = 2
+        return pkts, 100, [100 * i for i in range(len(pkts))]
+    return exchange
+
+
+def test_group_write_fails_unless_every_heater_acks():
+    group = HeaterGroup(list(MeerstetterIDs), exchange=unresponsive(1))
+    with pytest.raises(GroupError) as e:
+        asyncio.run(group.write(None, "Target Object Temp (Set)", 60.0))
+    assert e.value.errors == {MeerstetterIDs.heater_a: "Module Heater A is not responding"}
+    assert MeerstetterIDs.heater_a not in e.value.ack_us
+    assert len(e.value.ack_us) == len(MeerstetterIDs) - 1
+    assert group.write_skew_us is None  # No skew made up for a heater that did not ACK
+
+
+def test_group_write_checks_range():
+    sent = []
+
+    async def exchange(pkts):
+        sent.extend(pkts)
+        return pkts, 0, [0] * len(pkts)
+
+    group = HeaterGroup(list(MeerstetterIDs), exchange=exchange)
+    with pytest.raises(ValueError) as e:
+        asyncio.run(group.write(None, "Target Object Temp (Set)", 5000.0))
+    assert not isinstance(e.value, GroupError)
+    assert sent == []  # Rejected before anything is sent
+
+
+def test_group_read_fails_on_a_missing_heater():
+    group = HeaterGroup(list(MeerstetterIDs), exchange=unresponsive(1))
+    with pytest.raises(GroupError) as e:
+        asyncio.run(group.read_all("Temperature is Stable"))
+    assert list(e.value.errors) == [MeerstetterIDs.heater_a]
+
+
+def test_group_program_step_fails_on_a_missing_heater():
+    fake = FakeHeater()
+    group = HeaterGroup(list(MeerstetterIDs), exchange=unresponsive(1), clock=fake.clock)
+    run = GroupProfileRun(group, [ProfileStep(type="setpoint", temperature=95)], clock=fake.clock, sleep=fake.sleep)
+    asyncio.run(run.run())
+
+    assert run.state == ProfileRunState.error
+    assert "Heater A" in run.error
@@ -0,0 +1,91 @@
+
+# Version: Test
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from chassis_controller.app.routers import tec_submodule
+from chassis_controller.app.tec import bus
+from chassis_controller.app.tec.wait import *
+
+
+class FakeHeater:
+    """Heater approaching 60 C by 1 C per second on a virtual clock"""
+
+    def __init__(self, start=50.0):
+        self.now = 0.0
+        self.start = start
+
+    def clock(self):
+        return self.now
+
+    async def sleep(self, delay):
+        self.now += delay
+
+    async def read(self, address, parameters):
+        temperature = min(60.0, self.start + self.now)
+        return {
+            "Object Temperature": temperature,
+            "Target Object Temp (Set)": 60.0,
+            "Temperature is Stable": 2 if temperature >= 59.9 else 1,
+        }
+
+
+#####################################################
+# Sampling Interval Tests
+#####################################################
+def test_sample_interval_is_adaptive():
+    assert sample_interval(0) == WAIT_STABLE_MIN_INTERVAL
+    assert sample_interval(-100) == WAIT_STABLE_MAX_INTERVAL
+    assert sample_interval(0.5) < sample_interval(2.0) < sample_interval(4.0)
+
+
+#####################################################
+# Wait Tests
+#####################################################
+def test_wait_stable_reached():
+    fake = FakeHeater()
+    result = asyncio.run(wait_stable(1, 60, tolerance=0.5, read=fake.read, clock=fake.clock, sleep=fake.sleep))
+    assert result["stable"]
+    assert 9.9 <= result["time_to_stable_s"] < 10.5
+    # Far fewer samples than a fixed fast poll over the same time
+    assert result["samples"] < 10.0 / WAIT_STABLE_MIN_INTERVAL / 2
+
+
+def test_wait_stable_timeout():
+    fake = FakeHeater(start=0.0)
+    result = asyncio.run(wait_stable(1, 5, read=fake.read, clock=fake.clock, sleep=fake.sleep))
+    assert not result["stable"]
+    assert result["time_to_stable_s"] is None
+    assert result["waited_s"] == pytest.approx(5.0)
+
+
+async def unanswered(pkts):
+    for pkt in pkts:
+        pkt.error = "No response"
+    return (pkts, 0, [0] * len(pkts))
+
+
+def test_wait_stable_fails_on_a_failed_read(monkeypatch):
+    fake = FakeHeater()
+    monkeypatch.setattr(bus, "meerstetter_bus_timed_exchanges", unanswered)
+    with pytest.raises(ValueError, match="Object Temperature"):
+        asyncio.run(wait_stable(1, 60, clock=fake.clock, sleep=fake.sleep))
+    assert fake.now == 0.0  # Not polled until the timeout
+
+
+def test_wait_stable_route_fails_on_a_failed_read(monkeypatch):
+    monkeypatch.setattr(bus, "meerstetter_bus_timed_exchanges", unanswered)
+    app = FastAPI()
+    app.include_router(tec_submodule.router)
+
+    async def request():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            return await client.post("/tec/wait-stable", params={"heater": "Heater A", "timeout": 60})
+
+    resp = asyncio.run(request())
+    assert resp.status_code == 500
+    assert "No response" in resp.json()["detail"]
+
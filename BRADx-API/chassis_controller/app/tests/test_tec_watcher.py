@@ -0,0 +1,118 @@
+
+# Version: Test
+import asyncio
+
+from chassis_controller.app.config.BRADx_config import MeerstetterIDs
+from chassis_controller.app.tec.watcher import *
+
+HEATERS = [MeerstetterIDs.heater_a, MeerstetterIDs.heater_b]
+
+
+class FakeControllers:
+    """Answers Device Status / Error Number reads from a table of (status, error) by address"""
+
+    def __init__(self, states):
+        self.states = states
+        self.exchanges = 0
+
+    async def exchange(self, pkts):
+        self.exchanges += 1
+        for pkt in pkts:
+            state = self.states.get(pkt.address)
+            if state is None:
+                pkt.error = "Device Not Responsive"
+            else:
+                pkt.data = state[0] if pkt.parameter.name == "Device Status" else state[1]
+        return (pkts, 0, [0] * len(pkts))
+
+
+def watcher(controllers):
+    return TecWatcher(HEATERS, exchange=controllers.exchange)
+
+
+#####################################################
+# Watcher Tests
+#####################################################
+def test_watcher_publishes_transitions():
+    from chassis_controller.app.tec.bus import heater_address
+    a, b = heater_address(HEATERS[0]), heater_address(HEATERS[1])
+    controllers = FakeControllers({a: (2, 0), b: (2, 0)})
+    w = watcher(controllers)
+
+    async def scenario():
+        queue = w.subscribe()
+        await w.sample()
+        await w.sample()  # No change, no event
+        controllers.states[a] = (3, 108)
+        await w.sample()
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    events = asyncio.run(scenario())
+    assert [(e["heater"], e["from"], e["to"]) for e in events] == [
+        ("Heater A", None, "Run"),
+        ("Heater B", None, "Run"),
+        ("Heater A", "Run", "Error"),
+    ]
+    assert events[-1]["error"] == MEERSTETTER_ERRORS[108]
+    assert controllers.exchanges == 3  # All heaters in one exchange per sample
+
+
+def test_watcher_unreachable_heater():
+    controllers = FakeControllers({})
+    w = watcher(controllers)
+    asyncio.run(w.sample())
+    assert w.status()["heaters"]["Heater A"] == {"status": UNREACHABLE, "error_number": -1}
+
+
+def test_watcher_event_log_is_bounded():
+    w = watcher(FakeControllers({}))
+    for n in range(WATCHER_MAX_EVENTS + 10):
+        w._update(HEATERS[0], str(n), 0)
+    assert len(w.events) == WATCHER_MAX_EVENTS
+    assert w.events_since(w.events[-2]["id"]) == [w.events[-1]]
+
+
+def test_watcher_stream_replays_log():
+    w = watcher(FakeControllers({}))
+    w._update(HEATERS[0], "Run", 0)
+    w._update(HEATERS[0], "Error", 3)
+
+    async def first_event():
+        stream = w.stream(since=1)
+        event = await stream.__anext__()
+        await stream.aclose()
+        return event
+
+    event = asyncio.run(first_event())
+    assert event.startswith("id: 2\nevent: tec-status\n")
+    assert w.status()["subscribers"] == 0
+
+
+def test_watcher_listeners_share_the_exchange():
+    from chassis_controller.app.tec.bus import heater_address
+    controllers = FakeControllers({heater_address(h): (2, 0) for h in HEATERS})
+    w = watcher(controllers)
+    received = []
+    w.add_listener(["Object Temperature"], lambda heater, values, t: received.append((heater, sorted(values))))
+    asyncio.run(w.sample())
+    assert controllers.exchanges == 1
+    assert received == [(h, ["Device Status", "Error Number", "Object Temperature"]) for h in HEATERS]
+
+
+def test_watcher_drops_cached_configuration_on_fault():
+    from chassis_controller.app.tec.bus import heater_address
+    from chassis_controller.app.tec.config_cache import TEC_CONFIG_CACHE
+    a, b = heater_address(HEATERS[0]), heater_address(HEATERS[1])
+    w = watcher(FakeControllers({}))
+    TEC_CONFIG_CACHE.put(a, "Kp", 1.0)
+    TEC_CONFIG_CACHE.put(b, "Kp", 2.0)
+    w._update(HEATERS[0], "Run", 0)
+    w._update(HEATERS[1], "Run", 0)
+    assert TEC_CONFIG_CACHE.get(a, "Kp") == 1.0
+    w._update(HEATERS[0], "Error", 108)
+    assert TEC_CONFIG_CACHE.get(a, "Kp") is None
+    assert TEC_CONFIG_CACHE.get(b, "Kp") == 2.0
+    w._update(HEATERS[1], "Ready", 0)  # Same error number, not a fault
+    assert TEC_CONFIG_CACHE.get(b, "Kp") == 2.0
+    w._update(HEATERS[1], "Init", 0)
+    assert TEC_CONFIG_CACHE.get(b, "Kp") is None
@@ -144,6 +144,15 @@ def test_pipettor_request_too_many_params():
     with pytest.raises(ValueError):
         PipettorRequest.parse("10 03 2D 14 52 A6 D3\r")
 
+def test_pipettor_request_bad_checksum():
+    with pytest.raises(ValueError):
+        PipettorRequest.parse("10 03 2D 0 0 0\r")
+
+def test_pipettor_request_round_trip():
+    req = PipettorRequest(0x10, 0x01, 0x13, 0xF12C)
+    assert req.raw_packet == b"10 01 13 2C F1 41\r"
+    assert PipettorRequest.parse(req.raw).data == 0xF12C
+
 
 #####################################################
 # Response Tests -  Pipettor
@@ -156,6 +165,12 @@ def test_pipettor_response_is_valid():
     assert resp.data_lsb     == 0x82
     assert resp.data_msb     == 0xA8
     assert resp.checksum     == 0xB5
+    assert resp.data         == 0xA882
+
+def test_pipettor_response_checksum():
+    assert PipettorResponse.parse(b"10 01 82 A8 3B\r", checksum=True).data == 0xA882
+    with pytest.raises(ValueError):
+        PipettorResponse.parse("10 01 82 A8 B5\r", checksum=True)
 
 def test_pipettor_response_not_enough_params():
     with pytest.raises(ValueError):
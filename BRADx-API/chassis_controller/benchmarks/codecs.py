@@ -0,0 +1,77 @@
+
+# Version: Test
+"""
+Microbenchmarks of the bus codecs: CRCs, BRADx bus packets and messages, pipettor and
+Meerstetter packets.
+
+    python -m chassis_controller.benchmarks.codecs [--compare results/codecs-<label>.json]
+"""
+from struct import pack
+
+from chassis_controller.app.config.BRADx_config import READER_SUBSYSTEM_ID, READER_X_AXIS
+from chassis_controller.app.routers.interfaces.utils import (
+    BUS_PACKET_START,
+    BRADXRequest,
+    BRADXResponse,
+    BRADxBusPacket,
+    BRADxBusPacketType,
+    PipettorRequest,
+    PipettorResponse,
+    crc16_ccitt,
+)
+from chassis_controller.app.routers.interfaces.utils_meerstetter import (
+    MeerstetterBusPacket,
+    MeerstetterBusPacketType,
+    crc16_ccitt_xmodem,
+)
+from chassis_controller.benchmarks import runner
+
+BRADX_REQUEST = BRADXRequest(0x01, 0x1234, "mabs", ["1000", "50"])
+BRADX_RESPONSE_MESSAGE = "<1,1234,1000,50,ab12\r"
+
+
+def bradx_response_frame(data: str) -> bytes:
+    """Full size (256 byte) response frame as sent by the chassis controller"""
+    body = bytes([READER_SUBSYSTEM_ID, READER_X_AXIS, BRADxBusPacketType.RESPONSE.value, len(data), len(data)]) + data.encode("ascii")
+    body = body.ljust(252, b"\0")
+    return BUS_PACKET_START.encode() + body + crc16_ccitt(body).to_bytes(2, "little") + b"\r"
+
+
+def mecom_response(request: bytes, value: float) -> bytes:
+    frame = b"!" + request[1:7] + pack("!f", value).hex().upper().encode()
+    return frame + f"{crc16_ccitt_xmodem(frame):04X}\r".encode()
+
+
+BRADX_FRAME = bradx_response_frame("<1,1234,1000\r")
+BRADX_FRAME_BODY = BRADX_FRAME[1:-3]
+MECOM_GET = MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=1, sequence=0x1234, parameter="Object Temperature")
+MECOM_RESPONSE = mecom_response(MECOM_GET.raw_packet, 37.5)
+PIPETTOR_REQUEST = PipettorRequest(0x30, 0x01, 0x20, 20000).raw
+PIPETTOR_RESPONSE = b"30 00 20 4E 9E\r"
+
+
+def mecom_get_parse():
+    pkt = MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=1, sequence=0x1234, parameter="Object Temperature")
+    pkt.parse(MECOM_RESPONSE)
+    return pkt
+
+
+CASES = {
+    "crc16_ccitt[252B]": lambda: crc16_ccitt(BRADX_FRAME_BODY),
+    "crc16_ccitt_xmodem[19B]": lambda: crc16_ccitt_xmodem(MECOM_RESPONSE[:-5]),
+    "bradx_packet_build": lambda: BRADxBusPacket(READER_SUBSYSTEM_ID, READER_X_AXIS, BRADX_REQUEST.raw, 25, BRADxBusPacketType.REQUEST),
+    "bradx_packet_parse": lambda: BRADxBusPacket.parse(BRADX_FRAME),
+    "bradx_request_build": lambda: BRADXRequest(0x01, 0x1234, "mabs", ["1000", "50"]),
+    "bradx_request_parse": lambda: BRADXRequest.parse(BRADX_REQUEST.raw),
+    "bradx_response_parse": lambda: BRADXResponse.parse(BRADX_RESPONSE_MESSAGE),
+    "pipettor_request_build": lambda: PipettorRequest(0x30, 0x01, 0x20, 20000),
+    "pipettor_request_parse": lambda: PipettorRequest.parse(PIPETTOR_REQUEST),
+    "pipettor_response_parse": lambda: PipettorResponse.parse(PIPETTOR_RESPONSE, checksum=True),
+    "meerstetter_get_compose": lambda: MeerstetterBusPacket(MeerstetterBusPacketType.GET_PARAMETER, address=1, sequence=0x1234, parameter="Object Temperature"),
+    "meerstetter_set_compose": lambda: MeerstetterBusPacket(MeerstetterBusPacketType.SET_PARAMETER, address=1, sequence=0x1234, parameter="Target Object Temp (Set)", value=60.0),
+    "meerstetter_get_compose_parse": mecom_get_parse,
+}
+
+
+if __name__ == "__main__":
+    runner.main("codecs", CASES, __doc__.strip().splitlines()[0])
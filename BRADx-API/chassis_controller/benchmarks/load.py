@@ -0,0 +1,237 @@
+
+# Version: Test
+"""
+End-to-end HTTP load test of the API against the emulated devices.
+
+Starts the BRADx and MeCom emulators (see chassis_controller/emulators, optionally with a
+fault scenario) and the API under uvicorn pointed at them, then drives it with closed-loop
+httpx workers sending a weighted mix of requests (MIXES) for `duration` seconds at each
+concurrency. The report holds the throughput, error rate and p50/p95/p99/p999 latencies
+of every endpoint at every concurrency step, to find the saturation point of a build:
+
+    python -m chassis_controller.benchmarks.load --mix mixed --concurrency 1 2 4 8 16 --duration 20
+
+With --url the load is sent to an already running server instead.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, NamedTuple, Optional
+
+import httpx
+
+from chassis_controller.app.routers.interfaces.utils import BRADXRequest
+from chassis_controller.benchmarks import runner
+
+
+class Endpoint(NamedTuple):
+    name: str
+    method: str
+    path: str
+    params: dict = {}
+    weight: float = 1.0
+
+
+TEC_POLLING = [
+    Endpoint(f"tec_temperature_{heater[-1]}", "GET", "/tec/param/Object Temperature", {"heater": heater}, 2.0)
+    for heater in ("Heater A", "Heater B", "Heater C", "Heater D")
+] + [
+    Endpoint("tec_stable", "GET", "/tec/param/Temperature is Stable", {"heater": "Heater A"}),
+    Endpoint("tec_watcher", "GET", "/tec/watcher"),
+]
+READER_MOVES = [
+    Endpoint("reader_move", "POST", "/reader/axis/move/1", {"position": 1000, "velocity": 50}),
+    Endpoint("reader_position", "GET", "/reader/axis/position/1", {}, 2.0),
+]
+LED_TOGGLES = [
+    Endpoint("led_on", "POST", "/led/on/", {"channel": "2", "intensity": 50}),
+    Endpoint("led_off", "POST", "/led/off/", {"channel": "2"}),
+    Endpoint("led_status", "GET", "/led/status/", {"channel": "2"}),
+]
+CHASSIS_RAW = [
+    Endpoint("chassis_raw", "GET", "/chassis/raw", {"subsystem_id": 3, "module_id": 1, "message": BRADXRequest(0x01, 0x1234, "?pos", []).raw.strip()}),
+]
+
+MIXES: Dict[str, List[Endpoint]] = {
+    "dashboard": TEC_POLLING,
+    "reader": READER_MOVES,
+    "led": LED_TOGGLES,
+    "raw": CHASSIS_RAW,
+    "mixed": TEC_POLLING + READER_MOVES + LED_TOGGLES + CHASSIS_RAW,
+}
+
+PERCENTILES = {"p50_ms": 50, "p95_ms": 95, "p99_ms": 99, "p999_ms": 99.9}
+
+
+class Sample(NamedTuple):
+    endpoint: str
+    latency: float  # s
+    ok: bool
+
+
+def percentile(latencies: List[float], q: float) -> Optional[float]:
+    """Nearest rank percentile of sorted latencies"""
+    if not latencies:
+        return None
+    return latencies[min(len(latencies) - 1, max(0, int(len(latencies) * q / 100 + 0.5) - 1))]
+
+
+def summarize(samples: List[Sample], duration: float) -> dict:
+    latencies = sorted(s.latency for s in samples)
+    errors = sum(not s.ok for s in samples)
+    summary = {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput_rps": len(samples) / duration,
+    }
+    for name, q in PERCENTILES.items():
+        value = percentile(latencies, q)
+        summary[name] = value * 1e3 if value is not None else None
+    summary["max_ms"] = latencies[-1] * 1e3 if latencies else None
+    return summary
+
+
+async def worker(client: httpx.AsyncClient, mix: List[Endpoint], deadline: float, rng: random.Random, samples: List[Sample]) -> None:
+    weights = [endpoint.weight for endpoint in mix]
+    while time.perf_counter() < deadline:
+        endpoint = rng.choices(mix, weights)[0]
+        begin = time.perf_counter()
+        try:
+            resp = await client.request(endpoint.method, endpoint.path, params=endpoint.params)
+            ok = resp.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        samples.append(Sample(endpoint.name, time.perf_counter() - begin, ok))
+
+
+async def run_step(client: httpx.AsyncClient, mix: List[Endpoint], concurrency: int, duration: float, seed: int = 0) -> dict:
+    """Load the API with `concurrency` workers for `duration` seconds, returns the step's report"""
+    samples: List[Sample] = []
+    begin = time.perf_counter()
+    deadline = begin + duration
+    await asyncio.gather(*(worker(client, mix, deadline, random.Random(seed + n), samples) for n in range(concurrency)))
+    elapsed = time.perf_counter() - begin
+    by_endpoint: Dict[str, List[Sample]] = {}
+    for sample in samples:
+        by_endpoint.setdefault(sample.endpoint, []).append(sample)
+    return {
+        "concurrency": concurrency,
+        "duration_s": elapsed,
+        **summarize(samples, elapsed),
+        "endpoints": {name: summarize(s, elapsed) for name, s in sorted(by_endpoint.items())},
+    }
+
+
+async def run_load(base_url: str, mix: List[Endpoint], concurrencies: List[int], duration: float, seed: int = 0, transport=None) -> List[dict]:
+    limits = httpx.Limits(max_connections=max(concurrencies), max_keepalive_connections=max(concurrencies))
+    async with httpx.AsyncClient(base_url=base_url, timeout=60.0, limits=limits, transport=transport) as client:
+        steps = []
+        for concurrency in concurrencies:
+            step = await run_step(client, mix, concurrency, duration, seed)
+            print(
+                f"concurrency {concurrency:3d}: {step['throughput_rps']:8.1f} req/s  p50 {step['p50_ms']:7.1f} ms  "
+                f"p99 {step['p99_ms']:7.1f} ms  errors {step['error_rate']:.1%}",
+                file=sys.stderr,
+            )
+            steps.append(step)
+        return steps
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_server(url: str, server: subprocess.Popen, timeout: float = 30.0, interval: float = 0.1) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"API server exited with status {server.returncode}")
+        try:
+            httpx.get(url + "/", timeout=1.0)
+            return
+        except httpx.HTTPError:
+            time.sleep(interval)
+    raise RuntimeError(f"API server did not start within {timeout} s")
+
+
+@contextmanager
+def emulated_server(device_latency: float = 0.001, scenario: Optional[List[str]] = None, workers: int = 1, profile: Optional[str] = None):
+    """
+    Emulators and the API server (uvicorn subprocess) pointed at them, yields the server's URL.
+    With a profile the server is started like in the field (util/server.py), its console output discarded.
+    """
+    from chassis_controller.emulators.bradx import BRADxEmulator
+    from chassis_controller.emulators.faults import load_scenario
+    from chassis_controller.emulators.mecom import MeComEmulator
+
+    with BRADxEmulator(default_latency=device_latency) as bradx, MeComEmulator(default_latency=device_latency) as mecom:
+        if scenario:
+            bradx.faults = load_scenario(*scenario)
+            mecom.faults = load_scenario(*scenario)
+        port = free_port()
+        env = {**os.environ, "BRADX_PORT": bradx.port, "MEERSTETTER_PORT": mecom.port}
+        if profile:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "chassis_controller.util.server", "--profile", profile, "--port", str(port)],
+                env=env,
+                stdout=subprocess.DEVNULL,
+            )
+        else:
+            server = subprocess.Popen(
+                [sys.executable, "-m", "uvicorn", "chassis_controller.app.main:app", "--port", str(port), "--log-level", "warning", "--workers", str(workers)],
+                env=env,
+            )
+        url = f"http://127.0.0.1:{port}"
+        try:
+            wait_for_server(url, server)
+            yield url
+        finally:
+            server.terminate()
+            server.wait()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--mix", choices=sorted(MIXES), default="mixed", help="request mix")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8], help="concurrent clients of each step")
+    parser.add_argument("--duration", type=float, default=10.0, help="duration of each step (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--url", help="load an already running server instead of starting one")
+    parser.add_argument("--device-latency", type=float, default=0.001, help="response latency of the emulated devices (s)")
+    parser.add_argument("--scenario", nargs=2, metavar=("FILE", "NAME"), help="fault scenario applied to the emulated devices")
+    parser.add_argument("--profile", help="start the server with this profile of util/server.py (default: plain uvicorn)")
+    parser.add_argument("--label", help="name the report is saved under (default: mix, version and git revision)")
+    parser.add_argument("--no-save", action="store_true", help="print the report instead of saving it")
+    args = parser.parse_args()
+
+    mix = MIXES[args.mix]
+    if args.url:
+        steps = asyncio.run(run_load(args.url, mix, args.concurrency, args.duration, args.seed))
+    else:
+        with emulated_server(args.device_latency, args.scenario, profile=args.profile) as url:
+            steps = asyncio.run(run_load(url, mix, args.concurrency, args.duration, args.seed))
+    env = runner.environment()
+    report = {"suite": "load", "mix": args.mix, "scenario": args.scenario, "profile": args.profile, "environment": env, "steps": steps}
+    if args.no_save:
+        print(json.dumps(report, indent=2))
+        return
+    label = args.label or "-".join(filter(None, [args.mix, env["version"], env["revision"]]))
+    os.makedirs(runner.RESULTS_DIR, exist_ok=True)
+    path = os.path.join(runner.RESULTS_DIR, f"load-{label}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
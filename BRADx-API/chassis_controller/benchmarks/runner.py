@@ -0,0 +1,118 @@
+
+# Version: Test
+"""
+Benchmark runner shared by the suites of this package.
+
+A suite is a dict of case name -> zero-argument callable. Every case is timed with timeit
+(calls per run chosen so that a run lasts at least `min_time`, best and median of `repeat`
+runs). Results are saved as JSON in benchmarks/results/<suite>-<label>.json, with the
+environment they were measured in, and can be compared with the results of an earlier
+release: a case slower than the baseline by more than the threshold is a regression and
+makes the command exit with status 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import timeit
+from typing import Callable, Dict, List, Optional
+
+from chassis_controller.app.config.BRADx_config import FASTAPI_VERSION
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+REGRESSION_THRESHOLD = 0.10  # Relative slowdown of the best time
+
+
+def measure(func: Callable[[], object], repeat: int = 5, min_time: float = 0.2) -> dict:
+    """Time one case, times are per call in nanoseconds"""
+    timer = timeit.Timer(func)
+    number = 1
+    while True:
+        elapsed = timer.timeit(number)
+        if elapsed >= min_time:
+            break
+        number = max(number * 2, int(number * min_time / elapsed * 1.2)) if elapsed > 0 else number * 10
+    runs = [t / number * 1e9 for t in timer.repeat(repeat, number)]
+    return {
+        "number": number,
+        "repeat": repeat,
+        "best_ns": min(runs),
+        "median_ns": statistics.median(runs),
+        "ops_per_s": 1e9 / min(runs),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment() -> dict:
+    return {
+        "version": FASTAPI_VERSION,
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def run_suite(cases: Dict[str, Callable[[], object]], repeat: int = 5, min_time: float = 0.2, only: Optional[List[str]] = None) -> Dict[str, dict]:
+    return {name: measure(func, repeat, min_time) for name, func in cases.items() if not only or name in only}
+
+
+def compare(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float = REGRESSION_THRESHOLD) -> List[str]:
+    """Print the change of every case against the baseline, returns the regressed cases"""
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            print(f"{name:40s} {result['best_ns']:12.0f} ns  (new)")
+            continue
+        change = result["best_ns"] / baseline[name]["best_ns"] - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:40s} {result['best_ns']:12.0f} ns  {change:+7.1%}{flag}")
+    return regressions
+
+
+def main(suite: str, cases: Dict[str, Callable[[], object]], description: str) -> None:
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--label", help="name the results are saved under (default: version and git revision)")
+    parser.add_argument("--no-save", action="store_true", help="do not save the results")
+    parser.add_argument("--compare", metavar="FILE", help="results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD, help="relative slowdown counted as a regression")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum duration of a run (s)")
+    parser.add_argument("cases", nargs="*", help="cases to run (default: all)")
+    args = parser.parse_args()
+
+    env = environment()
+    results = run_suite(cases, args.repeat, args.min_time, args.cases)
+    report = {"suite": suite, "environment": env, "results": results}
+    if not args.compare:
+        for name, result in results.items():
+            print(f"{name:40s} {result['best_ns']:12.0f} ns  {result['ops_per_s']:14.0f} ops/s")
+    if not args.no_save:
+        label = args.label or "-".join(filter(None, [env["version"], env["revision"]]))
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        path = os.path.join(RESULTS_DIR, f"{suite}-{label}.json")
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {path}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if compare(results, baseline["results"], args.threshold):
+            sys.exit(1)
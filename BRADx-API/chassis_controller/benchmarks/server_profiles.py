@@ -0,0 +1,69 @@
+
+# Version: Test
+"""
+Before/after HTTP benchmark of the server profiles (see util/server.py).
+
+Runs the same load (benchmarks/load.py: request mix, concurrency steps and duration against
+the emulated devices) on the API started with every profile in turn, and prints the
+throughput and p99 latency of each step relative to the first profile (dev):
+
+    python -m chassis_controller.benchmarks.server_profiles --mix dashboard --concurrency 1 4 16 --duration 10
+"""
+import argparse
+import asyncio
+import json
+import os
+from typing import Dict, List
+
+from chassis_controller.benchmarks import runner
+from chassis_controller.benchmarks.load import MIXES, emulated_server, run_load
+from chassis_controller.util.server import SERVER_PROFILES
+
+
+def compare_profiles(reports: Dict[str, List[dict]]) -> None:
+    """Print every step of every profile against the same step of the first profile"""
+    baseline_name, baseline = next(iter(reports.items()))
+    print(f"{'profile':12s} {'clients':>7s} {'req/s':>9s} {'change':>8s} {'p99 ms':>9s} {'change':>8s} {'errors':>7s}")
+    for name, steps in reports.items():
+        for step, base in zip(steps, baseline):
+            throughput = step["throughput_rps"] / base["throughput_rps"] - 1 if base["throughput_rps"] else float("nan")
+            p99 = step["p99_ms"] / base["p99_ms"] - 1 if base["p99_ms"] else float("nan")
+            change = "" if name == baseline_name else f"{throughput:+8.1%}"
+            p99_change = "" if name == baseline_name else f"{p99:+8.1%}"
+            print(
+                f"{name:12s} {step['concurrency']:7d} {step['throughput_rps']:9.1f} {change:>8s} "
+                f"{step['p99_ms']:9.2f} {p99_change:>8s} {step['error_rate']:7.1%}"
+            )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profiles", nargs="+", choices=sorted(SERVER_PROFILES), default=["dev", "production"], help="first one is the baseline")
+    parser.add_argument("--mix", choices=sorted(MIXES), default="dashboard", help="request mix")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="concurrent clients of each step")
+    parser.add_argument("--duration", type=float, default=10.0, help="duration of each step (s)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--device-latency", type=float, default=0.001, help="response latency of the emulated devices (s)")
+    parser.add_argument("--label", help="name the report is saved under (default: mix, version and git revision)")
+    parser.add_argument("--no-save", action="store_true", help="do not save the report")
+    args = parser.parse_args()
+
+    reports = {}
+    for profile in args.profiles:
+        with emulated_server(args.device_latency, profile=profile) as url:
+            reports[profile] = asyncio.run(run_load(url, MIXES[args.mix], args.concurrency, args.duration, args.seed))
+    compare_profiles(reports)
+    if args.no_save:
+        return
+    env = runner.environment()
+    report = {"suite": "server", "mix": args.mix, "settings": {p: SERVER_PROFILES[p] for p in args.profiles}, "environment": env, "profiles": reports}
+    label = args.label or "-".join(filter(None, [args.mix, env["version"], env["revision"]]))
+    os.makedirs(runner.RESULTS_DIR, exist_ok=True)
+    path = os.path.join(runner.RESULTS_DIR, f"server-{label}.json")
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Saved {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+
+# Version: Test
+"""
+Startup time of the API server.
+
+Every measurement runs in a fresh interpreter, `repeat` times (best and median kept):
+import_main is the wall time of importing the application (chassis_controller.app.main),
+first_request the time from launching uvicorn to the first answered request. The report
+also holds the `-X importtime` profile of the import: the modules with the largest
+cumulative and self import times, to find what to defer. Results are saved and compared
+like the other suites:
+
+    python -m chassis_controller.benchmarks.startup [--compare results/startup-<label>.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, NamedTuple
+
+from chassis_controller.benchmarks import runner
+from chassis_controller.benchmarks.load import free_port, wait_for_server
+
+APP_MODULE = "chassis_controller.app.main"
+TOP_LEVEL_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class ImportTime(NamedTuple):
+    module: str
+    depth: int  # Nesting of the import, 0 for the modules imported by the measured statement
+    self_us: int
+    cumulative_us: int
+
+
+def parse_importtime(output: str) -> List[ImportTime]:
+    """Entries of the -X importtime report (stderr), in the order they were printed"""
+    entries = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "imported package" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        stripped = name.lstrip()
+        entries.append(ImportTime(stripped.rstrip(), (len(name) - len(stripped) - 1) // 2, int(self_us), int(cumulative_us)))
+    return entries
+
+
+def import_profile(module: str = APP_MODULE) -> List[ImportTime]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"], capture_output=True, text=True, check=True, cwd=TOP_LEVEL_DIR
+    )
+    return parse_importtime(proc.stderr)
+
+
+def app_imports(profile: List[ImportTime], module: str = APP_MODULE) -> List[ImportTime]:
+    """The module's entry and the entries of the modules it imported, without the interpreter's own startup (site etc.)"""
+    end = next(i for i, entry in enumerate(profile) if entry.depth == 0 and entry.module == module)
+    begin = end
+    while begin > 0 and profile[begin - 1].depth > 0:
+        begin -= 1  # The report is in post-order, the module's imports are listed right before it
+    return profile[begin:end + 1]
+
+
+def summarize_profile(profile: List[ImportTime], top: int = 15) -> dict:
+    imports = app_imports(profile)
+    by_cumulative = sorted((entry for entry in imports if entry.depth == 1), key=lambda entry: -entry.cumulative_us)
+    by_self = sorted(imports, key=lambda entry: -entry.self_us)
+    return {
+        "total_us": imports[-1].cumulative_us,
+        "modules": len(imports),
+        "top_cumulative": [entry._asdict() for entry in by_cumulative[:top]],
+        "top_self": [entry._asdict() for entry in by_self[:top]],
+    }
+
+
+def time_import(module: str = APP_MODULE) -> float:
+    """Wall time (ns) of importing the module in a fresh interpreter"""
+    code = f"import time; t = time.perf_counter_ns(); import {module}; print(time.perf_counter_ns() - t)"
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True, cwd=TOP_LEVEL_DIR)
+    return float(proc.stdout.strip().splitlines()[-1])
+
+
+def time_first_request(timeout: float = 30.0) -> float:
+    """Time (ns) from launching the API server to its first answered request"""
+    port = free_port()
+    begin = time.perf_counter_ns()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", f"{APP_MODULE}:app", "--port", str(port), "--log-level", "warning"], cwd=TOP_LEVEL_DIR
+    )
+    try:
+        wait_for_server(f"http://127.0.0.1:{port}", server, timeout, interval=0.005)
+        return float(time.perf_counter_ns() - begin)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def stats(runs: List[float]) -> dict:
+    return {"repeat": len(runs), "best_ns": min(runs), "median_ns": statistics.median(runs), "runs_ns": runs}
+
+
+def run_startup(repeat: int = 5) -> Dict[str, dict]:
+    return {
+        "import_main": stats([time_import() for _ in range(repeat)]),
+        "first_request": stats([time_first_request() for _ in range(repeat)]),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--label", help="name the results are saved under (default: version and git revision)")
+    parser.add_argument("--no-save", action="store_true", help="do not save the results")
+    parser.add_argument("--compare", metavar="FILE", help="results of an earlier run to compare with")
+    parser.add_argument("--threshold", type=float, default=runner.REGRESSION_THRESHOLD, help="relative slowdown counted as a regression")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15, help="modules listed in the import profile")
+    args = parser.parse_args()
+
+    env = runner.environment()
+    profile = summarize_profile(import_profile(), args.top)
+    results = run_startup(args.repeat)
+    report = {"suite": "startup", "environment": env, "results": results, "import_profile": profile}
+    print(f"{'imports (-X importtime)':50s} {profile['total_us'] / 1e3:9.1f} ms  ({profile['modules']} modules)")
+    for entry in profile["top_cumulative"]:
+        print(f"  {entry['module']:48s} {entry['cumulative_us'] / 1e3:9.1f} ms")
+    if not args.compare:
+        for name, result in results.items():
+            print(f"{name:50s} {result['best_ns'] / 1e6:9.1f} ms  (median {result['median_ns'] / 1e6:.1f} ms)")
+    if not args.no_save:
+        label = args.label or "-".join(filter(None, [env["version"], env["revision"]]))
+        os.makedirs(runner.RESULTS_DIR, exist_ok=True)
+        path = os.path.join(runner.RESULTS_DIR, f"startup-{label}.json")
+        with open(path, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved {path}")
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if runner.compare(results, baseline["results"], args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+
+# Version: Test
+"""
+BRADx chassis/bus controller emulator.
+
+Speaks the BRADxBusPacket framing (responses are full 256 byte frames, CRC over everything
+between the start flag and the CRC) and answers the commands the routers send, keeping
+the state of every module: versions, axis positions (mabs, mrel, home), LED intensities
+(set, off, ?led), power relays, GPIO and the power monitor. Module responses are
+"<address,request id,fields" without a CRC field of their own.
+
+Run it with `python -m chassis_controller.emulators.bradx` and start the API with
+BRADX_PORT set to the printed port.
+"""
+import argparse
+from typing import Dict, Optional, Tuple
+
+from chassis_controller.app.config.BRADx_config import CHASSIS_SUBSYSTEM_ID
+from chassis_controller.app.routers.chassis_submodule import CHASSIS_GPIO, CHASSIS_VER, POWER_MONITORS, POWER_RELAYS
+from chassis_controller.app.routers.interfaces.utils import BUS_PACKET_START, BRADXRequest, BRADxBusPacketType, crc16_ccitt
+from chassis_controller.emulators.serial_pty import PtyDevice, parse_latency, serve_forever
+
+BRADX_FRAME_SIZE = 256
+BRADX_HEADER_SIZE = 6  # Start flag, subsystem, module, type, data length, response length
+
+
+def response_frame(subsystem_id: int, module_id: int, data: str) -> bytes:
+    """Full size response frame, padded with zeros up to the CRC"""
+    body = bytes([subsystem_id, module_id, BRADxBusPacketType.RESPONSE.value, len(data), len(data)]) + data.encode("ascii")
+    body = body.ljust(BRADX_FRAME_SIZE - 4, b"\0")
+    return BUS_PACKET_START.encode() + body + crc16_ccitt(body).to_bytes(2, "little") + b"\r"
+
+
+class BRADxModule:
+    """State of one emulated module"""
+
+    def __init__(self) -> None:
+        self.position = 0
+        self.velocity = 0
+        self.homed = False
+        self.leds: Dict[str, int] = {}
+        self.relay = False
+
+
+class BRADxEmulator(PtyDevice):
+    """Emulated chassis controller with every module behind it, see the module docstring"""
+
+    name = "BRADx"
+
+    def __init__(
+        self,
+        latency: Optional[Dict[str, float]] = None,
+        default_latency: float = 0.0,
+        chassis_version: str = "200",
+        module_version: str = "100",
+    ) -> None:
+        super().__init__(latency, default_latency)
+        self.chassis_version = chassis_version
+        self.module_version = module_version
+        self.modules: Dict[Tuple[int, int], BRADxModule] = {}
+        self.relays: Dict[int, bool] = {}
+        self.gpio: Dict[int, bool] = {}
+        self.power = {0: (36.0, 1.2)}  # Power supply id -> (voltage, current)
+        self.crc_errors = 0
+
+    def module(self, subsystem_id: int, module_id: int) -> BRADxModule:
+        key = (subsystem_id, module_id)
+        if key not in self.modules:
+            self.modules[key] = BRADxModule()
+        return self.modules[key]
+
+    def split_frame(self, buffer: bytes) -> Tuple[Optional[bytes], bytes]:
+        start = buffer.find(BUS_PACKET_START.encode())
+        if start < 0:
+            return (None, b"")
+        buffer = buffer[start:]
+        if len(buffer) < BRADX_HEADER_SIZE:
+            return (None, buffer)
+        size = BRADX_HEADER_SIZE + buffer[4] + 3  # Data, CRC and carriage return
+        if len(buffer) < size:
+            return (None, buffer)
+        return (buffer[:size], buffer[size:])
+
+    def command(self, frame: bytes) -> str:
+        data = frame[BRADX_HEADER_SIZE:-3].decode("ascii", "replace")
+        if data.startswith(">"):
+            fields = data.split(",")
+            return fields[2] if len(fields) > 2 else ""
+        return {POWER_MONITORS: "N?", POWER_RELAYS: "relay", CHASSIS_GPIO: "gpio"}.get(frame[2], "")
+
+    def module_name(self, frame: bytes) -> str:
+        return f"{frame[1]}/{frame[2]}"
+
+    def handle(self, frame: bytes) -> Optional[bytes]:
+        subsystem_id, module_id = frame[1], frame[2]
+        if crc16_ccitt(frame[1:-3]) != int.from_bytes(frame[-3:-1], "big"):
+            self.crc_errors += 1
+            return None  # Corrupted requests are dropped, the API times out
+        data = frame[BRADX_HEADER_SIZE:-3].decode("ascii", "replace")
+        if subsystem_id == CHASSIS_SUBSYSTEM_ID and module_id in (POWER_MONITORS, POWER_RELAYS, CHASSIS_GPIO):
+            resp = self.chassis_request(module_id, data)
+        else:
+            resp = self.module_request(subsystem_id, module_id, data)
+        return response_frame(subsystem_id, module_id, resp)
+
+    def chassis_request(self, module_id: int, data: str) -> str:
+        """Power monitor ("N?"), relay and GPIO ("<channel hex><state>") requests"""
+        if module_id == POWER_MONITORS:
+            supply = int(data.rstrip("?") or 0)
+            voltage, current = self.power.get(supply, (0.0, 0.0))
+            return f"{supply},{voltage:.2f},{current:.2f}"
+        states = self.relays if module_id == POWER_RELAYS else self.gpio
+        states[int(data[:-1], 16)] = data[-1] == "1"
+        return ""
+
+    def module_request(self, subsystem_id: int, module_id: int, data: str) -> str:
+        try:
+            req = BRADXRequest.parse(data)
+        except ValueError:
+            return "err"
+        state = self.module(subsystem_id, module_id)
+        params = req.parameters
+        if req.command == "?ver":
+            if subsystem_id == CHASSIS_SUBSYSTEM_ID and module_id == CHASSIS_VER:
+                return self.chassis_version  # The chassis answers with the bare version
+            fields = self.module_version
+        elif req.command == "?pos":
+            fields = str(state.position)
+        elif req.command == "mabs":
+            state.position, state.velocity = int(params[0]), int(params[1])
+            fields = str(state.position)
+        elif req.command == "mrel":
+            state.position += int(params[0])
+            state.velocity = int(params[1])
+            fields = str(state.position)
+        elif req.command == "home":
+            state.position, state.homed = 0, True
+            fields = "0"
+        elif req.command == "set":
+            state.leds[params[0]] = int(params[1])
+            fields = f"{params[0]},{params[1]}"
+        elif req.command == "off":
+            state.leds[params[0]] = 0
+            fields = f"{params[0]},0"
+        elif req.command == "?led":
+            fields = f"{params[0]},{state.leds.get(params[0], 0)}"
+        elif req.command in ("relayon", "relayoff"):
+            state.relay = req.command == "relayon"
+            fields = "1" if state.relay else "0"
+        elif req.command == "?temp":
+            fields = "250"
+        elif req.command == "?coils":
+            fields = "0"
+        elif req.command == "rprog":
+            fields = "ok"
+        else:
+            fields = "err"
+        return f"<{req.address:x},{req.request_id:04x},{fields}\r"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", nargs="*", metavar="COMMAND=SECONDS", help="response latency by command (e.g. ?pos=0.002)")
+    parser.add_argument("--default-latency", type=float, default=0.001, help="response latency of the other commands (s)")
+    args = parser.parse_args()
+    serve_forever(BRADxEmulator(parse_latency(args.latency), args.default_latency), "BRADX_PORT")
+
+
+if __name__ == "__main__":
+    main()
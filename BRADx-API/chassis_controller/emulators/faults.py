@@ -0,0 +1,174 @@
+
+# Version: Test
+"""
+Fault and latency injection for the emulated devices.
+
+A FaultProfile is applied to every response of a PtyDevice (set as its `faults`): the
+response is delayed by a jitter drawn from a distribution, dropped (the API times out),
+corrupted (one byte flipped, the CRC/checksum check fails) or truncated (one byte lost)
+at the configured rates, and modules can be stalled (extra delay, or no response at all)
+on every or every n-th request. Modules are named like their circuit breakers: "2/1"
+(subsystem/module) on the BRADx bus and the address ("1") on the Meerstetter and
+pipettor buses.
+
+Scenarios are kept in a JSON file mapping scenario names to profiles, e.g.
+
+    {
+        "slow_tec": {
+            "jitter": {"distribution": "lognormal", "median": 0.004, "sigma": 0.8},
+            "drop_rate": 0.01,
+            "corrupt_rate": 0.01,
+            "stalls": {"2": {"delay": null}, "3": {"delay": 0.2, "every": 10}}
+        }
+    }
+
+where a null stall delay means the module never answers. Run a device with a scenario
+with `python -m chassis_controller.emulators.faults mecom scenarios.json slow_tec`.
+"""
+import argparse
+import json
+import random
+from typing import Dict, Optional, Tuple
+
+JITTER_DISTRIBUTIONS = ("none", "fixed", "uniform", "exponential", "lognormal", "pareto")
+
+
+class Jitter:
+    """Extra response delay (in seconds) drawn from a distribution:
+
+    fixed (value), uniform (low, high), exponential (mean), lognormal (median, sigma)
+    and pareto (scale, alpha: heavy tail, scale is the minimum delay)
+    """
+
+    def __init__(self, distribution: str = "none", **params) -> None:
+        if distribution not in JITTER_DISTRIBUTIONS:
+            raise ValueError(f"Unknown jitter distribution {distribution} (expected one of {', '.join(JITTER_DISTRIBUTIONS)})")
+        self.distribution = distribution
+        self.params = params
+
+    def sample(self, rng: random.Random) -> float:
+        p = self.params
+        if self.distribution == "fixed":
+            return p["value"]
+        if self.distribution == "uniform":
+            return rng.uniform(p.get("low", 0.0), p["high"])
+        if self.distribution == "exponential":
+            return rng.expovariate(1.0 / p["mean"])
+        if self.distribution == "lognormal":
+            return p["median"] * rng.lognormvariate(0.0, p.get("sigma", 1.0))
+        if self.distribution == "pareto":
+            return p["scale"] * rng.paretovariate(p.get("alpha", 1.5))
+        return 0.0
+
+
+class Stall:
+    """Stall of one module, on every `every`-th request to it. A delay of None drops the response"""
+
+    def __init__(self, delay: Optional[float] = None, every: int = 1) -> None:
+        self.delay = delay
+        self.every = max(1, every)
+        self.requests = 0
+
+    def hit(self) -> bool:
+        self.requests += 1
+        return self.requests % self.every == 0
+
+
+class FaultProfile:
+    """Faults applied to the responses of a device, see the module docstring"""
+
+    def __init__(
+        self,
+        jitter: Optional[Jitter] = None,
+        drop_rate: float = 0.0,
+        corrupt_rate: float = 0.0,
+        truncate_rate: float = 0.0,
+        stalls: Optional[Dict[str, Stall]] = None,
+        seed: Optional[int] = None,
+    ) -> None:
+        self.jitter = jitter or Jitter()
+        self.drop_rate = drop_rate
+        self.corrupt_rate = corrupt_rate
+        self.truncate_rate = truncate_rate
+        self.stalls = stalls or {}
+        self.rng = random.Random(seed)
+        self.counts = {"responses": 0, "dropped": 0, "corrupted": 0, "truncated": 0, "stalled": 0}
+
+    @classmethod
+    def from_dict(cls, config: dict) -> "FaultProfile":
+        return cls(
+            jitter=Jitter(**config["jitter"]) if "jitter" in config else None,
+            drop_rate=config.get("drop_rate", 0.0),
+            corrupt_rate=config.get("corrupt_rate", 0.0),
+            truncate_rate=config.get("truncate_rate", 0.0),
+            stalls={str(module): Stall(**stall) for module, stall in config.get("stalls", {}).items()},
+            seed=config.get("seed"),
+        )
+
+    def apply(self, module: str, resp: Optional[bytes]) -> Tuple[Optional[bytes], float]:
+        """Return the response to send (None for no response) and the extra delay before sending it"""
+        self.counts["responses"] += 1
+        if resp is None:
+            return (None, 0.0)
+        delay = self.jitter.sample(self.rng)
+        stall = self.stalls.get(module)
+        if stall is not None and stall.hit():
+            self.counts["stalled"] += 1
+            if stall.delay is None:
+                return (None, 0.0)
+            delay += stall.delay
+        if self.rng.random() < self.drop_rate:
+            self.counts["dropped"] += 1
+            return (None, 0.0)
+        # The last byte (carriage return) is kept so that the framing survives
+        if len(resp) > 1 and self.rng.random() < self.corrupt_rate:
+            self.counts["corrupted"] += 1
+            index = self.rng.randrange(len(resp) - 1)
+            resp = resp[:index] + bytes([resp[index] ^ (1 << self.rng.randrange(8))]) + resp[index + 1:]
+        if len(resp) > 1 and self.rng.random() < self.truncate_rate:
+            self.counts["truncated"] += 1
+            index = self.rng.randrange(len(resp) - 1)
+            resp = resp[:index] + resp[index + 1:]
+        return (resp, delay)
+
+
+def load_scenario(path: str, name: str) -> FaultProfile:
+    """Fault profile of a scenario of a scenario file"""
+    with open(path) as f:
+        scenarios = json.load(f)
+    if name not in scenarios:
+        raise ValueError(f"Scenario {name} not found in {path} (available: {', '.join(scenarios)})")
+    return FaultProfile.from_dict(scenarios[name])
+
+
+def main() -> None:
+    from chassis_controller.emulators.bradx import BRADxEmulator
+    from chassis_controller.emulators.mecom import MeComEmulator
+    from chassis_controller.emulators.seyonic import SeyonicEmulator
+    from chassis_controller.emulators.serial_pty import serve_forever
+
+    devices = {
+        "bradx": (BRADxEmulator, "BRADX_PORT"),
+        "mecom": (MeComEmulator, "MEERSTETTER_PORT"),
+        "seyonic": (SeyonicEmulator, "PIPETTOR_PORT"),
+    }
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("device", choices=sorted(devices), help="emulated device")
+    parser.add_argument("scenarios", help="scenario file (JSON)")
+    parser.add_argument("scenario", help="name of the scenario to run")
+    parser.add_argument("--seed", type=int, help="random seed (overrides the scenario's)")
+    args = parser.parse_args()
+    faults = load_scenario(args.scenarios, args.scenario)
+    if args.seed is not None:
+        faults.rng.seed(args.seed)
+    device_class, variable = devices[args.device]
+    device = device_class()
+    device.faults = faults
+    try:
+        serve_forever(device, variable)
+    finally:
+        print(json.dumps(faults.counts))
+
+
+if __name__ == "__main__":
+    main()
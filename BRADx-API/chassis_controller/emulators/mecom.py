@@ -0,0 +1,301 @@
+
+# Version: Test
+"""
+Meerstetter TEC controller (MeCom protocol) emulator.
+
+Answers ?VR, VS, RS and ?IF for the MEERSTETTER_BUS_ADDR addresses, echoing the sequence
+number and with valid CRCs (requests with a bad CRC or for another address get no
+response, like on the real bus). Every heater is a first-order thermal plant
+
+    dT/dt = (HEATER_GAIN * I - (T - ambient)) / HEATER_TAU
+
+driven by a PID controller on "Target Object Temp (Set)" with the Kp, Ti, Td and
+"Current Limitation" parameters while the output stage ("Status") is enabled. The stability
+flag is set once the temperature has stayed within HEATER_STABLE_BAND of the target for
+HEATER_STABLE_TIME, and leaving the object error thresholds puts the device in error.
+Simulated time runs `speed` times faster than the wall clock.
+
+Run it with `python -m chassis_controller.emulators.mecom` and start the API with
+MEERSTETTER_PORT set to the printed port.
+"""
+import argparse
+import time
+from struct import pack, unpack
+from typing import Callable, Dict, Optional, Tuple
+
+from chassis_controller.app.config.BRADx_config import MEERSTETTER_BUS_ADDR
+from chassis_controller.app.routers.interfaces.utils_meerstetter import TEC_PARAMETER_LIST, UnknownParameter, crc16_ccitt_xmodem
+from chassis_controller.emulators.serial_pty import PtyDevice, parse_latency, serve_forever
+
+HEATER_GAIN = 20.0  # Steady state temperature rise per ampere (K/A)
+HEATER_TAU = 20.0  # Plant time constant (s)
+HEATER_RESISTANCE = 2.0  # Output voltage per ampere (ohm)
+HEATER_STABLE_BAND = 0.5  # (K)
+HEATER_STABLE_TIME = 5.0  # (s)
+HEATER_STEP = 0.05  # Integration step (simulated s)
+
+# Device status (parameter 104) and stability flag (parameter 1200) values
+STATUS_READY = 1
+STATUS_RUN = 2
+STATUS_ERROR = 3
+STABILITY_INACTIVE = 0
+STABILITY_NOT_STABLE = 1
+STABILITY_STABLE = 2
+
+# Error numbers (parameter 105)
+ERROR_OBJECT_TOO_LOW = 140
+ERROR_OBJECT_TOO_HIGH = 141
+
+# MeCom error codes of the "+XX" responses
+EER_CMD_NOT_AVAILABLE = 1
+EER_PAR_NOT_AVAILABLE = 5
+EER_PAR_NOT_WRITABLE = 6
+EER_PAR_INST_NOT_AVAILABLE = 8
+
+HEATER_DEFAULTS = {
+    "Firmware Version": 410,
+    "Save Data to Flash": 0,
+    "Status": 0,
+    "Current Limitation": 3.0,
+    "Voltage Limitation": 12.0,
+    "Current Error Threshold": 4.0,
+    "Voltage Error Threshold": 15.0,
+    "Target Object Temp (Set)": 25.0,
+    "Kp": 5.0,
+    "Ti": 30.0,
+    "Td": 0.0,
+    "Object Upper Error Threshold": 120.0,
+    "Object Lower Error Threshold": -10.0,
+    "Sink Upper Error Threshold": 80.0,
+    "Sink Lower Error Threshold": 0.0,
+    "Fan Control Enable": 0,
+    "Target Temperature": 30.0,
+    "0% Speed": 0.0,
+    "100% Speed": 3000.0,
+}
+
+
+class ThermalHeater:
+    """One TEC channel with its parameters and thermal plant, see the module docstring"""
+
+    def __init__(self, address: int, ambient: float = 25.0) -> None:
+        self.ambient = ambient
+        self.params: Dict[str, float] = {**HEATER_DEFAULTS, "Device Address": address}
+        self.temperature = ambient
+        self.previous = ambient  # Temperature at the previous step
+        self.current = 0.0
+        self.integral = 0.0
+        self.stable_for = 0.0
+        self.error_number = 0
+        self.time = 0.0  # Simulated seconds
+
+    @property
+    def running(self) -> bool:
+        return self.params["Status"] == 1 and self.error_number == 0
+
+    def step(self, dt: float) -> None:
+        target = self.params["Target Object Temp (Set)"]
+        error = target - self.temperature
+        if self.running:
+            limit = self.params["Current Limitation"]
+            ti = self.params["Ti"]
+            integral = self.integral + error * dt
+            derivative = -(self.temperature - self.previous) / dt  # On the measurement, no kick on setpoint changes
+            drive = self.params["Kp"] * (error + (integral / ti if ti > 0 else 0.0) + self.params["Td"] * derivative)
+            self.current = min(max(drive, -limit), limit)
+            if self.current == drive:
+                self.integral = integral  # No integration while saturated (anti-windup)
+        else:
+            self.current = 0.0
+            self.integral = 0.0
+        self.previous = self.temperature
+        self.temperature += dt * (HEATER_GAIN * self.current - (self.temperature - self.ambient)) / HEATER_TAU
+        self.stable_for = self.stable_for + dt if self.running and abs(error) < HEATER_STABLE_BAND else 0.0
+        if self.temperature > self.params["Object Upper Error Threshold"]:
+            self.error_number = ERROR_OBJECT_TOO_HIGH
+        elif self.temperature < self.params["Object Lower Error Threshold"]:
+            self.error_number = ERROR_OBJECT_TOO_LOW
+        self.time += dt
+
+    def advance(self, dt: float) -> None:
+        """Advance the simulation by dt simulated seconds"""
+        while dt > 1e-9:
+            step = min(dt, HEATER_STEP)
+            self.step(step)
+            dt -= step
+
+    def reset(self) -> None:
+        self.error_number = 0
+        self.integral = 0.0
+        self.stable_for = 0.0
+
+    def read(self, name: str):
+        """Value of a parameter, live values are computed from the plant"""
+        if name in self.params:
+            return self.params[name]
+        if name == "Object Temperature":
+            return self.temperature
+        if name == "Sink Temperature":
+            return self.ambient + 0.5 * abs(self.current)
+        if name in ("Target Object Temperature", "Ramp Object Temperature"):
+            return self.params["Target Object Temp (Set)"]
+        if name == "Actual Output Current":
+            return self.current
+        if name == "Actual Output Voltage":
+            return self.current * HEATER_RESISTANCE
+        if name == "Relative Cooling Power":
+            return 100.0 * self.current / self.params["Current Limitation"] if self.params["Current Limitation"] else 0.0
+        if name == "Device Status":
+            return STATUS_ERROR if self.error_number else STATUS_RUN if self.running else STATUS_READY
+        if name == "Error Number":
+            return self.error_number
+        if name == "Temperature is Stable":
+            if not self.running:
+                return STABILITY_INACTIVE
+            return STABILITY_STABLE if self.stable_for >= HEATER_STABLE_TIME else STABILITY_NOT_STABLE
+        return 0
+
+
+def encode_value(value, fmt: str) -> str:
+    if fmt == "FLOAT32":
+        return f"{unpack('!I', pack('!f', float(value)))[0]:08X}"
+    return f"{int(value) & 0xFFFFFFFF:08X}"
+
+
+def decode_value(text: str, fmt: str):
+    if fmt == "FLOAT32":
+        return unpack("!f", bytes.fromhex(text))[0]
+    return unpack("!i", bytes.fromhex(text))[0]
+
+
+class MeComEmulator(PtyDevice):
+    """Emulated Meerstetter controllers at the given addresses, see the module docstring"""
+
+    name = "MeCom"
+
+    def __init__(
+        self,
+        latency: Optional[Dict[str, float]] = None,
+        default_latency: float = 0.0,
+        speed: float = 1.0,
+        ambient: float = 25.0,
+        addresses=None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(latency, default_latency)
+        self.speed = speed
+        self._clock = clock
+        self._last = clock()
+        addresses = MEERSTETTER_BUS_ADDR.values() if addresses is None else addresses
+        self.heaters: Dict[int, ThermalHeater] = {address: ThermalHeater(address, ambient) for address in addresses}
+        self.crc_errors = 0
+
+    def advance(self) -> None:
+        """Bring the plants up to the current (simulated) time"""
+        now = self._clock()
+        dt = (now - self._last) * self.speed
+        self._last = now
+        for heater in self.heaters.values():
+            heater.advance(dt)
+
+    def split_frame(self, buffer: bytes) -> Tuple[Optional[bytes], bytes]:
+        end = buffer.find(b"\r")
+        if end < 0:
+            return (None, buffer)
+        return (buffer[:end + 1], buffer[end + 1:])
+
+    def command(self, frame: bytes) -> str:
+        body = frame[7:-5]
+        for command in (b"?VR", b"VS", b"RS", b"?IF"):
+            if body.startswith(command):
+                return command.decode()
+        return ""
+
+    def module_name(self, frame: bytes) -> str:
+        try:
+            return str(int(frame[1:3], 16))
+        except ValueError:
+            return ""
+
+    def handle(self, frame: bytes) -> Optional[bytes]:
+        text = frame.decode("ascii", "replace")
+        body = text[:-5]
+        try:
+            if text[0] not in "%#" or crc16_ccitt_xmodem(body.encode()) != int(text[-5:-1], 16):
+                raise ValueError
+            address = int(body[1:3], 16)
+        except ValueError:
+            self.crc_errors += 1
+            return None
+        heater = self.heaters.get(address)
+        if heater is None:
+            return None  # Nobody at this address
+        self.advance()
+        header, command = body[1:7], body[7:]
+        if command.startswith("?VR"):
+            return self.get_parameter(heater, header, command[3:])
+        if command.startswith("VS"):
+            return self.set_parameter(heater, header, text[-5:-1], command[2:])
+        if command == "RS":
+            heater.reset()
+            return self.ack(header, text[-5:-1])
+        if command == "?IF":
+            return self.frame(header, f"{'TEC-1092 EMULATED':<20}")
+        return self.error(header, EER_CMD_NOT_AVAILABLE)
+
+    def get_parameter(self, heater: ThermalHeater, header: str, args: str) -> bytes:
+        parameter, instance = int(args[0:4], 16), int(args[4:6], 16)
+        error = self.check_parameter(parameter, instance)
+        if error:
+            return self.error(header, error)
+        p = TEC_PARAMETER_LIST.get_by_id(parameter)
+        return self.frame(header, encode_value(heater.read(p.name), p.format))
+
+    def set_parameter(self, heater: ThermalHeater, header: str, crc: str, args: str) -> bytes:
+        parameter, instance = int(args[0:4], 16), int(args[4:6], 16)
+        error = self.check_parameter(parameter, instance)
+        if error:
+            return self.error(header, error)
+        p = TEC_PARAMETER_LIST.get_by_id(parameter)
+        if not p.writable:
+            return self.error(header, EER_PAR_NOT_WRITABLE)
+        heater.params[p.name] = decode_value(args[6:14], p.format)
+        return self.ack(header, crc)
+
+    @staticmethod
+    def check_parameter(parameter: int, instance: int) -> int:
+        try:
+            TEC_PARAMETER_LIST.get_by_id(parameter)
+        except UnknownParameter:
+            return EER_PAR_NOT_AVAILABLE
+        if instance != 1:
+            return EER_PAR_INST_NOT_AVAILABLE
+        return 0
+
+    @staticmethod
+    def frame(header: str, payload: str) -> bytes:
+        body = f"!{header}{payload}"
+        return f"{body}{crc16_ccitt_xmodem(body.encode()):04X}\r".encode()
+
+    @staticmethod
+    def ack(header: str, crc: str) -> bytes:
+        """The ACK carries the checksum of the request it acknowledges"""
+        return f"!{header}{crc}\r".encode()
+
+    def error(self, header: str, code: int) -> bytes:
+        return self.frame(header, f"+{code:02X}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", nargs="*", metavar="COMMAND=SECONDS", help="response latency by command (e.g. ?VR=0.004)")
+    parser.add_argument("--default-latency", type=float, default=0.002, help="response latency of the other commands (s)")
+    parser.add_argument("--speed", type=float, default=1.0, help="simulated time per wall clock second")
+    parser.add_argument("--ambient", type=float, default=25.0, help="ambient temperature (C)")
+    args = parser.parse_args()
+    emulator = MeComEmulator(parse_latency(args.latency), args.default_latency, args.speed, args.ambient)
+    serve_forever(emulator, "MEERSTETTER_PORT")
+
+
+if __name__ == "__main__":
+    main()
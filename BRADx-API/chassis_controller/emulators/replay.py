@@ -0,0 +1,155 @@
+
+# Version: Test
+"""
+Replay of recorded bus traffic (see app/routers/interfaces/recorder.py).
+
+A ReplayConnection stands in for the serial connection of a bus interface and answers
+every request written to it with the next recorded response of its bus, after the recorded
+latency times `scale` (0 answers at once). Requests that differ from the recorded ones are
+counted as mismatches but still answered, the request IDs and sequence numbers of a new
+run usually differ.
+
+replay() sends the recorded requests of a log through the bus interfaces over replay
+connections, at the recorded pace (also scaled) with the buses running concurrently, and
+parses the responses with the bus codecs, to compare transports and codecs on the same
+traffic: `python -m chassis_controller.emulators.replay session.log --scale 0`.
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from chassis_controller.app.routers.interfaces.BRADxBus import BRADxBusRouterInterface
+from chassis_controller.app.routers.interfaces.MeerstetterBus import MeerstetterBusRouterInterface
+from chassis_controller.app.routers.interfaces.PipettorBus import PipettorBusRouterInterface
+from chassis_controller.app.routers.interfaces.recorder import BusExchange, log_exchanges, read_log
+from chassis_controller.app.routers.interfaces.utils import BRADxBusPacket, PipettorResponse
+from chassis_controller.app.routers.interfaces.utils_meerstetter import crc16_ccitt_xmodem
+
+
+class ReplayConnection:
+    """Serial connection answering with recorded responses, see the module docstring"""
+
+    def __init__(self, exchanges: List[BusExchange], scale: float = 1.0) -> None:
+        self.exchanges = deque(exchanges)
+        self.scale = scale
+        self.is_open = True
+        self.timeout = None
+        self.write_timeout = None
+        self.port = None
+        self.baudrate = None
+        self.mismatches = 0
+        self._inflight = deque()  # (due time, response) of the requests written
+
+    def open(self) -> None:
+        self.is_open = True
+
+    def close(self) -> None:
+        self.is_open = False
+
+    def reset_input_buffer(self) -> None:
+        self._inflight.clear()
+
+    def write(self, data) -> int:
+        if not self.exchanges:
+            return len(data)  # Past the end of the recording, nobody answers
+        exchange = self.exchanges.popleft()
+        if bytes(data) != exchange.request:
+            self.mismatches += 1
+        latency = (exchange.received_ns - exchange.sent_ns) / 1e9 * self.scale
+        self._inflight.append((time.perf_counter() + latency, exchange.response))
+        return len(data)
+
+    async def _next_response(self) -> bytes:
+        if not self._inflight:
+            await asyncio.sleep(self.timeout or 0)
+            return b""
+        due, response = self._inflight.popleft()
+        wait = due - time.perf_counter()
+        if self.timeout is not None and wait > self.timeout:
+            wait = self.timeout  # Recorded later than the current timeout allows
+            response = b""
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return response
+
+    async def read_async(self, size: int = 1) -> bytes:
+        return (await self._next_response())[:size]
+
+    async def read_until_async(self, expected: bytes = b"\n", size: Optional[int] = None) -> bytes:
+        return (await self._next_response())[:size]
+
+    def read(self, size: int = 1) -> bytes:
+        return asyncio.run(self.read_async(size))
+
+
+def parse_response(bus: str, resp: bytes) -> None:
+    """Decode a response with its bus's codec, raises ValueError when it is not valid"""
+    if bus == "bradx":
+        BRADxBusPacket.parse(resp)
+    elif bus == "pipettor":
+        PipettorResponse.parse(resp)
+    elif not resp.endswith(b"\r") or crc16_ccitt_xmodem(resp[:-5]) != int(resp[-5:-1], 16):
+        raise ValueError("Invalid MeCom response frame")
+
+
+async def replay_bus(bus: str, exchanges: List[BusExchange], scale: float) -> dict:
+    """Send the recorded requests of one bus through its interface, returns the exchange latencies (s) and errors"""
+    conn = {
+        "bradx": BRADxBusRouterInterface,
+        "meerstetter": MeerstetterBusRouterInterface,
+        "pipettor": PipettorBusRouterInterface,
+    }[bus]("replay")
+    conn._connection = transport = ReplayConnection(exchanges, scale)
+    exchange = conn.exchange_async if bus == "bradx" else conn.exchange_frame_async if bus == "meerstetter" else conn.exchange
+    latencies = []
+    errors = 0
+    start = time.perf_counter()
+    for recorded in exchanges:
+        wait = start + (recorded.sent_ns - exchanges[0].sent_ns) / 1e9 * scale - time.perf_counter()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        sent = time.perf_counter()
+        resp = await exchange(recorded.request)
+        try:
+            parse_response(bus, resp)
+        except (ValueError, IndexError):
+            errors += 1
+        latencies.append(time.perf_counter() - sent)
+    return {"latencies": latencies, "errors": errors, "mismatches": transport.mismatches}
+
+
+async def replay(path: str, scale: float = 1.0) -> Dict[str, dict]:
+    """Replay a log through the bus interfaces, returns a summary per bus"""
+    by_bus: Dict[str, List[BusExchange]] = {}
+    for exchange in log_exchanges(read_log(path)):
+        by_bus.setdefault(exchange.bus, []).append(exchange)
+    start = time.perf_counter()
+    results = await asyncio.gather(*(replay_bus(bus, exchanges, scale) for bus, exchanges in by_bus.items()))
+    duration = time.perf_counter() - start
+    summary = {}
+    for bus, result in zip(by_bus, results):
+        latencies = sorted(result["latencies"])
+        summary[bus] = {
+            "exchanges": len(latencies),
+            "errors": result["errors"],
+            "mismatches": result["mismatches"],
+            "exchanges_per_s": len(latencies) / duration if duration > 0 else None,
+            "p50_ms": latencies[len(latencies) // 2] * 1e3,
+            "p99_ms": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] * 1e3,
+        }
+    return summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log", help="bus traffic log (BUS_RECORD_PATH of the recorded session)")
+    parser.add_argument("--scale", type=float, default=1.0, help="timing scale, 1 replays at the recorded pace and latencies, 0 as fast as possible")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(replay(args.log, args.scale)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+
+# Version: Test
+"""
+Serial devices emulated behind a Linux pseudo-terminal.
+
+A PtyDevice opens a pty pair and serves the master side from a background thread: the
+bytes written by the API to the slave side (its port, e.g. /dev/pts/5) are split into
+request frames, each frame is answered by the subclass's handle() after the latency
+configured for its command, with the faults of the device's FaultProfile (see faults.py)
+applied to the response. The bus interfaces are pointed at the port through the
+*_PORT overrides in BRADx_config (environment variables).
+"""
+import os
+import select
+import threading
+import time
+import tty
+from typing import Dict, Optional, Tuple
+
+
+class PtyDevice:
+    """Base class of the emulated devices, subclasses implement split_frame, command and handle"""
+
+    name = "device"
+
+    def __init__(self, latency: Optional[Dict[str, float]] = None, default_latency: float = 0.0) -> None:
+        self.latency = dict(latency or {})  # Response latency in seconds by command
+        self.default_latency = default_latency
+        self.frames = 0
+        self.faults = None  # FaultProfile applied to the responses
+        self._master, self._slave = os.openpty()
+        tty.setraw(self._slave)
+        self.port = os.ttyname(self._slave)
+        self._lock = threading.Lock()  # Held while handling a frame, state may be inspected under it
+        self._stop = threading.Event()
+        self._thread = None
+
+    def split_frame(self, buffer: bytes) -> Tuple[Optional[bytes], bytes]:
+        """Return the first complete frame in the buffer (or None) and the rest of the buffer"""
+        raise NotImplementedError
+
+    def command(self, frame: bytes) -> str:
+        """Command of the request frame, used to look up its latency"""
+        return ""
+
+    def module_name(self, frame: bytes) -> str:
+        """Module the request frame is for, used to look up its stalls"""
+        return ""
+
+    def handle(self, frame: bytes) -> Optional[bytes]:
+        """Return the response to a request frame (None for no response)"""
+        raise NotImplementedError
+
+    def response_delay(self, frame: bytes) -> float:
+        return self.latency.get(self.command(frame), self.default_latency)
+
+    def reply(self, frame: bytes) -> Optional[bytes]:
+        """Answer one request frame, after its latency"""
+        with self._lock:
+            self.frames += 1
+            resp = self.handle(frame)
+        delay = self.response_delay(frame)
+        if self.faults is not None:
+            resp, extra = self.faults.apply(self.module_name(frame), resp)
+            delay += extra
+        if delay > 0:
+            time.sleep(delay)
+        return resp
+
+    def _serve(self) -> None:
+        buffer = b""
+        while not self._stop.is_set():
+            ready, _, _ = select.select([self._master], [], [], 0.05)
+            if not ready:
+                continue
+            try:
+                buffer += os.read(self._master, 4096)
+            except OSError:
+                break
+            while True:
+                frame, buffer = self.split_frame(buffer)
+                if frame is None:
+                    break
+                resp = self.reply(frame)
+                if resp:
+                    os.write(self._master, resp)
+
+    def start(self) -> "PtyDevice":
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._serve, name=f"{self.name}-emulator", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def close(self) -> None:
+        self.stop()
+        os.close(self._master)
+        os.close(self._slave)
+
+    def __enter__(self) -> "PtyDevice":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def parse_latency(items) -> Dict[str, float]:
+    """Parse command=seconds command line arguments"""
+    latency = {}
+    for item in items or []:
+        command, _, seconds = item.rpartition("=")
+        latency[command] = float(seconds)
+    return latency
+
+
+def serve_forever(device: PtyDevice, variable: str) -> None:
+    """Run an emulator from the command line until interrupted"""
+    with device:
+        print(f"{device.name} emulator on {device.port}")
+        print(f"export {variable}={device.port}")
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
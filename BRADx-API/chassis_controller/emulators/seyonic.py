@@ -0,0 +1,203 @@
+
+# Version: Test
+"""
+Seyonic pipettor controller emulator.
+
+Speaks the framing of PipettorRequest/PipettorResponse: space separated hex tokens,
+"address command_lo command_hi data_lsb data_msb checksum\\r" requests and
+"address error_code data_lsb data_msb checksum\\r" responses, the checksums being the 8 bit
+sum of the other bytes (requests with a bad checksum or for another address get no
+response). command_hi is the command and command_lo the part of the device it is for
+(the dispenser channel). Three controllers answer:
+
+  - the system controller (PIPETTOR_SYSTEM_ADDRESS): status, a mask of the busy channels
+  - the pressure controller (PIPETTOR_PRESSURE_ADDRESS): pressure set point and reading
+    (signed mbar), following the set point with a first-order lag, status 1 once settled
+  - the dispensers (PIPETTOR_DISPENSER_ADDRESS): aspirate, dispense (volumes in nL), held
+    volume and status, an aspirate/dispense keeps its channel busy for volume / flow rate
+
+Simulated time runs `speed` times faster than the wall clock.
+
+Run it with `python -m chassis_controller.emulators.seyonic` and start the API with
+PIPETTOR_PORT set to the printed port.
+"""
+import argparse
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+from chassis_controller.app.routers.interfaces.utils import PipettorRequest, msg_checksum
+from chassis_controller.emulators.serial_pty import PtyDevice, parse_latency, serve_forever
+
+PIPETTOR_SYSTEM_ADDRESS = 0x10
+PIPETTOR_PRESSURE_ADDRESS = 0x20
+PIPETTOR_DISPENSER_ADDRESS = 0x30
+PIPETTOR_CHANNELS = 8
+
+# Commands (command_hi)
+PIPETTOR_CMD_STATUS = 0x2D
+PIPETTOR_CMD_SET_PRESSURE = 0x13
+PIPETTOR_CMD_GET_PRESSURE = 0x14
+PIPETTOR_CMD_ASPIRATE = 0x20
+PIPETTOR_CMD_DISPENSE = 0x21
+PIPETTOR_CMD_GET_VOLUME = 0x22
+
+PIPETTOR_COMMANDS = {
+    PIPETTOR_CMD_STATUS: "status",
+    PIPETTOR_CMD_SET_PRESSURE: "set_pressure",
+    PIPETTOR_CMD_GET_PRESSURE: "pressure",
+    PIPETTOR_CMD_ASPIRATE: "aspirate",
+    PIPETTOR_CMD_DISPENSE: "dispense",
+    PIPETTOR_CMD_GET_VOLUME: "volume",
+}
+
+# Error codes of the responses
+PIPETTOR_OK = 0x00
+PIPETTOR_ERR_UNKNOWN_COMMAND = 0x01
+PIPETTOR_ERR_INVALID_VALUE = 0x02
+PIPETTOR_ERR_BUSY = 0x03
+
+PIPETTOR_CAPACITY_NL = 50000  # Volume a dispenser channel holds
+PIPETTOR_FLOW_RATE = 10000.0  # Aspirate/dispense rate (nL/s)
+PRESSURE_TAU = 0.1  # Pressure controller time constant (s)
+PRESSURE_BAND = 5.0  # Settled when within this of the set point (mbar)
+
+
+def response_message(address: int, error_code: int, data: int = 0) -> bytes:
+    data &= 0xFFFF
+    fields = [address, error_code, data & 0xFF, data >> 8]
+    checksum = msg_checksum(bytearray(fields))
+    return (" ".join(f"{f:02X}" for f in fields) + f" {checksum:02X}\r").encode("ascii")
+
+
+def signed16(data: int) -> int:
+    return data - 0x10000 if data & 0x8000 else data
+
+
+class DispenserChannel:
+    """State of one dispenser channel"""
+
+    def __init__(self) -> None:
+        self.volume = 0  # nL held
+        self.busy_until = 0.0  # Simulated time the running aspirate/dispense ends
+
+
+class SeyonicEmulator(PtyDevice):
+    """Emulated pipettor controllers, see the module docstring"""
+
+    name = "Seyonic"
+
+    def __init__(
+        self,
+        latency: Optional[Dict[str, float]] = None,
+        default_latency: float = 0.0,
+        speed: float = 1.0,
+        channels: int = PIPETTOR_CHANNELS,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        super().__init__(latency, default_latency)
+        self.speed = speed
+        self._clock = clock
+        self._start = clock()
+        self.channels: Dict[int, DispenserChannel] = {n: DispenserChannel() for n in range(1, channels + 1)}
+        self.pressure = 0.0  # mbar
+        self.pressure_set = 0.0
+        self._pressure_time = 0.0
+        self.checksum_errors = 0
+
+    @property
+    def time(self) -> float:
+        """Simulated seconds since the emulator was created"""
+        return (self._clock() - self._start) * self.speed
+
+    def advance_pressure(self) -> None:
+        now = self.time
+        dt = now - self._pressure_time
+        self._pressure_time = now
+        self.pressure += (self.pressure_set - self.pressure) * min(1.0, dt / PRESSURE_TAU)
+
+    def split_frame(self, buffer: bytes) -> Tuple[Optional[bytes], bytes]:
+        end = buffer.find(b"\r")
+        if end < 0:
+            return (None, buffer)
+        return (buffer[:end + 1], buffer[end + 1:])
+
+    def command(self, frame: bytes) -> str:
+        tokens = frame.split()
+        try:
+            return PIPETTOR_COMMANDS.get(int(tokens[2], 16), "")
+        except (IndexError, ValueError):
+            return ""
+
+    def module_name(self, frame: bytes) -> str:
+        try:
+            return str(int(frame.split()[0], 16))
+        except (IndexError, ValueError):
+            return ""
+
+    def handle(self, frame: bytes) -> Optional[bytes]:
+        try:
+            req = PipettorRequest.parse(frame.decode("ascii"))
+        except (UnicodeDecodeError, ValueError):
+            self.checksum_errors += 1
+            return None
+        if req.address == PIPETTOR_SYSTEM_ADDRESS:
+            error_code, data = self.system_request(req)
+        elif req.address == PIPETTOR_PRESSURE_ADDRESS:
+            error_code, data = self.pressure_request(req)
+        elif req.address == PIPETTOR_DISPENSER_ADDRESS:
+            error_code, data = self.dispenser_request(req)
+        else:
+            return None  # Nobody at this address
+        return response_message(req.address, error_code, data)
+
+    def system_request(self, req: PipettorRequest) -> Tuple[int, int]:
+        if req.command_hi != PIPETTOR_CMD_STATUS:
+            return (PIPETTOR_ERR_UNKNOWN_COMMAND, 0)
+        now = self.time
+        busy = sum(1 << (n - 1) for n, channel in self.channels.items() if channel.busy_until > now)
+        return (PIPETTOR_OK, busy)
+
+    def pressure_request(self, req: PipettorRequest) -> Tuple[int, int]:
+        self.advance_pressure()
+        if req.command_hi == PIPETTOR_CMD_SET_PRESSURE:
+            self.pressure_set = float(signed16(req.data))
+            return (PIPETTOR_OK, req.data)
+        if req.command_hi == PIPETTOR_CMD_GET_PRESSURE:
+            return (PIPETTOR_OK, round(self.pressure))
+        if req.command_hi == PIPETTOR_CMD_STATUS:
+            return (PIPETTOR_OK, int(abs(self.pressure - self.pressure_set) < PRESSURE_BAND))
+        return (PIPETTOR_ERR_UNKNOWN_COMMAND, 0)
+
+    def dispenser_request(self, req: PipettorRequest) -> Tuple[int, int]:
+        channel = self.channels.get(req.command_lo)
+        if channel is None:
+            return (PIPETTOR_ERR_INVALID_VALUE, 0)
+        now = self.time
+        busy = channel.busy_until > now
+        if req.command_hi == PIPETTOR_CMD_STATUS:
+            return (PIPETTOR_OK, int(busy))
+        if req.command_hi == PIPETTOR_CMD_GET_VOLUME:
+            return (PIPETTOR_OK, channel.volume)
+        if req.command_hi in (PIPETTOR_CMD_ASPIRATE, PIPETTOR_CMD_DISPENSE):
+            if busy:
+                return (PIPETTOR_ERR_BUSY, 0)
+            volume = req.data if req.command_hi == PIPETTOR_CMD_ASPIRATE else -req.data
+            if not 0 <= channel.volume + volume <= PIPETTOR_CAPACITY_NL:
+                return (PIPETTOR_ERR_INVALID_VALUE, 0)
+            channel.volume += volume
+            channel.busy_until = now + req.data / PIPETTOR_FLOW_RATE
+            return (PIPETTOR_OK, channel.volume)
+        return (PIPETTOR_ERR_UNKNOWN_COMMAND, 0)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--latency", nargs="*", metavar="COMMAND=SECONDS", help="response latency by command (e.g. aspirate=0.01)")
+    parser.add_argument("--default-latency", type=float, default=0.002, help="response latency of the other commands (s)")
+    parser.add_argument("--speed", type=float, default=1.0, help="simulated time per wall clock second")
+    args = parser.parse_args()
+    serve_forever(SeyonicEmulator(parse_latency(args.latency), args.default_latency, args.speed), "PIPETTOR_PORT")
+
+
+if __name__ == "__main__":
+    main()
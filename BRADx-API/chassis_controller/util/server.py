@@ -1,19 +1,82 @@
 
 # Version: Test
+"""
+Local uvicorn server of the API, with a selectable profile (SERVER_PROFILES):
+
+- dev: auto reload, a reloader process restarts the server when a source file changes
+- production: a single server process without reloader, uvloop and httptools when they
+  are installed, no access log and a longer keep-alive for the polling clients
+
+The profile, bind address and port default to BRADX_SERVER_PROFILE, BRADX_SERVER_HOST and
+BRADX_SERVER_PORT (see BRADx_config), or from the command line:
+
+    python -m chassis_controller.util.server --profile production --host 0.0.0.0 --port 8000
+"""
+import argparse
+import importlib.util
 import os
 import multiprocessing
-from uvicorn import Config, Server, run
+from uvicorn import run
+
+from chassis_controller.app.config.BRADx_config import SERVER_HOST, SERVER_PORT, SERVER_PROFILE
+
+SERVER_APP = "chassis_controller.app.main:app"
+# Directory holding the chassis_controller package, the app is imported from there whatever the working directory
+TOP_LEVEL_DIR = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def available(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+# uvicorn settings of every profile
+SERVER_PROFILES = {
+    "dev": {
+        "reload": True,
+        "reload_dirs": [os.path.join(TOP_LEVEL_DIR, "chassis_controller", "app")],
+    },
+    "production": {
+        "reload": False,
+        "workers": 1,  # The buses are held by module level connections and locks, a second worker would contend for the ports
+        "loop": "uvloop" if available("uvloop") else "asyncio",
+        "http": "httptools" if available("httptools") else "h11",
+        "access_log": False,
+        "log_level": "warning",
+        "timeout_keep_alive": 30,  # s, the dashboards poll every few seconds over the same connection
+        "backlog": 2048,
+    },
+}
+
+
+def server_settings(profile: str = SERVER_PROFILE, host: str = SERVER_HOST, port: int = SERVER_PORT) -> dict:
+    """Keyword arguments of uvicorn.run for the profile"""
+    if profile not in SERVER_PROFILES:
+        raise ValueError(f"Unknown server profile {profile}, expected one of {', '.join(SERVER_PROFILES)}")
+    return {"app": SERVER_APP, "app_dir": TOP_LEVEL_DIR, "host": host, "port": port, **SERVER_PROFILES[profile]}
+
 
 class Server(multiprocessing.Process):
     """ Class for working with a local uvicorn server """
-    def __init__(self) -> None:
+    def __init__(self, profile: str = SERVER_PROFILE, host: str = SERVER_HOST, port: int = SERVER_PORT) -> None:
         super().__init__()
+        self.settings = server_settings(profile, host, port)
 
     def stop(self) -> None:
         self.terminate()
 
     def run(self, *args, **kwargs) -> None:
-        # Get the current working path 
-        path = os.path.abspath(os.getcwd()).split('\\')
-        app_dir = "\\".join(path + ['chassis_controller','app'])
-        run('main:app', app_dir=app_dir, reload=True)
+        settings = dict(self.settings)
+        run(settings.pop("app"), **settings)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--profile", choices=sorted(SERVER_PROFILES), default=SERVER_PROFILE)
+    parser.add_argument("--host", default=SERVER_HOST, help="bind address")
+    parser.add_argument("--port", type=int, default=SERVER_PORT)
+    args = parser.parse_args()
+    Server(args.profile, args.host, args.port).run()
+
+
+if __name__ == "__main__":
+    main()
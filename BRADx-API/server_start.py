@@ -1,17 +1,21 @@
 #!/usr/bin/env python3.8
 
-import pythonnet
-from pythonnet import load
+import os
 from chassis_controller.util.server import Server
 
-try:
-	load("coreclr")
-except:
-	print("Cannot load coreclr into gui")
-
 import multiprocessing
 
+def load_coreclr() -> None:
+	"""Load the .NET runtime, on demand: the API server itself does not use it (set BRADX_LOAD_CORECLR=1 to load it at start)"""
+	try:
+		from pythonnet import load
+		load("coreclr")
+	except:
+		print("Cannot load coreclr into gui")
+
 def main() -> None:
+	if os.environ.get("BRADX_LOAD_CORECLR"):
+		load_coreclr()
 	server = Server()
 	server.run()
 